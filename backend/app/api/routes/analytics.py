@@ -0,0 +1,30 @@
+"""Analytics route"""
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.api.schemas.analytics import RollupResponse
+from app.infra.database.connection import get_db
+from app.infra.repos.rollup_repo import RollupRepository
+from app.domain.services.analytics_service import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+@router.get("/bookings", response_model=List[RollupResponse])
+def get_booking_rollups(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    bus_provider: Optional[str] = None,
+    from_district: Optional[str] = None,
+    to_district: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Bookings, cancellations and revenue per provider, route and travel date"""
+    service = AnalyticsService(RollupRepository(db))
+    return service.get_rollups(
+        date_from=date_from,
+        date_to=date_to,
+        bus_provider=bus_provider,
+        from_district=from_district,
+        to_district=to_district
+    )
@@ -1,10 +1,36 @@
 """Booking route"""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from datetime import date
+from typing import Callable, List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.api.schemas.booking import BookingResponse, BookingCreate, BookingCancelRequest
-from app.infra.database.connection import get_db
+from app.config import get_settings
+from app.api.schemas.booking import (
+    BookingResponse,
+    BookingCreate,
+    BookingByRouteCreate,
+    BookingCancelRequest,
+    ManifestResponse,
+    SeatHoldRequest,
+    SeatHoldResponse
+)
+from app.infra.database.connection import get_db, SessionLocal
+from app.infra.export.booking_export import (
+    EXPORT_FORMATS,
+    ExportFormatUnavailable,
+    get_exporter
+)
+from app.infra.cache.idempotency import (
+    IdempotencyKeyMismatch,
+    get_idempotency_store,
+    request_fingerprint
+)
 from app.infra.repos.booking_repo import BookingRepository
+from app.infra.repos.inventory_repo import InventoryRepository
+from app.infra.repos.bus_repo import BusRepository
+from app.domain.entities import Trip
 from app.domain.services.booking_service import BookingService
 from app.domain.exceptions import (
     InvalidBooking,
@@ -15,19 +41,147 @@ from app.domain.exceptions import (
     InvalidPrice,
     BookingAlreadyCanceled,
     BookingException,
-    DuplicateBooking
+    DuplicateBooking,
+    SeatsSoldOut,
+    SeatHoldNotFound
 )
 
+settings = get_settings()
+
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
+def _get_booking_service(db: Session) -> BookingService:
+    return BookingService(
+        BookingRepository(db),
+        InventoryRepository(db),
+        BusRepository()
+    )
+
+def _run_idempotent(
+    scope: str,
+    key: str,
+    payload: dict,
+    success_status: int,
+    handler: Callable
+):
+    """Run a handler once per idempotency key and replay its response"""
+    store = get_idempotency_store()
+    store_key = f"{scope}:{key}"
+    fingerprint = request_fingerprint(payload)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+    while True:
+        try:
+            record, owner = store.begin(store_key, fingerprint)
+        except IdempotencyKeyMismatch as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={
+                    "error": "Idempotency Key Reused",
+                    "message": "Idempotency-Key was already used with a different request"
+                }
+            ) from e
+
+        if owner:
+            break
+
+        # Another request with this key is in flight, wait for its response
+        if not record.done.wait(max(deadline - time.monotonic(), 0)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "error": "Request In Progress",
+                    "message": "A request with this Idempotency-Key is still being processed"
+                }
+            )
+        if record.completed:
+            return JSONResponse(
+                status_code=record.status_code,
+                content=record.body,
+                headers={"Idempotent-Replayed": "true"}
+            )
+
+    try:
+        body = jsonable_encoder(handler())
+    except HTTPException as e:
+        if e.status_code >= 500:
+            store.release(store_key)
+            raise
+        # Client errors are final, so retries get the same answer
+        body = {"detail": jsonable_encoder(e.detail)}
+        store.complete(store_key, e.status_code, body)
+        return JSONResponse(status_code=e.status_code, content=body)
+    except Exception:
+        store.release(store_key)
+        raise
+
+    store.complete(store_key, success_status, body)
+    return JSONResponse(status_code=success_status, content=body)
+
+
 @router.post("", response_model=BookingResponse, status_code=201)
-def create_booking(booking: BookingCreate, db: Session = Depends(get_db)):
+def create_booking(
+    booking: BookingCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """Create a booking"""
+    if idempotency_key is None:
+        return _create_booking(booking, db)
+    return _run_idempotent(
+        "create",
+        idempotency_key,
+        jsonable_encoder(booking),
+        status.HTTP_201_CREATED,
+        lambda: BookingResponse.model_validate(
+            _create_booking(booking, db), from_attributes=True
+        )
+    )
+
+@router.post("/by-route", response_model=BookingResponse, status_code=201)
+def create_booking_by_route(
+    booking: BookingByRouteCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """Create a booking at the current fare without a prior search"""
+    if idempotency_key is None:
+        return _create_booking(booking, db)
+    return _run_idempotent(
+        "create-by-route",
+        idempotency_key,
+        jsonable_encoder(booking),
+        status.HTTP_201_CREATED,
+        lambda: BookingResponse.model_validate(
+            _create_booking(booking, db), from_attributes=True
+        )
+    )
+
+def _create_booking(booking: BookingCreate | BookingByRouteCreate, db: Session):
     try:
-        repo = BookingRepository(db)
-        service = BookingService(repo)
+        service = _get_booking_service(db)
+        if isinstance(booking, BookingByRouteCreate):
+            return service.create_booking_by_route(booking.dict())
         result = service.create_booking(booking.dict())
         return result
+    except SeatsSoldOut as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "Sold Out",
+                "message": str(e),
+                "details": e.details
+            }
+        ) from e
+    except SeatHoldNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail={
+                "error": "Hold Expired",
+                "message": str(e),
+                "details": e.details
+            }
+        ) from e
     except DuplicateBooking as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -61,12 +215,23 @@ def create_booking(booking: BookingCreate, db: Session = Depends(get_db)):
 @router.post("/cancel-by-details", status_code=status.HTTP_200_OK)
 def cancel_booking_by_details(
     cancel_request: BookingCancelRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """Cancel via journey details"""
+    if idempotency_key is None:
+        return _cancel_booking_by_details(cancel_request, db)
+    return _run_idempotent(
+        "cancel",
+        idempotency_key,
+        jsonable_encoder(cancel_request),
+        status.HTTP_200_OK,
+        lambda: _cancel_booking_by_details(cancel_request, db)
+    )
+
+def _cancel_booking_by_details(cancel_request: BookingCancelRequest, db: Session):
     try:
-        repo = BookingRepository(db)
-        service = BookingService(repo)
+        service = _get_booking_service(db)
         canceled_booking = service.cancel_booking_by_details(
             phone=cancel_request.phone,
             travel_date=cancel_request.travel_date,
@@ -116,12 +281,109 @@ def cancel_booking_by_details(
             }
         ) from e
 
+@router.post("/holds", response_model=SeatHoldResponse, status_code=201)
+def hold_seat(hold_request: SeatHoldRequest, db: Session = Depends(get_db)):
+    """Hold a seat for a few minutes while the customer checks out"""
+    try:
+        service = _get_booking_service(db)
+        seat_hold = service.hold_seat(Trip(**hold_request.dict()))
+        return {"hold_id": seat_hold.hold_id, "expires_at": seat_hold.expires_at, **hold_request.dict()}
+    except SeatsSoldOut as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "error": "Sold Out",
+                "message": str(e),
+                "details": e.details
+            }
+        ) from e
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_200_OK)
+def release_hold(hold_id: str, db: Session = Depends(get_db)):
+    """Release a seat hold"""
+    try:
+        _get_booking_service(db).release_hold(hold_id)
+        return {"message": "Seat hold released", "hold_id": hold_id}
+    except SeatHoldNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={
+                "error": "Hold Not Found",
+                "message": str(e),
+                "details": e.details
+            }
+        ) from e
+
+@router.get("/manifest", response_model=ManifestResponse)
+def get_manifest(
+    bus_provider: str,
+    travel_date: date,
+    travel_time: str,
+    from_district: str,
+    to_district: str,
+    count_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Get confirmed passengers for a departure"""
+    service = _get_booking_service(db)
+    trip = {
+        "bus_provider": bus_provider,
+        "travel_date": travel_date,
+        "travel_time": travel_time,
+        "from_district": from_district,
+        "to_district": to_district
+    }
+    if count_only:
+        return {**trip, "count": service.count_manifest(**trip)}
+
+    passengers = service.get_manifest(**trip)
+    return {**trip, "count": len(passengers), "passengers": passengers}
+
+@router.get("/export")
+def export_bookings(
+    export_format: str = Query("csv", alias="format"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    date_field: Literal["booking_date", "travel_date"] = "booking_date",
+    bus_provider: Optional[str] = None,
+    booking_status: Optional[str] = Query(None, alias="status")
+):
+    """Stream bookings as CSV, NDJSON or Parquet"""
+    try:
+        exporter = get_exporter(export_format)
+    except ExportFormatUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"error": "Export Error", "message": str(e)}
+        ) from e
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    return StreamingResponse(
+        _stream_export(
+            exporter,
+            date_from=date_from,
+            date_to=date_to,
+            date_field=date_field,
+            bus_provider=bus_provider,
+            status=booking_status
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="bookings.{extension}"'}
+    )
+
+def _stream_export(exporter: Callable, **filters):
+    # The request-scoped session may be closed before streaming ends
+    db = SessionLocal()
+    try:
+        yield from exporter(BookingRepository(db).iter_bookings(**filters))
+    finally:
+        db.close()
+
 @router.get("/by-phone", response_model=List[BookingResponse])
 def get_bookings(phone: str, db: Session = Depends(get_db)):
     """Get all bookings by phone number"""
     try:
-        repo = BookingRepository(db)
-        service = BookingService(repo)
+        service = _get_booking_service(db)
         return service.get_bookings_by_phone(phone)
     except InvalidPhoneNumber as e:
         raise HTTPException(
@@ -0,0 +1,97 @@
+"""Runtime metrics route"""
+import os
+from fastapi import APIRouter
+from app.config import get_settings
+from app.infra.cache.booking_filter import get_duplicate_filter
+from app.infra.cache.booking_cache import get_booking_cache
+from app.infra.cache.query_cache import get_query_cache
+from app.infra.rag.model_registry import model_memory_report
+from app.infra.rag.embedding_cache import embedding_cache_report
+from app.infra.rag.embedding_batcher import embedding_batcher_report
+from app.infra.rag.vector_store import hybrid_search_report
+from app.infra.rag.rag_executor import get_rag_executor
+from app.api.routes.rag import init_query_worker
+from app.preload import process_memory
+
+settings = get_settings()
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+@router.get("/duplicate-filter")
+def duplicate_filter_stats():
+    """False-positive rate and memory use of the duplicate-booking filter"""
+    duplicate_filter = get_duplicate_filter()
+    if duplicate_filter is None:
+        return {"enabled": False}
+    return {"enabled": True, **duplicate_filter.stats()}
+
+@router.get("/booking-cache")
+def booking_cache_stats():
+    """Hit rate and size of the per-phone booking cache"""
+    booking_cache = get_booking_cache()
+    if booking_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **booking_cache.stats()}
+
+@router.get("/query-cache")
+def query_cache_stats():
+    """Hit rate and size of the RAG answer cache"""
+    query_cache = get_query_cache()
+    if query_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **query_cache.stats()}
+
+def _rag_process_report(report) -> dict:
+    """`report()` with the pid and role of the process that made it"""
+    role = "rag_worker" if settings.RAG_EXECUTOR_PROCESSES > 0 else "server"
+    return {"pid": os.getpid(), "process": role, **report()}
+
+async def _from_rag_process(report) -> dict:
+    """
+    Run a report where the model and index live.
+
+    With a RAG pool that is one of its workers, whichever is free; each
+    keeps its own model, caches and counters, so the numbers cover that
+    worker only.
+    """
+    return await get_rag_executor(init_query_worker).run(_rag_process_report, report)
+
+def _models_report() -> dict:
+    return {"models": model_memory_report()}
+
+def _embedding_cache_report() -> dict:
+    return {"caches": embedding_cache_report()}
+
+def _embedding_batcher_report() -> dict:
+    return {"batchers": embedding_batcher_report()}
+
+def _hybrid_search_report() -> dict:
+    report = hybrid_search_report()
+    if report is None or not settings.HYBRID_SEARCH_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **report}
+
+@router.get("/models")
+async def model_stats():
+    """Embedding models loaded by the RAG process and their memory"""
+    return await _from_rag_process(_models_report)
+
+@router.get("/memory")
+def memory_stats():
+    """Resident vs unique memory of the worker serving this request"""
+    return {"pid": os.getpid(), **process_memory()}
+
+@router.get("/embedding-cache")
+async def embedding_cache_stats():
+    """Hit rate and time saved by the query embedding cache"""
+    return await _from_rag_process(_embedding_cache_report)
+
+@router.get("/embedding-batcher")
+async def embedding_batcher_stats():
+    """Batch sizes and queueing delay of the query embedding batcher"""
+    return await _from_rag_process(_embedding_batcher_report)
+
+@router.get("/hybrid-search")
+async def hybrid_search_stats():
+    """How often BM25 answered provider searches without an embedding"""
+    return await _from_rag_process(_hybrid_search_report)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
-from app.infra.rag.vector_store import VectorStoreService
+from app.infra.rag.vector_store import get_vector_store
 from app.infra.repos.provider_repo import ProviderRepository
 from app.infra.repos.bus_repo import BusRepository
+from app.infra.cache.query_cache import get_query_cache
 from app.domain.services.rag_service import RAGService
 from app.api.schemas.provider import ProviderQuery, ProviderResponse
 from app.domain.exceptions import (
@@ -15,16 +16,15 @@ router = APIRouter(prefix="/providers", tags=["Providers"])
 
 # Initialize langchain components
 
-_vector_store = None
 _provider_repo = None
+_bus_repo = None
 
 def get_provider_repo() -> ProviderRepository:
     """Get provider repository with langchain vector store"""
-    global _vector_store, _provider_repo
+    global _provider_repo
 
     if _provider_repo is None:
-        _vector_store = VectorStoreService()
-        _provider_repo = ProviderRepository(_vector_store)
+        _provider_repo = ProviderRepository(get_vector_store())
 
     return _provider_repo
 
@@ -42,7 +42,7 @@ def get_rag_service(
     bus_repo: BusRepository = Depends(get_bus_repo)
 ) -> RAGService:
     """Provide RAG service with initialized repos"""
-    return RAGService(provider_repo, bus_repo)
+    return RAGService(provider_repo, bus_repo, get_query_cache())
 
 @router.post("/query", response_model=ProviderResponse)
 def query_provider(
@@ -1,37 +1,87 @@
-from fastapi import APIRouter, HTTPException
+import threading
+from typing import List
+from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
-from app.infra.rag.vector_store import VectorStoreService
+from app.config import get_settings
+from app.infra.rag.vector_store import get_vector_store
 from app.infra.repos.provider_repo import ProviderRepository
 from app.infra.repos.bus_repo import BusRepository
+from app.infra.cache.query_cache import get_query_cache
+from app.infra.rag.rag_executor import get_rag_executor
 from app.domain.services.rag_service import RAGService
 
+settings = get_settings()
+
 router = APIRouter(prefix="/query", tags=["RAG Query"])
 
 class QueryRequest(BaseModel):
     query: str
 
-_vector_store = None
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+
 _provider_repo = None
 _bus_repo = None
 _rag_service = None
+_rag_service_lock = threading.Lock()
 
-def get_rag_service():
-    global _vector_store, _provider_repo, _bus_repo, _rag_service
+def get_rag_service(index: bool = True):
+    global _provider_repo, _bus_repo, _rag_service
 
     if _rag_service is None:
-        _vector_store = VectorStoreService()
-        _provider_repo = ProviderRepository(_vector_store)
-        _bus_repo = BusRepository()
-        _rag_service = RAGService(_provider_repo, _bus_repo)
+        # Warm-up and early requests may race to build the service
+        with _rag_service_lock:
+            if _rag_service is None:
+                _provider_repo = ProviderRepository(get_vector_store(), index=index)
+                _bus_repo = BusRepository()
+                _rag_service = RAGService(_provider_repo, _bus_repo, get_query_cache())
 
     return _rag_service
 
+def _worker_rag_service():
+    service = get_rag_service()
+    # Pool workers don't watch the docs; the parent reindexes them
+    if settings.RAG_EXECUTOR_PROCESSES > 0:
+        _provider_repo.refresh()
+    return service
+
+def run_query(query: str) -> dict:
+    """Answer one query with this process's RAG service"""
+    return _worker_rag_service().query(query)
+
+def run_query_batch(queries: List[str]) -> List[dict]:
+    """Answer many queries with this process's RAG service"""
+    return _worker_rag_service().query_batch(queries)
+
+def init_query_worker():
+    """
+    Load the model and build the RAG service once per worker process.
+
+    Workers only open the index; it is built once, before they start,
+    so they never write to the store at the same time.
+    """
+    get_rag_service(index=False)
+
 @router.post("")
-def query_rag(request: QueryRequest):
+async def query_rag(request: QueryRequest):
     """Unified RAG endpoint - handles ALL queries"""
     try:
-        service = get_rag_service()
-        result = service.query(request.query)
-        return result
+        return await get_rag_executor(init_query_worker).run(run_query, request.query)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.post("/batch")
+async def query_rag_batch(request: BatchQueryRequest):
+    """Answer many queries in input order, with an error entry per failed query"""
+    if len(request.queries) > settings.RAG_BATCH_MAX_QUERIES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.RAG_BATCH_MAX_QUERIES} queries per batch"
+        )
+    try:
+        results = await get_rag_executor(init_query_worker).run(
+            run_query_batch, request.queries
+        )
+        return {"results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
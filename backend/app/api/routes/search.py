@@ -1,7 +1,10 @@
 """Search route"""
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.infra.database.connection import get_db
 from app.infra.repos.bus_repo import BusRepository
+from app.infra.repos.inventory_repo import InventoryRepository
 from app.domain.services.search_service import SearchService
 from app.api.schemas.search import SearchRequest, RouteResponse
 from app.domain.exceptions import RouteNotFound
@@ -9,15 +12,17 @@ from app.domain.exceptions import RouteNotFound
 router = APIRouter(prefix="/search", tags=["Search"])
 
 @router.post("", response_model=List[RouteResponse])
-def search_buses(request: SearchRequest):
+def search_buses(request: SearchRequest, db: Session = Depends(get_db)):
     """Search for available buses"""
     try:
         repo = BusRepository()
-        service = SearchService(repo)
+        service = SearchService(repo, InventoryRepository(db))
         routes = service.search_routes(
             request.from_district,
             request.to_district,
-            request.max_price
+            request.max_price,
+            request.travel_date,
+            request.travel_time
         )
         return routes
     except RouteNotFound as e:
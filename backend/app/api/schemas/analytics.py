@@ -0,0 +1,13 @@
+"""Pydantic validation for analytics"""
+from datetime import date
+from pydantic import BaseModel
+
+class RollupResponse(BaseModel):
+    """Booking totals for one provider, route and travel date"""
+    travel_date: date
+    bus_provider: str
+    from_district: str
+    to_district: str
+    bookings: int
+    cancellations: int
+    revenue: float
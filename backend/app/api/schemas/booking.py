@@ -1,5 +1,6 @@
 """Pydantic validation for booking model"""
 from datetime import datetime, date
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class BookingCreate(BaseModel):
@@ -13,6 +14,19 @@ class BookingCreate(BaseModel):
     price: float
     travel_date: date
     travel_time: str
+    hold_id: Optional[str] = None
+
+class BookingByRouteCreate(BaseModel):
+    """Validation for booking a route at its current fare"""
+    name: str = Field(..., min_length=2)
+    phone: str = Field(..., min_length=11, max_length=15)
+    bus_provider: str
+    from_district: str
+    to_district: str
+    dropping_point: str
+    travel_date: date
+    travel_time: str
+    hold_id: Optional[str] = None
 
 class BookingCancelRequest(BaseModel):
     """Validate journey details to cancel a booking request"""
@@ -38,3 +52,37 @@ class BookingResponse(BaseModel):
     travel_time: str
     booking_date: datetime
     status: str
+
+class ManifestPassenger(BaseModel):
+    """Validation for a passenger on a manifest"""
+    name: str
+    phone: str
+    dropping_point: str
+
+class ManifestResponse(BaseModel):
+    """Validation for a departure manifest"""
+    bus_provider: str
+    travel_date: date
+    travel_time: str
+    from_district: str
+    to_district: str
+    count: int
+    passengers: Optional[List[ManifestPassenger]] = None
+
+class SeatHoldRequest(BaseModel):
+    """Validate the trip to hold a seat on"""
+    bus_provider: str
+    travel_date: date
+    travel_time: str
+    from_district: str
+    to_district: str
+
+class SeatHoldResponse(BaseModel):
+    """Validation for a seat hold"""
+    hold_id: str
+    bus_provider: str
+    travel_date: date
+    travel_time: str
+    from_district: str
+    to_district: str
+    expires_at: datetime
@@ -1,4 +1,5 @@
 """Pydantic validation for search"""
+from datetime import date
 from typing import Optional
 from pydantic import BaseModel
 
@@ -7,6 +8,8 @@ class SearchRequest(BaseModel):
     from_district: str
     to_district: str
     max_price: Optional[float] = None
+    travel_date: Optional[date] = None
+    travel_time: Optional[str] = None
 
 class RouteResponse(BaseModel):
     """Route response validation"""
@@ -15,3 +18,4 @@ class RouteResponse(BaseModel):
     to_district: str
     dropping_point: str
     price: float
+    available_seats: Optional[int] = None
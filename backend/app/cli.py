@@ -0,0 +1,152 @@
+"""Command line tools"""
+import argparse
+import json
+import sys
+from datetime import date
+from app.config import get_settings
+from app.infra.database.connection import SessionLocal
+from app.infra.repos.booking_repo import BookingRepository
+from app.infra.repos.rollup_repo import RollupRepository
+from app.infra.export.booking_export import EXPORT_FORMATS, get_exporter
+
+# Model and benchmark modules pull in torch and langchain, so they are
+# imported by the commands that need them rather than by every command
+
+settings = get_settings()
+
+
+def export_bookings(args: argparse.Namespace):
+    """Stream bookings to a file or stdout"""
+    exporter = get_exporter(args.format)
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    db = SessionLocal()
+    try:
+        bookings = BookingRepository(db).iter_bookings(
+            date_from=args.date_from,
+            date_to=args.date_to,
+            date_field=args.date_field,
+            bus_provider=args.provider,
+            status=args.status
+        )
+        for chunk in exporter(bookings):
+            output.write(chunk)
+    finally:
+        db.close()
+        if args.output:
+            output.close()
+
+
+def rebuild_rollups(_args: argparse.Namespace):
+    """Recompute booking rollups from the bookings table"""
+    db = SessionLocal()
+    try:
+        count = RollupRepository(db).rebuild()
+    finally:
+        db.close()
+    print(f"Rebuilt {count} rollup rows")
+
+
+def export_onnx(args: argparse.Namespace):
+    """Export the embedding model to ONNX and int8 ONNX"""
+    from app.infra.rag.model_registry import export_onnx_model
+
+    for path in export_onnx_model(args.output, args.quantization):
+        print(f"Wrote {path}")
+
+
+def benchmark_embeddings(args: argparse.Namespace):
+    """Compare embedding backends against torch on the provider docs"""
+    from app.infra.rag.embedding_benchmark import benchmark, parity_check, provider_doc_texts
+
+    texts = provider_doc_texts(args.docs_path)
+    reference_report, reference = benchmark("torch", texts)
+    print(json.dumps(reference_report))
+    for backend in args.backends:
+        report, model = benchmark(backend, texts)
+        report["parity"] = parity_check(reference, model, texts)
+        print(json.dumps(report))
+
+
+def benchmark_vector_stores_command(args: argparse.Namespace):
+    """Compare vector store backends on the provider docs"""
+    from app.infra.rag.embedding_benchmark import benchmark_vector_stores, provider_documents
+    from app.infra.rag.model_registry import get_embedding_model
+
+    reports = benchmark_vector_stores(
+        get_embedding_model(),
+        provider_documents(args.docs_path),
+        args.backends,
+        copies=args.copies
+    )
+    for report in reports:
+        print(json.dumps(report))
+
+
+def worker_memory(args: argparse.Namespace):
+    """Resident vs unique memory of a pre-fork master and its workers"""
+    from app.preload import worker_memory_report
+
+    for report in worker_memory_report(args.master_pid):
+        print(json.dumps(report))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser with one sub-command per tool"""
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export-bookings", help="Export bookings")
+    export.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+    export.add_argument("--output", help="Output file, stdout when omitted")
+    export.add_argument("--date-from", type=date.fromisoformat)
+    export.add_argument("--date-to", type=date.fromisoformat)
+    export.add_argument(
+        "--date-field", choices=["booking_date", "travel_date"], default="booking_date"
+    )
+    export.add_argument("--provider")
+    export.add_argument("--status")
+    export.set_defaults(handler=export_bookings)
+
+    rollups = commands.add_parser("rebuild-rollups", help="Recompute booking rollups")
+    rollups.set_defaults(handler=rebuild_rollups)
+
+    onnx = commands.add_parser("export-onnx", help="Export the embedding model to ONNX")
+    onnx.add_argument("--output", default=settings.EMBEDDING_ONNX_PATH)
+    onnx.add_argument("--quantization", default=settings.EMBEDDING_ONNX_QUANTIZATION)
+    onnx.set_defaults(handler=export_onnx)
+
+    bench = commands.add_parser(
+        "benchmark-embeddings", help="Parity and latency of embedding backends vs torch"
+    )
+    # Unknown backends are rejected by the model registry
+    bench.add_argument(
+        "--backends", nargs="+", default=["onnx", "onnx-int8"], help="onnx and/or onnx-int8"
+    )
+    bench.add_argument("--docs-path", default=settings.PROVIDER_DOCS_PATH)
+    bench.set_defaults(handler=benchmark_embeddings)
+
+    stores = commands.add_parser(
+        "benchmark-vector-stores", help="Search latency of vector store backends"
+    )
+    stores.add_argument("--backends", nargs="+", default=["chroma", "numpy"])
+    stores.add_argument("--copies", type=int, default=100, help="Repeat the corpus N times")
+    stores.add_argument("--docs-path", default=settings.PROVIDER_DOCS_PATH)
+    stores.set_defaults(handler=benchmark_vector_stores_command)
+
+    memory = commands.add_parser(
+        "worker-memory", help="RSS, PSS and USS of a gunicorn master and its workers"
+    )
+    memory.add_argument("master_pid", type=int)
+    memory.set_defaults(handler=worker_memory)
+
+    return parser
+
+
+def main(argv=None):
+    """Run a command"""
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
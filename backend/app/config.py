@@ -30,7 +30,84 @@ class Settings(BaseSettings):
     #EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
     EMBEDDING_DIM: int = 768
+    # "torch", "onnx" or "onnx-int8" (dynamically quantised ONNX export)
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_PATH: str = "/app/data/onnx_model"
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx512_vnni"
     CHROMA_PERSIST_DIR: str = "/app/data/chroma_db"
+    # "chroma", "numpy" (exact search over a memory-mapped matrix) or
+    # "pgvector" (HNSW index in Postgres, shared by every replica)
+    VECTOR_STORE_BACKEND: str = "chroma"
+    VECTOR_STORE_DTYPE: str = "float32"
+    # Higher ef_search raises recall, especially under a provider filter
+    PGVECTOR_EF_SEARCH: int = 100
+    PROVIDER_DOCS_WATCH: bool = False
+    PROVIDER_DOCS_CHUNK_SIZE: int = 600
+    PROVIDER_DOCS_CHUNK_OVERLAP: int = 100
+    PROVIDER_SEARCH_OVERSAMPLE: int = 4
+    # BM25 alongside the vectors, fused with reciprocal rank fusion.
+    # Lexical hits covering at least the threshold share of the query
+    # (idf-weighted) skip the embedding; above 1 never skips
+    HYBRID_SEARCH_ENABLED: bool = True
+    LEXICAL_SHORTCIRCUIT_THRESHOLD: float = 0.9
+    HYBRID_RRF_K: int = 60
+
+    # Query embedding cache; an empty path keeps it in memory only
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2048
+    EMBEDDING_CACHE_PATH: str = "/tmp/ticketbuddy/query_embeddings.sqlite3"
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 50_000
+
+    # Coalesce concurrent query embeddings into one model call
+    EMBEDDING_BATCH_ENABLED: bool = False
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    # Longest a query waits for its batch before embedding on its own
+    EMBEDDING_BATCH_TIMEOUT_SECONDS: float = 5.0
+
+    # Worker processes for RAG queries, each with its own model; 0 keeps
+    # them on the request thread pool
+    RAG_EXECUTOR_PROCESSES: int = 0
+    RAG_EXECUTOR_TORCH_THREADS: int = 1
+    # How often a RAG worker checks whether the provider index was rebuilt
+    PROVIDER_INDEX_RELOAD_SECONDS: float = 2.0
+    # Most queries accepted by POST /api/query/batch
+    RAG_BATCH_MAX_QUERIES: int = 500
+
+    # The duplicate filter only sees writes made by its own process, so it
+    # is only safe with a single worker: startup fails if another process
+    # on the host holds it or WEB_CONCURRENCY > 1; gunicorn_conf forces it off.
+    DUPLICATE_FILTER_ENABLED: bool = False
+    DUPLICATE_FILTER_LOCK_PATH: str = "/tmp/ticketbuddy/duplicate_filter.lock"
+    DUPLICATE_FILTER_CAPACITY: int = 100_000
+    DUPLICATE_FILTER_ERROR_RATE: float = 0.01
+
+    BOOKING_GROUP_COMMIT_ENABLED: bool = False
+    BOOKING_GROUP_COMMIT_WINDOW_MS: float = 5.0
+    BOOKING_GROUP_COMMIT_MAX_BATCH: int = 100
+    # Longest a request waits for its batch to commit
+    BOOKING_GROUP_COMMIT_TIMEOUT_SECONDS: float = 30.0
+
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_MAX_ENTRIES: int = 100_000
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0
+
+    # "sqlite" shares entries between workers on one host, "memory" is
+    # per-process and "none" disables the cache.
+    BOOKING_CACHE_BACKEND: str = "sqlite"
+    BOOKING_CACHE_PATH: str = "/tmp/ticketbuddy/booking_cache.sqlite3"
+    BOOKING_CACHE_MAX_ENTRIES: int = 10_000
+    BOOKING_CACHE_TTL_SECONDS: float = 60.0
+
+    # Same backends as the booking cache; keys carry the catalogue and
+    # index versions, so the TTL only bounds how long unused answers linger.
+    QUERY_CACHE_BACKEND: str = "sqlite"
+    QUERY_CACHE_PATH: str = "/tmp/ticketbuddy/query_cache.sqlite3"
+    QUERY_CACHE_MAX_ENTRIES: int = 10_000
+    QUERY_CACHE_TTL_SECONDS: float = 600.0
+
+    DEFAULT_SEAT_CAPACITY: int = 40
+    SEAT_HOLD_MINUTES: float = 10.0
 
     def get_absolute_path(self, relative_path: str) -> str:
         """Convert relative path to absolute path"""
@@ -19,12 +19,57 @@ class Booking:
     booking_date: Optional[datetime] = None
     status: str = "confirmed"
 
+    @property
+    def trip(self) -> "Trip":
+        """Departure this booking is for"""
+        return Trip(
+            bus_provider=self.bus_provider,
+            travel_date=self.travel_date,
+            travel_time=self.travel_time,
+            from_district=self.from_district,
+            to_district=self.to_district
+        )
+
     def cancel(self):
         """Cancel a booking"""
         if self.status == "canceled":
             raise ValueError("Booking already canceled")
         self.status = "canceled"
 
+@dataclass(frozen=True)
+class Trip:
+    """A single departure of a provider on a route"""
+    bus_provider: str
+    travel_date: date
+    travel_time: str
+    from_district: str
+    to_district: str
+
+@dataclass
+class SeatHold:
+    """Seat held for a trip until it is booked or expires"""
+    hold_id: str
+    trip: Trip
+    expires_at: datetime
+
+@dataclass
+class ManifestEntry:
+    """Passenger on a departure manifest"""
+    name: str
+    phone: str
+    dropping_point: str
+
+@dataclass
+class BookingRollup:
+    """Booking totals for one provider, route and travel date"""
+    travel_date: date
+    bus_provider: str
+    from_district: str
+    to_district: str
+    bookings: int
+    cancellations: int
+    revenue: float
+
 @dataclass
 class BusRoute:
     """Bus route class"""
@@ -33,6 +78,7 @@ class BusRoute:
     to_district: str
     dropping_point: str
     price: float
+    available_seats: Optional[int] = None
 
 @dataclass
 class Provider:
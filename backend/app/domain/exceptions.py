@@ -59,6 +59,28 @@ class DuplicateBooking(BookingException):
             }
         )
 
+class SeatsSoldOut(BookingException):
+    """Raised when a trip has no seats left"""
+
+    def __init__(self, bus_provider: str, travel_date: date, travel_time: str):
+        super().__init__(
+            message="No seats available on this coach",
+            details={
+                "bus_provider": bus_provider,
+                "travel_date": travel_date,
+                "travel_time": travel_time
+            }
+        )
+
+class SeatHoldNotFound(BookingException):
+    """Raised when a seat hold is unknown, expired or for another trip"""
+
+    def __init__(self, hold_id: str):
+        super().__init__(
+            message=f"Seat hold {hold_id} not found or expired",
+            details={"hold_id": hold_id}
+        )
+
 # Search exceptions
 class SearchException(DomainException):
     """Base exception for search-related errors"""
@@ -0,0 +1,28 @@
+"""Service for booking analytics"""
+from datetime import date
+from typing import List, Optional
+from app.domain.entities import BookingRollup
+
+
+class AnalyticsService:
+    """Read booking rollups for dashboards"""
+
+    def __init__(self, rollup_repo):
+        self.rollup_repo = rollup_repo
+
+    def get_rollups(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        bus_provider: Optional[str] = None,
+        from_district: Optional[str] = None,
+        to_district: Optional[str] = None
+    ) -> List[BookingRollup]:
+        """Bookings, cancellations and revenue per provider, route and day"""
+        return self.rollup_repo.find(
+            date_from=date_from,
+            date_to=date_to,
+            bus_provider=bus_provider,
+            from_district=from_district,
+            to_district=to_district
+        )
@@ -2,7 +2,7 @@
 from typing import List
 import re
 from datetime import date
-from app.domain.entities import Booking
+from app.domain.entities import Booking, ManifestEntry, SeatHold, Trip
 from app.domain.exceptions import (
     BookingNotFound,
     InvalidBooking,
@@ -11,16 +11,27 @@ from app.domain.exceptions import (
     InvalidDate,
     InvalidPrice,
     BookingAlreadyCanceled,
-    DuplicateBooking
+    DuplicateBooking,
+    SeatsSoldOut,
+    SeatHoldNotFound
 )
 
 class BookingService:
     """Create, get and cancel Booking """
-    def __init__(self, booking_repo):
+    def __init__(self, booking_repo, inventory_repo=None, bus_repo=None):
         self.booking_repo = booking_repo
+        self.inventory_repo = inventory_repo
+        self.bus_repo = bus_repo
+
+    def create_booking_by_route(self, data: dict) -> Booking:
+        """Create booking with the fare resolved from the catalogue"""
+        data['price'] = self._current_fare(data)
+        return self.create_booking(data)
 
     def create_booking(self, data: dict) -> Booking:
         """Create booking"""
+        hold_id = data.pop('hold_id', None)
+
         name = data.get('name', '').strip()
         if not name or len(name) < 2:
             raise InvalidName(name, "Name must be at least characters")
@@ -42,6 +53,9 @@ class BookingService:
             if not data.get(field):
                 raise InvalidBooking(f"{field.replace('_', ' ').title()} is required", field)
 
+        if self.bus_repo and abs(price - self._current_fare(data)) > 0.005:
+            raise InvalidPrice(price, "Price does not match the current fare")
+
         if self.booking_repo.check_duplicate(
             phone=phone,
             travel_date=travel_date,
@@ -58,8 +72,28 @@ class BookingService:
                 data["bus_provider"]
             )
 
-        booking = Booking(**data)
-        return self.booking_repo.save(booking)
+        if hold_id and not self.inventory_repo:
+            raise SeatHoldNotFound(hold_id)
+
+        # The seat, or the hold's seat, is taken in the booking's own
+        # transaction and raises SeatsSoldOut or SeatHoldNotFound
+        return self.booking_repo.save(
+            Booking(**data),
+            take_seat=self.inventory_repo is not None,
+            hold_id=hold_id
+        )
+
+    def hold_seat(self, trip: Trip) -> SeatHold:
+        """Hold a seat on a trip for a few minutes during checkout"""
+        seat_hold = self.inventory_repo.hold(trip)
+        if seat_hold is None:
+            raise SeatsSoldOut(trip.bus_provider, trip.travel_date, trip.travel_time)
+        return seat_hold
+
+    def release_hold(self, hold_id: str):
+        """Release a seat hold before it expires"""
+        if not self.inventory_repo.release_hold(hold_id):
+            raise SeatHoldNotFound(hold_id)
 
     def get_bookings_by_phone(self, phone: str) -> List[Booking]:
         """Get bookings via phone number"""
@@ -74,6 +108,32 @@ class BookingService:
             raise BookingNotFound(booking_id)
         return booking
 
+    def get_manifest(
+        self,
+        bus_provider: str,
+        travel_date: date,
+        travel_time: str,
+        from_district: str,
+        to_district: str
+    ) -> List[ManifestEntry]:
+        """Get confirmed passengers for a departure"""
+        return self.booking_repo.find_manifest(
+            bus_provider, travel_date, travel_time, from_district, to_district
+        )
+
+    def count_manifest(
+        self,
+        bus_provider: str,
+        travel_date: date,
+        travel_time: str,
+        from_district: str,
+        to_district: str
+    ) -> int:
+        """Count confirmed passengers for a departure"""
+        return self.booking_repo.count_manifest(
+            bus_provider, travel_date, travel_time, from_district, to_district
+        )
+
     def cancel_booking_by_details(
         self,
         phone: str,
@@ -105,6 +165,9 @@ class BookingService:
             raise BookingAlreadyCanceled(booking.id)
 
         booking.cancel()
+        # Committed by update, together with the status change
+        if self.inventory_repo:
+            self.inventory_repo.release(booking.trip)
         return self.booking_repo.update(booking)
 
     def cancel_booking(self, booking_id: int) -> Booking:
@@ -116,8 +179,25 @@ class BookingService:
             raise BookingAlreadyCanceled(booking_id)
 
         booking.cancel()
+        # Committed by update, together with the status change
+        if self.inventory_repo:
+            self.inventory_repo.release(booking.trip)
         return self.booking_repo.update(booking)
 
+    def _current_fare(self, data: dict) -> float:
+        """Look up the fare for the booked route in the catalogue"""
+        fare = self.bus_repo.get_fare(
+            data.get('bus_provider'),
+            data.get('from_district'),
+            data.get('to_district'),
+            data.get('dropping_point')
+        )
+        if fare is None:
+            raise InvalidBooking(
+                "No bus serves this route and dropping point", "dropping_point"
+            )
+        return fare
+
     def _is_valid_phone(self, phone: str) -> bool:
         """Validate phone number format"""
         phone = phone.replace(' ', '').replace('-', '')
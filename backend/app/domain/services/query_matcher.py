@@ -0,0 +1,130 @@
+"""Single-pass matcher for intents and entities in user queries"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+MONTHS = (
+    'january', 'february', 'march', 'april', 'may', 'june', 'july',
+    'august', 'september', 'october', 'november', 'december'
+)
+
+# Keyword -> intents it signals
+INTENT_KEYWORDS = {
+    'cancellation': ['cancel', 'cancellation', 'refund'],
+    'provider_info': [
+        'contact', 'phone', 'email', 'address', 'call', 'reach',
+        'privacy', 'policy', 'terms', 'details', 'information',
+        'located', 'office', 'website', 'number'
+    ],
+    # Words that make a provider question about routes instead
+    'route_hint': ['from', 'to', 'between', 'route', 'price', 'taka', 'fare'],
+    'route': [
+        'bus', 'buses', 'route', 'routes', 'from', 'to', 'between', 'operating',
+        'price', 'prices', 'taka', 'fare', 'fares', 'cost', 'cheap', 'under',
+        'over', 'travel', 'available'
+    ],
+    'price': ['price', 'prices', 'taka', 'fare', 'fares', 'cost', 'cheap'],
+    # Which provider field the user asks for
+    'contact': ['phone', 'call', 'contact', 'number'],
+    'address': ['address', 'location', 'where', 'office'],
+    'email': ['email', 'mail'],
+    'policy': ['privacy', 'policy', 'terms']
+}
+
+@dataclass
+class QueryMatch:
+    """Everything the matcher found in one query"""
+    intents: Set[str] = field(default_factory=set)
+    provider: Optional[str] = None
+    districts: List[str] = field(default_factory=list)
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    max_price: Optional[int] = None
+    date: Optional[str] = None
+
+
+class QueryMatcher:
+    """
+    One compiled regex over every keyword, provider and district.
+
+    Alternatives are longest first and anchored on word boundaries, so
+    "to" never matches inside "contact" and "green line" wins over any
+    shorter name. A query is scanned once with `finditer`; direction
+    words seen before a district decide whether it is the origin or
+    the destination.
+    """
+
+    def __init__(self, providers: Tuple[str, ...], districts: Tuple[str, ...]):
+        self.terms: Dict[str, Tuple[str, str]] = {}
+        for name in providers:
+            self.terms[name.lower()] = ('provider', name)
+        for name in districts:
+            self.terms[name.lower()] = ('district', name)
+
+        self.keyword_intents: Dict[str, Set[str]] = {}
+        for intent, words in INTENT_KEYWORDS.items():
+            for word in words:
+                self.keyword_intents.setdefault(word, set()).add(intent)
+                self.terms.setdefault(word, ('keyword', word))
+
+        terms = '|'.join(
+            re.escape(term).replace(r'\ ', r'\s+')
+            for term in sorted(self.terms, key=len, reverse=True)
+        )
+        months = '|'.join(MONTHS)
+        self.pattern = re.compile(
+            rf"\b(?:(?P<date>\d+\s*(?:st|nd|rd|th)?\s*(?:{months}))"
+            rf"|(?P<price>\d+)\s*taka"
+            rf"|(?P<term>{terms}))\b"
+        )
+
+    def match(self, query: str) -> QueryMatch:
+        """Scan a normalised query once"""
+        result = QueryMatch()
+        direction = None
+
+        for m in self.pattern.finditer(query):
+            if m.group('date'):
+                result.date = m.group('date')
+                continue
+            if m.group('price'):
+                result.max_price = int(m.group('price'))
+                result.intents.update(self.keyword_intents['taka'])
+                continue
+
+            kind, value = self.terms[' '.join(m.group('term').split())]
+            if kind == 'provider':
+                result.provider = result.provider or value
+            elif kind == 'district':
+                if value not in result.districts:
+                    result.districts.append(value)
+                    if direction == 'to' and result.destination is None:
+                        result.destination = value
+                    elif direction == 'from' and result.origin is None:
+                        result.origin = value
+                direction = None
+            else:
+                result.intents.update(self.keyword_intents[value])
+                if value in ('from', 'to'):
+                    direction = value
+
+        # Districts without a direction word fill the gaps in query order
+        for district in result.districts:
+            if district in (result.origin, result.destination):
+                continue
+            if result.origin is None:
+                result.origin = district
+            elif result.destination is None:
+                result.destination = district
+        return result
+
+
+@lru_cache(maxsize=8)
+def get_query_matcher(
+    version: str,
+    providers: Tuple[str, ...],
+    districts: Tuple[str, ...]
+) -> QueryMatcher:
+    """Compiled matcher for one catalogue version"""
+    return QueryMatcher(providers, districts)
@@ -1,114 +1,239 @@
 """Enhanced RAG service with better query understanding"""
 import re
-from functools import lru_cache
-from hashlib import md5
 from typing import Dict, Optional, List
 from app.config import get_settings
+from app.domain.services.query_matcher import QueryMatch, QueryMatcher, get_query_matcher
 
 settings = get_settings()
 
+# Spellings that should hit the same cache entry and handler
+QUERY_ALIASES = {
+    'chittagong': 'chattogram',
+    'ctg': 'chattogram',
+    'cumilla': 'comilla',
+    'bogura': 'bogra',
+    'barisal': 'barishal',
+    'tk': 'taka',
+    'taka.': 'taka'
+}
+
+# Words that make token order meaningful (origin before destination)
+ORDERED_QUERY_WORDS = {'from', 'to', 'between'}
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, drop punctuation, collapse whitespace and apply aliases"""
+    query = re.sub(r"[?!,;:\"'()\[\]]", ' ', query.lower())
+    return ' '.join(QUERY_ALIASES.get(token, token) for token in query.split())
+
 class RAGService:
     """Handle RAG-based queries with intelligent routing"""
 
-    def __init__(self, provider_repo, bus_repo):
+    def __init__(self, provider_repo, bus_repo, result_cache=None):
         self.provider_repo = provider_repo
         self.bus_repo = bus_repo
+        self.result_cache = result_cache
 
         # Cache providers for faster lookups
         self._provider_names_cache = None
         self._districts_cache = None
-        self._query_cache = {}
 
     @property
     def provider_names(self) -> List[str]:
-        """Cached provider names"""
-        if self._provider_names_cache is None:
-            self._provider_names_cache = [p['name'] for p in self.bus_repo.get_providers()]
-        return self._provider_names_cache
+        """Cached provider names for the current catalogue version"""
+        version = getattr(self.bus_repo, 'version', '')
+        if self._provider_names_cache is None or self._provider_names_cache[0] != version:
+            self._provider_names_cache = (
+                version, [p['name'] for p in self.bus_repo.get_providers()]
+            )
+        return self._provider_names_cache[1]
+
+    @property
+    def matcher(self) -> QueryMatcher:
+        """Compiled matcher for the current catalogue version"""
+        return get_query_matcher(
+            getattr(self.bus_repo, 'version', ''),
+            tuple(self.provider_names),
+            tuple(self.districts)
+        )
 
     @property
     def districts(self) -> List[str]:
-        """Cached district names"""
-        if self._districts_cache is None:
-            self._districts_cache = self.bus_repo.get_districts()
-        return self._districts_cache
+        """Cached district names for the current catalogue version"""
+        version = getattr(self.bus_repo, 'version', '')
+        if self._districts_cache is None or self._districts_cache[0] != version:
+            self._districts_cache = (version, self.bus_repo.get_districts())
+        return self._districts_cache[1]
 
     def query(self, query: str) -> Dict:
         """
         Unified query handler with intelligent routing.
         
-        Routes queries to appropriate handlers:
+        The query is scanned once by the catalogue's compiled matcher,
+        then routed to exactly one handler:
         - RAG for provider information (contact, policies)
         - Database for route/price searches
         - Hybrid for cancellation workflows
         """
-        query = query.lower()
+        query = normalize_query(query)
+
+        cache_key = None
+        if self.result_cache is not None:
+            cache_key = self._cache_key(query)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        match = self.matcher.match(query)
+        route = self._route(match)
+
+        if route == 'cancellation':
+            result = self._handle_cancellation_query(match)
+        elif route == 'provider_info':
+            # Provider information queries (USE RAG)
+            result = self._handle_rag_contact_query(query, match)
+        elif route == 'route':
+            # Route/price queries (USE DATABASE)
+            result = self._handle_route_query(match)
+        else:
+            # Default: Try RAG first, then inform user
+            result = self._handle_ambiguous_query(query, match)
+
+        self._cache_result(cache_key, result)
+        return result
+
+    def query_batch(self, queries: List[str]) -> List[Dict]:
+        """
+        Answer many queries, embedding the ones that need RAG together.
 
-        cache_key = md5(query.encode()).hexdigest()
+        Every query is normalised, looked up in the cache and routed as
+        in `query`. Database and card answers are built straight away;
+        the queries left for semantic search are embedded in one model
+        call and searched in bulk. Results keep the input order, and a
+        failing query gets an `error` entry without failing the others.
+        """
+        results: List[Optional[Dict]] = [None] * len(queries)
+        # (index, normalised query, match, route, cache key) waiting on RAG
+        pending = []
+
+        for i, raw_query in enumerate(queries):
+            try:
+                query = normalize_query(raw_query)
+                cache_key = None
+                if self.result_cache is not None:
+                    cache_key = self._cache_key(query)
+                    cached = self.result_cache.get(cache_key)
+                    if cached is not None:
+                        results[i] = {"query": raw_query, "result": cached}
+                        continue
+
+                match = self.matcher.match(query)
+                route = self._route(match)
+                if route == 'cancellation':
+                    result = self._handle_cancellation_query(match)
+                elif route == 'route':
+                    result = self._handle_route_query(match)
+                else:
+                    card = self.provider_repo.get_card(match.provider) \
+                        if route == 'provider_info' and match.provider else None
+                    if card is None:
+                        pending.append((i, query, match, route, cache_key))
+                        continue
+                    result = self._format_card_response(match, card)
+
+                self._cache_result(cache_key, result)
+                results[i] = {"query": raw_query, "result": result}
+            except Exception as e:
+                results[i] = {"query": raw_query, "error": str(e)}
+
+        if pending:
+            search_error = None
+            try:
+                searches = self.provider_repo.batch_semantic_search([
+                    (query, match.provider, 3 if route == 'provider_info' else 1)
+                    for _, query, match, route, _ in pending
+                ])
+            except Exception as e:
+                print(f"RAG batch error: {e}")
+                search_error = str(e)
+                searches = [None] * len(pending)
+
+            for (i, _, match, route, cache_key), hits in zip(pending, searches):
+                if route == 'provider_info':
+                    result = self._answer_from_hits(match, hits)
+                elif hits is None:
+                    # A single ambiguous query fails outright too
+                    results[i] = {"query": queries[i], "error": search_error}
+                    continue
+                else:
+                    result = self._answer_ambiguous(match, hits)
+                self._cache_result(cache_key, result)
+                results[i] = {"query": queries[i], "result": result}
+        return results
+
+    def _route(self, match: QueryMatch) -> str:
+        """Which handler answers a matched query"""
+        intents = match.intents
+        # Provider info when the user asks about a provider, unless the
+        # question is about its routes or prices
+        is_provider_info = (
+            ('provider_info' in intents and (match.provider or 'route_hint' not in intents))
+            or (match.provider and 'route_hint' not in intents)
+        )
 
-        if cache_key in self._query_cache:
-            result = self._query_cache[cache_key]
-        # 1. Cancellation queries
-        if self._is_cancellation_query(query):
-            result = self._handle_cancellation_query(query)
+        if 'cancellation' in intents:
+            return 'cancellation'
+        if is_provider_info:
+            return 'provider_info'
+        if 'route' in intents:
+            return 'route'
+        return 'ambiguous'
 
-        # 2. Provider information queries (USE RAG)
-        if self._is_provider_info_query(query):
-            result = self._handle_rag_contact_query(query)
+    def _cache_result(self, cache_key: Optional[str], result: Dict):
+        # Failures are worth retrying, so only answers are cached
+        if cache_key is not None and result.get("query_type") != "error":
+            self.result_cache.set(cache_key, result)
 
-        # 3. Route/price queries (USE DATABASE)
-        if self._is_route_query(query):
-            result = self._handle_route_query(query)
+    def _cache_key(self, query: str) -> str:
+        """
+        Key an answer by data versions and the canonical query.
 
-        # 4. Default: Try RAG first, then inform user
-        else:
-            result = self._handle_ambiguous_query(query)
-        
-        if len(self._query_cache) > 100:
-            self._query_cache.pop(next(iter(self._query_cache)))
-        self._query_cache[cache_key] = result
-        return result
+        Multi-word provider and district names are joined into single
+        tokens. Tokens are then sorted unless order changes the answer:
+        the query has numbers, direction words, or two or more districts,
+        which fill origin and destination in the order they appear.
+        """
+        canonical = f" {query} "
+        for name in sorted(self.provider_names + self.districts, key=len, reverse=True):
+            name = name.lower()
+            if ' ' in name:
+                canonical = canonical.replace(f" {name} ", f" {name.replace(' ', '_')} ")
+        tokens = canonical.split()
+        district_tokens = {name.lower().replace(' ', '_') for name in self.districts}
+        ordered = (
+            ORDERED_QUERY_WORDS.intersection(tokens)
+            or any(c.isdigit() for c in query)
+            or sum(token in district_tokens for token in tokens) >= 2
+        )
+        if not ordered:
+            tokens.sort()
+
+        catalogue_version = getattr(self.bus_repo, 'version', '')
+        index_version = getattr(self.provider_repo, 'index_version', '')
+        return f"{catalogue_version}:{index_version}:{' '.join(tokens)}"
 
-    def _is_cancellation_query(self, query: str) -> bool:
-        """Detect cancellation intent"""
-        return any(word in query for word in ['cancel', 'cancellation', 'refund'])
-
-    def _is_provider_info_query(self, query: str) -> bool:
-        """Detect if query is about provider information (RAG territory)"""
-        provider_keywords = [
-            'contact', 'phone', 'email', 'address', 'call', 'reach',
-            'privacy', 'policy', 'terms', 'details', 'information',
-            'located', 'office', 'website', 'number'
-        ]
-
-        route_keywords = ['from', 'to', 'between', 'route', 'price', 'taka', 'fare']
-
-        has_provider_keyword = any(word in query for word in provider_keywords)
-        has_route_keyword = any(word in query for word in route_keywords)
-        has_provider_name = any(prov.lower() in query for prov in self.provider_names)
-
-        # Provider info if:
-        # - Has provider keywords AND (has provider name OR no route keywords)
-        # - Has provider name but no route keywords
-        return (has_provider_keyword and (has_provider_name or not has_route_keyword)) or \
-               (has_provider_name and not has_route_keyword)
-
-    def _is_route_query(self, query: str) -> bool:
-        """Detect if query is about routes/prices"""
-        route_keywords = [
-            'bus', 'route', 'from', 'to', 'between', 'operating',
-            'price', 'taka', 'fare', 'cost', 'cheap', 'under', 'over',
-            'travel', 'available'
-        ]
-        return any(word in query for word in route_keywords)
-
-    def _handle_rag_contact_query(self, query: str) -> Dict:
+    def _handle_rag_contact_query(self, query: str, match: QueryMatch) -> Dict:
         """
         Handle provider information queries using RAG.
         This is the CORE RAG functionality.
         """
-        # Extract provider name if mentioned
-        provider_name = self._extract_provider_name(query)
+        provider_name = match.provider
+
+        # A named provider is answered from its card without embedding the query
+        if provider_name:
+            card = self.provider_repo.get_card(provider_name)
+            if card:
+                return self._format_card_response(match, card)
 
         try:
             # Use semantic search with LangChain
@@ -117,37 +242,27 @@ class RAGService:
                 provider_name=provider_name,
                 k=3  # Get top 3 most relevant chunks;
             )
-
-            if not results:
-                return self._no_results_response(provider_name)
-
-            # Build answer from RAG results
-            return self._format_rag_response(query, results)
-
         except Exception as e:
             print(f"RAG error: {e}")
-            return self._error_response(provider_name)
-
-    def _format_rag_response(self, query: str, results: List[Dict]) -> Dict:
+            results = None
+        return self._answer_from_hits(match, results)
+
+    def _answer_from_hits(self, match: QueryMatch, results: Optional[List[Dict]]) -> Dict:
+        """Provider answer from search results; None means the search failed"""
+        if results is None:
+            return self._error_response(match.provider)
+        if not results:
+            return self._no_results_response(match.provider)
+        # Build answer from RAG results
+        return self._format_rag_response(match, results)
+
+    def _format_rag_response(self, match: QueryMatch, results: List[Dict]) -> Dict:
         """Format response based on query intent and RAG results"""
         top_result = results[0]
         contact = top_result['contact_info']
 
-        # Determine what user is asking for
-        if any(word in query for word in ['phone', 'call', 'contact', 'number']):
-            answer = self._format_contact_answer(contact)
-        elif any(word in query for word in ['address', 'location', 'where', 'office']):
-            answer = self._format_address_answer(contact)
-        elif any(word in query for word in ['email', 'mail']):
-            answer = self._format_email_answer(contact)
-        elif any(word in query for word in ['privacy', 'policy', 'terms']):
-            answer = self._format_policy_answer(top_result)
-        else:
-            # General query - provide comprehensive info
-            answer = self._format_comprehensive_answer(contact)
-
         return {
-            "answer": answer,
+            "answer": self._format_provider_answer(match, contact, top_result['policy']),
             "query_type": "provider_info_rag",
             "provider": contact['provider'],
             "similarity_score": top_result.get('similarity', 0),
@@ -155,6 +270,36 @@ class RAGService:
             "rag_used": True  # Flag to show RAG was used
         }
 
+    def _format_card_response(self, match: QueryMatch, card: Dict) -> Dict:
+        """Format response from a precomputed provider card"""
+        return {
+            "answer": self._format_provider_answer(match, card['contact'], card['policy']),
+            "query_type": "provider_info_rag",
+            "provider": card['provider'],
+            "similarity_score": 1.0,
+            "sources": [card['provider']],
+            "rag_used": False,
+            "answer_source": "provider_card"
+        }
+
+    def _format_provider_answer(
+        self,
+        match: QueryMatch,
+        contact: Dict,
+        policy_lines: List[str]
+    ) -> str:
+        """Pick the answer format from what the user is asking for"""
+        if 'contact' in match.intents:
+            return self._format_contact_answer(contact)
+        if 'address' in match.intents:
+            return self._format_address_answer(contact)
+        if 'email' in match.intents:
+            return self._format_email_answer(contact)
+        if 'policy' in match.intents:
+            return self._format_policy_answer(contact, policy_lines)
+        # General query - provide comprehensive info
+        return self._format_comprehensive_answer(contact)
+
     def _format_contact_answer(self, contact: Dict) -> str:
         """Format contact information answer"""
         answer = f"📞 {contact['provider']} Contact Information:\n\n"
@@ -184,27 +329,16 @@ class RAGService:
             answer += "Email not available in records.\n"
         return answer.strip()
 
-    def _format_policy_answer(self, result: Dict) -> str:
+    def _format_policy_answer(self, contact: Dict, policy_lines: List[str]) -> str:
         """Format privacy policy answer"""
-        provider = result['contact_info']['provider']
-        content = result['content']
-
-        # Extract policy-related content
-        lines = content.split('\n')
-        policy_lines = [
-            line.strip() for line in lines
-            if any(word in line.lower() for word in ['privacy', 'policy', 'data', 'collect'])
-            and line.strip()
-        ]
-
-        answer = f"🔒 {provider} Privacy Policy:\n\n"
+        answer = f"🔒 {contact['provider']} Privacy Policy:\n\n"
         if policy_lines:
             answer += '\n'.join(policy_lines[:5])  # Top 5 relevant lines
         else:
             answer += "Privacy policy details not available. Please check their website.\n"
 
-        if result['contact_info'].get('website'):
-            answer += f"\n\nWebsite: {result['contact_info']['website']}"
+        if contact.get('website'):
+            answer += f"\n\nWebsite: {contact['website']}"
 
         return answer.strip()
 
@@ -223,13 +357,10 @@ class RAGService:
 
         return answer.strip()
 
-    def _handle_route_query(self, query: str) -> Dict:
+    def _handle_route_query(self, match: QueryMatch) -> Dict:
         """Handle route and price queries using database"""
-        # Extract districts
-        from_dist, to_dist = self._extract_districts(query)
-
-        # Extract price constraint
-        max_price = self._extract_price(query)
+        from_dist, to_dist = match.origin, match.destination
+        max_price = match.max_price
 
         if not from_dist or not to_dist:
             return {
@@ -256,7 +387,7 @@ class RAGService:
         # Format response based on query intent
         providers = list(set([r.provider for r in routes]))
 
-        if max_price or any(word in query for word in ['price', 'taka', 'fare', 'cost', 'cheap']):
+        if max_price or 'price' in match.intents:
             # Price-focused query
             answer = f"🚌 Found {len(routes)} buses from {from_dist} to {to_dist}"
             if max_price:
@@ -289,10 +420,10 @@ class RAGService:
                 "total_routes": len(routes)
             }
 
-    def _handle_cancellation_query(self, query: str) -> Dict:
+    def _handle_cancellation_query(self, match: QueryMatch) -> Dict:
         """Handle booking cancellation queries"""
-        from_dist, to_dist = self._extract_districts(query)
-        date_info = self._extract_date(query)
+        from_dist, to_dist = match.origin, match.destination
+        date_info = match.date
 
         answer = "📋 To cancel your booking:\n\n"
         answer += "Use: POST /api/bookings/cancel\n\n"
@@ -316,14 +447,15 @@ class RAGService:
             "date": date_info
         }
 
-    def _handle_ambiguous_query(self, query: str) -> Dict:
+    def _handle_ambiguous_query(self, query: str, match: QueryMatch) -> Dict:
         """Handle queries that don't fit clear categories"""
         # Try RAG as default
+        return self._answer_ambiguous(match, self.provider_repo.semantic_search(query, k=1))
 
-        results = self.provider_repo.semantic_search(query, k=1)
+    def _answer_ambiguous(self, match: QueryMatch, results: List[Dict]) -> Dict:
+        """A confident RAG hit, otherwise the list of things we can help with"""
         if results and results[0].get('similarity', 0) > 0.5:
-            return self._format_rag_response(query.lower(), results)
-
+            return self._format_rag_response(match, results)
 
         return {
             "answer": "I can help you with:\n\n" +
@@ -337,42 +469,6 @@ class RAGService:
             "available_districts": self.districts
         }
 
-    # Helper methods
-    def _extract_provider_name(self, query: str) -> Optional[str]:
-        """Extract provider name from query"""
-        for provider in self.provider_names:
-            if provider.lower() in query:
-                return provider
-        return None
-    
-    def _extract_districts(self, query: str) -> tuple:
-        """Extract from and to districts"""
-        query_normalized = query.replace('chittagong', 'chattogram')
-        from_dist = None
-        to_dist = None
-        
-        for dist in self.districts:
-            if dist.lower() in query_normalized:
-                if from_dist is None:
-                    from_dist = dist
-                elif to_dist is None:
-                    to_dist = dist
-        
-        return from_dist, to_dist
-    
-    def _extract_price(self, query: str) -> Optional[int]:
-        """Extract price constraint"""
-        price_match = re.search(r'(\d+)\s*taka', query)
-        return int(price_match.group(1)) if price_match else None
-
-    def _extract_date(self, query: str) -> Optional[str]:
-        """Extract date information"""
-        date_match = re.search(
-            r'(\d+)\s*(st|nd|rd|th)?\s*(january|february|march|april|may|june|july|august|september|october|november|december)',
-            query
-        )
-        return date_match.group(0) if date_match else None
-
     def _no_results_response(self, provider_name: Optional[str]) -> Dict:
         """Response when RAG finds no results"""
         if provider_name:
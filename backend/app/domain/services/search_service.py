@@ -1,20 +1,24 @@
 """Service for searching"""
 
+from datetime import date
 from typing import List, Optional
-from app.domain.entities import BusRoute
+from app.domain.entities import BusRoute, Trip
 from app.domain.exceptions import RouteNotFound
 
 class SearchService:
     """Search buses"""
 
-    def __init__(self, bus_repo):
+    def __init__(self, bus_repo, inventory_repo=None):
         self.bus_repo = bus_repo
+        self.inventory_repo = inventory_repo
 
     def search_routes(
         self,
         from_district: str,
         to_district: str,
-        max_price: Optional[float] = None
+        max_price: Optional[float] = None,
+        travel_date: Optional[date] = None,
+        travel_time: Optional[str] = None
     ) -> List[BusRoute]:
         """Search routes for available buses"""
         routes = self.bus_repo.search_routes(
@@ -26,8 +30,27 @@ class SearchService:
         if not routes:
             raise RouteNotFound(from_district, to_district)
 
+        if travel_date and travel_time and self.inventory_repo:
+            self._add_availability(routes, travel_date, travel_time)
+
         return routes
 
+    def _add_availability(self, routes: List[BusRoute], travel_date: date, travel_time: str):
+        """Fill in live seat counts; held seats are already taken"""
+        trips = [
+            Trip(
+                bus_provider=route.provider,
+                travel_date=travel_date,
+                travel_time=travel_time,
+                from_district=route.from_district,
+                to_district=route.to_district
+            )
+            for route in routes
+        ]
+        available = self.inventory_repo.get_available(trips)
+        for route, trip in zip(routes, trips):
+            route.available_seats = available[trip]
+
     def get_districts(self) -> List[str]:
         """Get all districts"""
         return self.bus_repo.get_districts()
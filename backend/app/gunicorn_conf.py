@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for pre-forked workers sharing one preloaded model.
+
+    gunicorn -c python:app.gunicorn_conf app.main:app
+
+Set the worker count with WEB_CONCURRENCY. The master imports the app
+and loads the model before forking, so each worker adds only its
+private memory; `python -m app.cli worker-memory <master pid>` shows
+how much that is. Tables and the provider index are prepared once by
+the master too; workers skip that part of startup.
+
+State that would otherwise live in each worker is shared or turned off:
+seat holds and counters are rows in Postgres, and the duplicate booking
+filter, which can only see its own worker's bookings, is disabled.
+"""
+import os
+
+# Every worker would keep its own duplicate filter and miss the bookings
+# written by the others; set before the app (and its settings) is imported
+os.environ["DUPLICATE_FILTER_ENABLED"] = "false"
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+
+def on_starting(_server):
+    """Load shared state in the master, before any worker is forked"""
+    from app.preload import preload
+    preload()
@@ -0,0 +1,224 @@
+"""Read-through cache for bookings by phone number"""
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from app.config import get_settings
+from app.domain.entities import Booking
+from app.infra.cache.sqlite_store import SQLiteKV
+
+settings = get_settings()
+
+
+def canonical_phone(phone: str) -> str:
+    """Phone number without spaces or dashes"""
+    return phone.replace(' ', '').replace('-', '').strip()
+
+
+def _dump_bookings(bookings: List[Booking]) -> str:
+    rows = []
+    for booking in bookings:
+        row = asdict(booking)
+        row['price'] = float(row['price'])
+        row['travel_date'] = booking.travel_date.isoformat()
+        row['booking_date'] = booking.booking_date.isoformat() if booking.booking_date else None
+        rows.append(row)
+    return json.dumps(rows)
+
+
+def _load_bookings(payload: str) -> List[Booking]:
+    bookings = []
+    for row in json.loads(payload):
+        row['travel_date'] = date.fromisoformat(row['travel_date'])
+        if row['booking_date']:
+            row['booking_date'] = datetime.fromisoformat(row['booking_date'])
+        bookings.append(Booking(**row))
+    return bookings
+
+
+class BookingCache(ABC):
+    """
+    Base class for per-phone booking caches.
+
+    Entries are grouped by canonical phone so one invalidation drops
+    every spelling of the number. Readers take a generation token
+    before querying the database; `set` is ignored when a write
+    invalidated the phone in between, so a slow reader can never
+    store a stale list.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @abstractmethod
+    def get(self, phone: str) -> Tuple[Optional[List[Booking]], int]:
+        """Cached bookings (or None) and a generation token for `set`"""
+
+    @abstractmethod
+    def set(self, phone: str, bookings: List[Booking], token: int):
+        """Store bookings unless the phone was invalidated since `get`"""
+
+    @abstractmethod
+    def invalidate(self, *phones: str):
+        """Drop cached bookings for the given phones"""
+
+    def stats(self) -> dict:
+        """Hit and miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+class MemoryBookingCache(BookingCache):
+    """LRU + TTL cache local to one process"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, phone: str) -> Tuple[Optional[List[Booking]], int]:
+        canonical = canonical_phone(phone)
+        key = (canonical, phone)
+        with self._lock:
+            token = self._generations.get(canonical, 0)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None, token
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _load_bookings(entry[1]), token
+
+    def set(self, phone: str, bookings: List[Booking], token: int):
+        canonical = canonical_phone(phone)
+        with self._lock:
+            if self._generations.get(canonical, 0) != token:
+                return
+            self._entries[(canonical, phone)] = (
+                time.monotonic() + self.ttl,
+                _dump_bookings(bookings)
+            )
+            self._entries.move_to_end((canonical, phone))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *phones: str):
+        with self._lock:
+            for canonical in {canonical_phone(p) for p in phones}:
+                self._generations[canonical] = self._generations.get(canonical, 0) + 1
+                for key in [k for k in self._entries if k[0] == canonical]:
+                    del self._entries[key]
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "entries": len(self._entries), **super().stats()}
+
+
+class SQLiteBookingCache(BookingCache):
+    """
+    TTL cache in a SQLite file shared by all workers on a host.
+
+    Hits are read-only, so a busy phone does not turn every lookup into
+    a write. When over `max_entries`, the oldest-written entries go
+    first; with a TTL of about a minute that is close to LRU anyway.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.path = path
+        self.store = SQLiteKV(path, "phone_bookings", max_entries, ttl_seconds)
+        self.store.connection().execute("""
+            CREATE TABLE IF NOT EXISTS phone_generations (
+                canonical TEXT PRIMARY KEY,
+                generation INTEGER NOT NULL
+            )
+        """)
+
+    def _generation(self, conn: sqlite3.Connection, canonical: str) -> int:
+        row = conn.execute(
+            "SELECT generation FROM phone_generations WHERE canonical = ?",
+            (canonical,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, phone: str) -> Tuple[Optional[List[Booking]], int]:
+        canonical = canonical_phone(phone)
+        token = self._generation(self.store.connection(), canonical)
+        payload = self.store.get(phone, group=canonical)
+        if payload is None:
+            self.misses += 1
+            return None, token
+        self.hits += 1
+        return _load_bookings(payload), token
+
+    def set(self, phone: str, bookings: List[Booking], token: int):
+        canonical = canonical_phone(phone)
+        with self.store.transaction() as conn:
+            if self._generation(conn, canonical) == token:
+                self.store.put(phone, _dump_bookings(bookings), group=canonical)
+
+    def invalidate(self, *phones: str):
+        canonicals = {canonical_phone(p) for p in phones}
+        with self.store.transaction() as conn:
+            for canonical in canonicals:
+                conn.execute(
+                    "INSERT INTO phone_generations VALUES (?, 1) "
+                    "ON CONFLICT(canonical) DO UPDATE SET generation = generation + 1",
+                    (canonical,)
+                )
+                self.store.delete_group(canonical)
+        self.invalidations += len(canonicals)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": self.store.count(),
+            **super().stats()
+        }
+
+
+_booking_cache: Optional[BookingCache] = None
+_booking_cache_lock = threading.Lock()
+
+
+def get_booking_cache() -> Optional[BookingCache]:
+    """Process-wide booking cache for the configured backend, or None"""
+    global _booking_cache
+
+    backend = settings.BOOKING_CACHE_BACKEND
+    if backend == "none":
+        return None
+    if _booking_cache is None:
+        with _booking_cache_lock:
+            if _booking_cache is None:
+                if backend == "sqlite":
+                    _booking_cache = SQLiteBookingCache(
+                        settings.BOOKING_CACHE_PATH,
+                        settings.BOOKING_CACHE_MAX_ENTRIES,
+                        settings.BOOKING_CACHE_TTL_SECONDS
+                    )
+                elif backend == "memory":
+                    _booking_cache = MemoryBookingCache(
+                        settings.BOOKING_CACHE_MAX_ENTRIES,
+                        settings.BOOKING_CACHE_TTL_SECONDS
+                    )
+                else:
+                    raise ValueError(f"Unknown booking cache backend: {backend}")
+    return _booking_cache
@@ -0,0 +1,248 @@
+"""In-process counting Bloom filter for the duplicate-booking check"""
+import fcntl
+import math
+import os
+import threading
+from datetime import date
+from hashlib import blake2b
+from typing import Iterable, Optional
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.infra.database.models import BookingDB
+
+settings = get_settings()
+
+
+def duplicate_key(
+    phone: str,
+    travel_date,
+    travel_time: str,
+    bus_provider: str,
+    from_district: str,
+    to_district: str,
+    dropping_point: str
+) -> str:
+    """Normalise journey details into a single filter key"""
+    normalized_phone = phone.replace(' ', '').replace('-', '').strip()
+    if isinstance(travel_date, date):
+        travel_date = travel_date.isoformat()
+    parts = [
+        normalized_phone,
+        str(travel_date).strip(),
+        travel_time.strip().lower(),
+        bus_provider.strip().lower(),
+        from_district.strip().lower(),
+        to_district.strip().lower(),
+        dropping_point.strip().lower()
+    ]
+    return "|".join(parts)
+
+
+class CountingBloomFilter:
+    """
+    Counting Bloom filter over booking keys.
+
+    Each slot is a one-byte counter so keys can be removed again when a
+    booking is canceled. A negative answer is exact; a positive answer
+    only means the key may be present.
+    """
+
+    MAX_COUNT = 255
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = self._optimal_size(self.capacity, error_rate)
+        self.hash_count = self._optimal_hash_count(self.size, self.capacity)
+        self.counters = bytearray(self.size)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _optimal_size(capacity: int, error_rate: float) -> int:
+        return int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+
+    @staticmethod
+    def _optimal_hash_count(size: int, capacity: int) -> int:
+        return max(1, int(round(size / capacity * math.log(2))))
+
+    def _positions(self, key: str) -> list:
+        digest = blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str):
+        """Add a key"""
+        with self._lock:
+            for pos in self._positions(key):
+                if self.counters[pos] < self.MAX_COUNT:
+                    self.counters[pos] += 1
+            self.count += 1
+
+    def remove(self, key: str):
+        """Remove a key that was previously added"""
+        with self._lock:
+            positions = self._positions(key)
+            # Never decrement for a key that is definitely absent
+            if not all(self.counters[pos] for pos in positions):
+                return
+            for pos in positions:
+                # Saturated counters stay put, they may belong to many keys
+                if self.counters[pos] < self.MAX_COUNT:
+                    self.counters[pos] -= 1
+            self.count = max(self.count - 1, 0)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.counters[pos] for pos in self._positions(key))
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Estimated false-positive rate for the current number of keys"""
+        if self.count == 0:
+            return 0.0
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes used by the counter array"""
+        return len(self.counters)
+
+
+class DuplicateBookingFilter:
+    """Fast path for BookingRepository.check_duplicate"""
+
+    def __init__(self, capacity: int = None, error_rate: float = None):
+        self.filter = CountingBloomFilter(
+            capacity or settings.DUPLICATE_FILTER_CAPACITY,
+            error_rate or settings.DUPLICATE_FILTER_ERROR_RATE
+        )
+        self.ready = False
+        # Bookings travelling before this date were not loaded on rebuild
+        self.window_start: Optional[date] = None
+        self.checks = 0
+        self.skipped_queries = 0
+
+    def rebuild(self, db: Session):
+        """Load confirmed bookings in the active travel window from the database"""
+        window_start = date.today()
+        rows = db.query(
+            BookingDB.phone,
+            BookingDB.travel_date,
+            BookingDB.travel_time,
+            BookingDB.bus_provider,
+            BookingDB.from_district,
+            BookingDB.to_district,
+            BookingDB.dropping_point
+        ).filter(
+            BookingDB.status == "confirmed",
+            BookingDB.travel_date >= window_start
+        ).yield_per(1000)
+
+        keys = [duplicate_key(*row) for row in rows]
+        new_filter = CountingBloomFilter(
+            max(settings.DUPLICATE_FILTER_CAPACITY, len(keys) * 2),
+            settings.DUPLICATE_FILTER_ERROR_RATE
+        )
+        for key in keys:
+            new_filter.add(key)
+        self.filter = new_filter
+        self.window_start = window_start
+        self.ready = True
+        print(f"Duplicate filter rebuilt with {len(keys)} bookings")
+
+    def might_contain(self, key: str, travel_date=None) -> bool:
+        """False means the booking definitely does not exist"""
+        self.checks += 1
+        if isinstance(travel_date, str):
+            travel_date = date.fromisoformat(travel_date)
+        if not self.ready or key in self.filter:
+            return True
+        if travel_date is not None and travel_date < self.window_start:
+            # Outside the window loaded on rebuild, so only the database knows
+            return True
+        self.skipped_queries += 1
+        return False
+
+    def add(self, key: str):
+        """Record a confirmed booking"""
+        self.filter.add(key)
+
+    def remove(self, key: str):
+        """Forget a canceled booking"""
+        self.filter.remove(key)
+
+    def add_many(self, keys: Iterable[str]):
+        """Record several confirmed bookings"""
+        for key in keys:
+            self.filter.add(key)
+
+    def stats(self) -> dict:
+        """Filter size and effectiveness"""
+        return {
+            "ready": self.ready,
+            "keys": self.filter.count,
+            "capacity": self.filter.capacity,
+            "slots": self.filter.size,
+            "hash_functions": self.filter.hash_count,
+            "false_positive_rate": self.filter.false_positive_rate,
+            "target_false_positive_rate": self.filter.error_rate,
+            "memory_bytes": self.filter.memory_bytes,
+            "checks": self.checks,
+            "skipped_queries": self.skipped_queries
+        }
+
+
+_duplicate_filter: Optional[DuplicateBookingFilter] = None
+_duplicate_filter_lock = threading.Lock()
+# Held open for the life of the process that owns the filter
+_single_process_lock = None
+
+
+def _claim_single_process():
+    """
+    Fail unless this is the only process on the host serving bookings.
+
+    The filter only sees bookings written by its own process; with
+    several workers (`uvicorn --workers N`, WEB_CONCURRENCY) each would
+    answer "definitely not present" for the others' bookings and let
+    duplicates through.
+    """
+    global _single_process_lock
+
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    if workers > 1:
+        raise RuntimeError(
+            f"DUPLICATE_FILTER_ENABLED needs a single worker, WEB_CONCURRENCY is {workers}"
+        )
+    path = settings.DUPLICATE_FILTER_LOCK_PATH
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    lock_file = open(path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError as e:
+        lock_file.close()
+        raise RuntimeError(
+            "DUPLICATE_FILTER_ENABLED needs a single worker, but another process "
+            f"already holds {path}"
+        ) from e
+    _single_process_lock = lock_file
+
+
+def get_duplicate_filter() -> Optional[DuplicateBookingFilter]:
+    """
+    Process-wide duplicate filter, or None when disabled.
+
+    Raises RuntimeError when more than one process would keep a filter;
+    startup builds it first, so a misconfigured worker never serves.
+    """
+    global _duplicate_filter
+
+    if not settings.DUPLICATE_FILTER_ENABLED:
+        return None
+    if _duplicate_filter is None:
+        with _duplicate_filter_lock:
+            if _duplicate_filter is None:
+                _claim_single_process()
+                _duplicate_filter = DuplicateBookingFilter()
+    return _duplicate_filter
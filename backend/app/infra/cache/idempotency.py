@@ -0,0 +1,115 @@
+"""In-memory TTL store for idempotent request replay"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Any, Optional, Tuple
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request payload"""
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(',', ':'))
+    return sha256(encoded.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class IdempotencyRecord:
+    """Stored outcome of the first request for a key"""
+    fingerprint: str
+    expires_at: float
+    status_code: Optional[int] = None
+    body: Any = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def completed(self) -> bool:
+        """Whether a response has been stored"""
+        return self.status_code is not None
+
+
+class IdempotencyKeyMismatch(Exception):
+    """Raised when a key is reused with a different payload"""
+
+
+class IdempotencyStore:
+    """
+    Remember the first response per idempotency key.
+
+    The first caller for a key owns it and runs the request; concurrent
+    callers with the same key wait until the owner stores its response
+    or releases the key. This is a single-process stand-in for a shared
+    table.
+    """
+
+    def __init__(self, ttl_seconds: int = None, max_entries: int = None):
+        self.ttl = ttl_seconds or settings.IDEMPOTENCY_TTL_SECONDS
+        self.max_entries = max_entries or settings.IDEMPOTENCY_MAX_ENTRIES
+        # In-flight keys, and finished ones in completion order; every
+        # finished record gets the same TTL, so that is also expiry order
+        self._pending = {}
+        self._completed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[IdempotencyRecord, bool]:
+        """Return the record for a key and whether the caller owns it"""
+        with self._lock:
+            self._purge()
+            record = self._completed.get(key) or self._pending.get(key)
+            if record is not None:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyMismatch(key)
+                return record, False
+
+            record = IdempotencyRecord(
+                fingerprint=fingerprint,
+                expires_at=time.monotonic() + self.ttl
+            )
+            self._pending[key] = record
+            return record, True
+
+    def complete(self, key: str, status_code: int, body: Any):
+        """Store the response for a key and wake up waiters"""
+        with self._lock:
+            record = self._pending.pop(key, None)
+            if record is None:
+                return
+            record.status_code = status_code
+            record.body = body
+            record.expires_at = time.monotonic() + self.ttl
+            self._completed[key] = record
+        record.done.set()
+
+    def release(self, key: str):
+        """Forget an unfinished key so a later retry can run again"""
+        with self._lock:
+            record = self._pending.pop(key, None)
+        if record is not None:
+            record.done.set()
+
+    def _purge(self):
+        # Expired and over-capacity records are both at the front, so this
+        # is amortised O(1) per call
+        now = time.monotonic()
+        while self._completed:
+            record = next(iter(self._completed.values()))
+            over_capacity = len(self._pending) + len(self._completed) > self.max_entries
+            if record.expires_at > now and not over_capacity:
+                break
+            self._completed.popitem(last=False)
+
+
+_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Process-wide idempotency store"""
+    global _store
+
+    if _store is None:
+        _store = IdempotencyStore()
+    return _store
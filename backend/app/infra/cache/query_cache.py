@@ -0,0 +1,142 @@
+"""Result cache for RAG queries"""
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from app.config import get_settings
+from app.infra.cache.sqlite_store import SQLiteKV
+
+settings = get_settings()
+
+
+class QueryResultCache(ABC):
+    """
+    Base class for RAG answer caches.
+
+    Keys already include the catalogue and index versions, so entries
+    for old data are never read again and simply age out. Values are
+    stored as JSON so every hit hands out a fresh copy.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        """Cached result, or None"""
+
+    @abstractmethod
+    def set(self, key: str, result: dict):
+        """Store a result"""
+
+    def stats(self) -> dict:
+        """Hit and miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+class MemoryQueryCache(QueryResultCache):
+    """LRU + TTL cache local to one process"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[1])
+
+    def set(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, json.dumps(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "entries": len(self._entries), **super().stats()}
+
+
+class SQLiteQueryCache(QueryResultCache):
+    """LRU + TTL cache in a SQLite file shared by all workers on a host"""
+
+    # A hit records its access at most once a minute, so popular queries
+    # stay read-only while LRU order is still roughly kept
+    TOUCH_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.path = path
+        self.store = SQLiteKV(
+            path,
+            "query_results",
+            max_entries,
+            ttl_seconds,
+            touch_interval=self.TOUCH_INTERVAL_SECONDS
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        payload = self.store.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key: str, result: dict):
+        self.store.put(key, json.dumps(result))
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": self.store.count(),
+            **super().stats()
+        }
+
+
+_query_cache: Optional[QueryResultCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> Optional[QueryResultCache]:
+    """Process-wide query result cache for the configured backend, or None"""
+    global _query_cache
+
+    backend = settings.QUERY_CACHE_BACKEND
+    if backend == "none":
+        return None
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                if backend == "sqlite":
+                    _query_cache = SQLiteQueryCache(
+                        settings.QUERY_CACHE_PATH,
+                        settings.QUERY_CACHE_MAX_ENTRIES,
+                        settings.QUERY_CACHE_TTL_SECONDS
+                    )
+                elif backend == "memory":
+                    _query_cache = MemoryQueryCache(
+                        settings.QUERY_CACHE_MAX_ENTRIES,
+                        settings.QUERY_CACHE_TTL_SECONDS
+                    )
+                else:
+                    raise ValueError(f"Unknown query cache backend: {backend}")
+    return _query_cache
@@ -0,0 +1,136 @@
+"""Key-value tables in SQLite files shared by workers on a host"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+COLUMNS = ["grp", "key", "value", "expires_at", "accessed_at"]
+
+
+class SQLiteKV:
+    """
+    One key-value table in a SQLite file.
+
+    Each thread gets its own WAL-mode connection, so readers in every
+    worker on the host run concurrently. Keys live in a group, which
+    can be dropped at once. Entries expire after `ttl_seconds` (None
+    keeps them), and every `trim_every` writes the table is cut back to
+    `max_entries`, least recently used first. A hit only records its
+    access when the last one is older than `touch_interval` seconds
+    (None never does), so hot keys don't turn reads into writes.
+
+    The file only holds cache data, so a table left by an older layout
+    is dropped rather than migrated.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        touch_interval: Optional[float] = None,
+        trim_every: int = 64,
+        mmap_size: int = 0
+    ):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.touch_interval = touch_interval
+        self.trim_every = trim_every
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        conn = self.connection()
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if columns and columns != COLUMNS:
+            conn.execute(f"DROP TABLE {table}")
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                grp TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (grp, key)
+            );
+            CREATE INDEX IF NOT EXISTS ix_{table}_accessed ON {table} (accessed_at);
+        """)
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, in autocommit mode"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.mmap_size:
+                conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; get and put inside it join it"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, key: str, group: str = '') -> Optional[Any]:
+        """Stored value, or None when missing or expired"""
+        conn = self.connection()
+        row = conn.execute(
+            f"SELECT value, expires_at, accessed_at FROM {self.table} WHERE grp = ? AND key = ?",
+            (group, key)
+        ).fetchone()
+        now = time.time()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        if self.touch_interval is not None and now - row[2] >= self.touch_interval:
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE grp = ? AND key = ?",
+                (now, group, key)
+            )
+        return row[0]
+
+    def put(self, key: str, value: Any, group: str = ''):
+        """Store a value and trim the table now and then"""
+        now = time.time()
+        self.connection().execute(
+            f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+            (group, key, value, now + self.ttl if self.ttl is not None else None, now)
+        )
+        self._writes += 1
+        # Trimming counts the table, so only do it every few writes
+        if self._writes % self.trim_every == 0:
+            self.trim()
+
+    def delete_group(self, group: str):
+        """Drop every key in a group"""
+        self.connection().execute(f"DELETE FROM {self.table} WHERE grp = ?", (group,))
+
+    def trim(self):
+        """Drop expired rows, then the least recently used beyond `max_entries`"""
+        conn = self.connection()
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        overflow = self.count() - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ("
+                f"SELECT rowid FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+
+    def count(self) -> int:
+        """Rows in the table, including expired ones not trimmed yet"""
+        return self.connection().execute(f"SELECT count(*) FROM {self.table}").fetchone()[0]
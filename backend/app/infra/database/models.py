@@ -1,11 +1,32 @@
 """Create booking model"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime
+from sqlalchemy import (
+    CheckConstraint, Column, Integer, String, Numeric, Date, DateTime, Index, Text, text
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import declarative_base
+from pgvector.sqlalchemy import Vector
+from app.config import get_settings
 from app.infra.database.connection import Base
 
+settings = get_settings()
+
+# Tables that need the pgvector extension; only created when the
+# pgvector store is selected, so plain Postgres keeps working
+VectorBase = declarative_base()
+
 class BookingDB(Base):
     """DB model for booking"""
     __tablename__="bookings"
+    __table_args__ = (
+        # Covers manifest lookups so they are answered by index-only scans
+        Index(
+            "ix_bookings_manifest",
+            "bus_provider", "travel_date", "travel_time",
+            "from_district", "to_district", "status",
+            postgresql_include=["name", "phone", "dropping_point"]
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     phone = Column(String, nullable=False, index=True)
@@ -18,3 +39,85 @@ class BookingDB(Base):
     travel_time = Column(String, nullable=False)
     booking_date = Column(DateTime, default=datetime.utcnow)
     status = Column(String, default="confirmed", index=True)
+
+
+class BookingRollupDB(Base):
+    """Daily booking totals per provider and route"""
+    __tablename__ = "booking_rollups"
+    travel_date = Column(Date, primary_key=True)
+    bus_provider = Column(String, primary_key=True)
+    from_district = Column(String, primary_key=True)
+    to_district = Column(String, primary_key=True)
+    bookings = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    cancellations = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    revenue = Column(Numeric(14, 2), nullable=False, default=0, server_default=text("0"))
+
+
+class TripInventoryDB(Base):
+    """Seat counter per departure"""
+    __tablename__ = "trip_inventory"
+    __table_args__ = (
+        CheckConstraint("available >= 0 AND available <= capacity", name="ck_trip_inventory_available"),
+    )
+    bus_provider = Column(String, primary_key=True)
+    travel_date = Column(Date, primary_key=True)
+    travel_time = Column(String, primary_key=True)
+    from_district = Column(String, primary_key=True)
+    to_district = Column(String, primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    available = Column(Integer, nullable=False)
+
+
+class SeatHoldDB(Base):
+    """Seat taken from a trip's inventory while the customer checks out"""
+    __tablename__ = "seat_holds"
+    hold_id = Column(String, primary_key=True)
+    bus_provider = Column(String, nullable=False)
+    travel_date = Column(Date, nullable=False)
+    travel_time = Column(String, nullable=False)
+    from_district = Column(String, nullable=False)
+    to_district = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+def ensure_indexes(engine):
+    """Create indexes added after the tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+class ProviderChunkDB(VectorBase):
+    """Embedded provider document chunk"""
+    __tablename__ = "provider_chunks"
+    __table_args__ = (
+        Index(
+            "ix_provider_chunks_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
+    id = Column(String, primary_key=True)
+    provider = Column(String, nullable=False, index=True)
+    content = Column(Text, nullable=False)
+    doc_metadata = Column("metadata", JSONB, nullable=False)
+    embedding = Column(Vector(settings.EMBEDDING_DIM), nullable=False)
+
+
+class ProviderDocManifestDB(VectorBase):
+    """Content hash and chunk ids of each indexed provider file"""
+    __tablename__ = "provider_doc_manifest"
+    source = Column(String, primary_key=True)
+    hash = Column(String, nullable=False)
+    ids = Column(JSONB, nullable=False)
+    chunking = Column(String)
+    model = Column(String)
+
+
+def ensure_vector_tables(engine):
+    """Enable pgvector and create the provider chunk tables"""
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    VectorBase.metadata.create_all(engine)
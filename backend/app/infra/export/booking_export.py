@@ -0,0 +1,146 @@
+"""Incremental CSV, NDJSON and Parquet writers for booking exports"""
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+from app.domain.entities import Booking
+
+EXPORT_FIELDS = [
+    "id", "name", "phone", "bus_provider", "from_district", "to_district",
+    "dropping_point", "price", "travel_date", "travel_time", "booking_date", "status"
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet")
+}
+
+
+class ExportFormatUnavailable(Exception):
+    """Raised when an export format is unknown or its library is missing"""
+
+
+def _to_record(booking: Booking) -> dict:
+    return {
+        "id": booking.id,
+        "name": booking.name,
+        "phone": booking.phone,
+        "bus_provider": booking.bus_provider,
+        "from_district": booking.from_district,
+        "to_district": booking.to_district,
+        "dropping_point": booking.dropping_point,
+        "price": float(booking.price),
+        "travel_date": booking.travel_date.isoformat(),
+        "travel_time": booking.travel_time,
+        "booking_date": booking.booking_date.isoformat() if booking.booking_date else None,
+        "status": booking.status
+    }
+
+
+def _batched(bookings: Iterable[Booking], size: int) -> Iterator[list]:
+    batch = []
+    for booking in bookings:
+        batch.append(_to_record(booking))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(bookings: Iterable[Booking], chunk_rows: int = 500) -> Iterator[bytes]:
+    """Yield CSV bytes, one chunk per `chunk_rows` bookings"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in _batched(bookings, chunk_rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(bookings: Iterable[Booking], chunk_rows: int = 500) -> Iterator[bytes]:
+    """Yield newline-delimited JSON bytes"""
+    for batch in _batched(bookings, chunk_rows):
+        yield "".join(json.dumps(record) + "\n" for record in batch).encode("utf-8")
+
+
+def stream_parquet(bookings: Iterable[Booking], chunk_rows: int = 10_000) -> Iterator[bytes]:
+    """Yield a Parquet file, one row group per `chunk_rows` bookings"""
+    pa, pq = _import_pyarrow()
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("phone", pa.string()),
+        ("bus_provider", pa.string()),
+        ("from_district", pa.string()),
+        ("to_district", pa.string()),
+        ("dropping_point", pa.string()),
+        ("price", pa.float64()),
+        ("travel_date", pa.string()),
+        ("travel_time", pa.string()),
+        ("booking_date", pa.string()),
+        ("status", pa.string())
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batched(bookings, chunk_rows):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out bytes as they are written"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet records absolute offsets, so keep counting across drains
+        return self.position
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far"""
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportFormatUnavailable("Parquet export requires the pyarrow package") from e
+    return pa, pq
+
+
+def get_exporter(export_format: str):
+    """Return the stream function for a format"""
+    if export_format == "csv":
+        return stream_csv
+    if export_format == "ndjson":
+        return stream_ndjson
+    if export_format == "parquet":
+        _import_pyarrow()
+        return stream_parquet
+    raise ExportFormatUnavailable(f"Unknown export format: {export_format}")
@@ -0,0 +1,88 @@
+"""Section-aware chunking of provider documents"""
+import re
+from dataclasses import dataclass
+from typing import List
+
+CONTACT_LABELS = ('Address:', 'Contact', 'Phone', 'Tel:', 'Email:', 'Link:')
+BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+@dataclass
+class Chunk:
+    """A piece of a provider document and where it came from"""
+    section: str
+    offset: int
+    text: str
+
+
+def classify_section(block: str, index: int) -> str:
+    """Name a paragraph by what it holds"""
+    if any(label in block for label in CONTACT_LABELS):
+        return "contact"
+    lines = block.strip().splitlines()
+    if index == 0 and len(lines) == 1 and not lines[0].rstrip().endswith('.'):
+        return "title"
+    return "policy"
+
+
+def split_sections(content: str) -> List[Chunk]:
+    """Split on blank lines, keeping each paragraph's character offset"""
+    sections = []
+    for match in re.finditer(r'\S(?:.*?\S)?(?=\n\s*\n|\s*$)', content, re.DOTALL):
+        sections.append(Chunk(
+            section=classify_section(match.group(0), len(sections)),
+            offset=match.start(),
+            text=match.group(0)
+        ))
+    return sections
+
+
+def split_long(chunk: Chunk, chunk_size: int, overlap: int) -> List[Chunk]:
+    """Split a section on sentence or line breaks, repeating `overlap` chars"""
+    if len(chunk.text) <= chunk_size:
+        return [chunk]
+
+    pieces = []
+    start = 0
+    while start < len(chunk.text):
+        end = min(start + chunk_size, len(chunk.text))
+        if end < len(chunk.text):
+            # Cut after the last full sentence or line in the window,
+            # falling back to the last space
+            boundaries = [
+                m.start() for m in BREAK.finditer(chunk.text, start, end)
+                if m.start() > start + overlap
+            ]
+            if not boundaries:
+                boundaries = [i for i in range(start + overlap + 1, end) if chunk.text[i].isspace()]
+            if boundaries:
+                end = boundaries[-1]
+        pieces.append(Chunk(
+            section=chunk.section,
+            offset=chunk.offset + start,
+            text=chunk.text[start:end].strip()
+        ))
+        if end >= len(chunk.text):
+            break
+        start = max(end - overlap, start + 1)
+        # Start the overlap on a word boundary
+        while start < end and not chunk.text[start - 1].isspace():
+            start += 1
+    return pieces
+
+
+def chunk_document(content: str, chunk_size: int = 600, overlap: int = 100) -> List[Chunk]:
+    """Section-aware chunks; the title paragraph is folded into the first section"""
+    chunks = []
+    title = None
+    for section in split_sections(content):
+        if section.section == "title":
+            title = section
+            continue
+        if title is not None:
+            section = Chunk(section.section, title.offset, f"{title.text}\n\n{section.text}")
+            title = None
+        chunks.extend(split_long(section, chunk_size, overlap))
+    if title is not None:
+        chunks.append(title)
+    return chunks
@@ -0,0 +1,39 @@
+"""Reindex provider documents when they change on disk"""
+import threading
+from typing import Callable, Optional
+from watchfiles import watch
+
+
+class DocsWatcher:
+    """Background thread that calls `reindex` when the docs directory changes"""
+
+    def __init__(self, reindex: Callable, docs_path: str):
+        self.reindex = reindex
+        self.docs_path = docs_path
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start watching"""
+        self._thread = threading.Thread(
+            target=self._run, name="provider-docs-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        for changes in watch(
+            self.docs_path,
+            watch_filter=lambda _change, path: path.endswith('.txt'),
+            stop_event=self._stop
+        ):
+            print(f"Provider documents changed: {len(changes)} file(s)")
+            try:
+                self.reindex()
+            except Exception as e:
+                print(f"Reindexing failed: {e}")
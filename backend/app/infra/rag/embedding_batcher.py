@@ -0,0 +1,169 @@
+"""Micro-batching of concurrent query embeddings"""
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Sequence, Tuple
+from langchain_core.embeddings import Embeddings
+from app.config import get_settings
+from app.infra.rag.model_registry import get_embedding_model
+
+settings = get_settings()
+
+
+class Histogram:
+    """Counts of observations per upper bound, plus an overflow bucket"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one value"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """Bucket counts keyed by upper bound"""
+        buckets = {str(bound): n for bound, n in zip(self.bounds, self.counts)}
+        buckets["+inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": buckets
+        }
+
+
+class EmbeddingBatcher(Embeddings):
+    """
+    Coalesce concurrent `embed_query` calls into one model call.
+
+    Callers queue their text and block on a future. A background thread
+    collects texts for up to `window_ms` or `max_batch` items, embeds
+    them with a single `embed_documents` call and hands each caller its
+    own vector, so the model runs at a useful batch size instead of one
+    forward pass per request thread. A caller that waits longer than
+    EMBEDDING_BATCH_TIMEOUT_SECONDS embeds its text directly instead.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None
+    ):
+        self.embeddings = embeddings
+        self.window = (window_ms or settings.EMBEDDING_BATCH_WINDOW_MS) / 1000
+        self.max_batch = max_batch or settings.EMBEDDING_BATCH_MAX_SIZE
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_delay_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100])
+        self.fallbacks = 0
+        self._stats_lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, float, Future]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Already a batch, no point queueing it
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if not self._thread.is_alive():
+            return self._embed_directly(text)
+        future = self.submit(text)
+        try:
+            return future.result(timeout=settings.EMBEDDING_BATCH_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            # Dropped from its batch if still queued; a stuck or slow
+            # batch must not hold the request for good
+            future.cancel()
+            return self._embed_directly(text)
+
+    def _embed_directly(self, text: str) -> List[float]:
+        with self._stats_lock:
+            self.fallbacks += 1
+        return self.embeddings.embed_query(text)
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for the next batch"""
+        future = Future()
+        self._queue.put((text, time.perf_counter(), future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:  # pylint: disable=broad-except
+                # Keep the thread alive for later callers
+                print(f"Embedding batch failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch: List[Tuple[str, float, Future]]):
+        # Callers that gave up waiting have already embedded their text
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.batch_sizes.observe(len(batch))
+            for _, queued_at, _ in batch:
+                self.queue_delay_ms.observe((started - queued_at) * 1000)
+
+        try:
+            vectors = self.embeddings.embed_documents([text for text, _, _ in batch])
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, _, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def stats(self) -> dict:
+        """Batch size and queueing delay histograms"""
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch": self.max_batch,
+                "fallbacks": self.fallbacks,
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_delay_ms": self.queue_delay_ms.snapshot()
+            }
+
+
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_embedding_batcher(model_name: Optional[str] = None) -> EmbeddingBatcher:
+    """Process-wide batcher in front of a shared model"""
+    name = model_name or settings.EMBEDDING_MODEL
+    if name not in _batchers:
+        with _batchers_lock:
+            if name not in _batchers:
+                _batchers[name] = EmbeddingBatcher(get_embedding_model(name))
+    return _batchers[name]
+
+
+def embedding_batcher_report() -> List[dict]:
+    """Stats of every batcher in this process"""
+    return [{"model": name, **b.stats()} for name, b in list(_batchers.items())]
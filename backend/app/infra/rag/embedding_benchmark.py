@@ -0,0 +1,212 @@
+"""Parity and latency checks between embedding and vector store backends"""
+import gc
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+from typing import List, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from app.config import get_settings
+from app.infra.rag.model_registry import load_embedding_model
+from app.infra.rag.vector_store import build_provider_documents, create_store
+
+settings = get_settings()
+
+BENCHMARK_QUERIES = [
+    "hanif contact number",
+    "green line office address",
+    "desh travel email",
+    "shyamoli privacy policy",
+    "how is my personal data stored",
+    "soudia phone",
+    "ena counter at mohakhali",
+    "which bus company is in panthapath",
+]
+
+
+def provider_documents(docs_path: str) -> List[Document]:
+    """Chunks exactly as the vector store embeds them"""
+    documents = []
+    for filename in sorted(os.listdir(docs_path)):
+        if not filename.endswith('.txt'):
+            continue
+        with open(os.path.join(docs_path, filename), 'r', encoding='utf-8') as f:
+            documents.extend(build_provider_documents(filename, f.read()))
+    return documents
+
+
+def provider_doc_texts(docs_path: str) -> List[str]:
+    """Chunk texts exactly as the vector store embeds them"""
+    return [doc.page_content for doc in provider_documents(docs_path)]
+
+
+def _rss_mb() -> float:
+    """Resident memory of this process"""
+    with open('/proc/self/statm', 'r', encoding='utf-8') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def parity_check(
+    reference: Embeddings,
+    candidate: Embeddings,
+    texts: List[str],
+    queries: List[str] = BENCHMARK_QUERIES
+) -> dict:
+    """
+    How closely a backend reproduces the reference vectors.
+
+    Reports per-text cosine similarity between the two backends and how
+    often the top document for a query is the same under both.
+    """
+    ref_docs = np.array(reference.embed_documents(texts))
+    cand_docs = np.array(candidate.embed_documents(texts))
+    ref_queries = np.array([reference.embed_query(q) for q in queries])
+    cand_queries = np.array([candidate.embed_query(q) for q in queries])
+
+    # Both backends normalise, so the row-wise dot product is the cosine
+    cosines = np.sum(ref_docs * cand_docs, axis=1)
+    ref_top = np.argmax(ref_queries @ ref_docs.T, axis=1)
+    cand_top = np.argmax(cand_queries @ cand_docs.T, axis=1)
+    return {
+        "texts": len(texts),
+        "queries": len(queries),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine": round(float(cosines.min()), 5),
+        "top1_agreement": round(float(np.mean(ref_top == cand_top)), 3)
+    }
+
+
+def benchmark(
+    backend: str,
+    texts: List[str],
+    queries: List[str] = BENCHMARK_QUERIES,
+    rounds: int = 5
+) -> Tuple[dict, Embeddings]:
+    """
+    Load time, memory and latency of one backend, and the loaded model.
+
+    Memory is the resident-set growth from loading, so backends loaded
+    later in the same process share libraries already paid for.
+    """
+    gc.collect()
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = load_embedding_model(backend=backend)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = _rss_mb()
+
+    model.embed_documents(queries[:2])
+    latencies = []
+    for _ in range(rounds):
+        for query in queries:
+            start = time.perf_counter()
+            model.embed_query(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.embed_documents(texts)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "model_rss_mb": round(rss_loaded - rss_before, 1),
+        "rss_mb": round(_rss_mb(), 1),
+        "query_p50_ms": round(statistics.median(latencies), 2),
+        "query_p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 2),
+        "docs_per_second": round(len(texts) / batch_seconds, 1) if batch_seconds else None
+    }, model
+
+
+def benchmark_vector_stores(
+    embeddings: Embeddings,
+    documents: List[Document],
+    backends: List[str],
+    copies: int = 1,
+    k: int = 3,
+    rounds: int = 20
+) -> List[dict]:
+    """
+    Search latency of vector store backends on the same vectors.
+
+    The corpus is repeated `copies` times to reach a realistic size, and
+    queries are embedded once up front so only the search is timed.
+    Top-k texts are compared with the first backend; copies tie, so ids
+    would not be comparable. pgvector has no scratch directory and uses
+    the configured database, so its benchmark rows are deleted again.
+    """
+    corpus = [
+        Document(page_content=doc.page_content, metadata=doc.metadata, id=f"benchmark-{copy}-{i}")
+        for copy in range(copies) for i, doc in enumerate(documents)
+    ]
+    texts = [doc.page_content for doc in corpus]
+    vectors = embeddings.embed_documents(texts)
+    query_vectors = [embeddings.embed_query(q) for q in BENCHMARK_QUERIES]
+    providers = sorted({doc.metadata['provider'] for doc in corpus})
+
+    class _Precomputed(Embeddings):
+        """Hand the stores the vectors computed above"""
+
+        def __init__(self):
+            self.lookup = dict(zip(texts, vectors))
+            self.lookup.update(zip(BENCHMARK_QUERIES, query_vectors))
+
+        def embed_documents(self, batch: List[str]) -> List[List[float]]:
+            return [self.lookup[text] for text in batch]
+
+        def embed_query(self, text: str) -> List[float]:
+            return self.lookup[text]
+
+    reports = []
+    reference = None
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as directory:
+            store = create_store(backend, directory, _Precomputed())
+            if backend == "pgvector" and store.count():
+                raise ValueError(
+                    "The pgvector table already holds an index; benchmark on an empty database"
+                )
+            try:
+                start = time.perf_counter()
+                store.add_documents(corpus, ids=[doc.id for doc in corpus])
+                build_seconds = time.perf_counter() - start
+
+                latencies = []
+                top_ids = []
+                for _ in range(rounds):
+                    top_ids = []
+                    for i, vector in enumerate(query_vectors):
+                        search_filter = {"provider": {"$eq": providers[i % len(providers)]}} \
+                            if i % 2 else None
+                        start = time.perf_counter()
+                        hits = store.similarity_search_by_vector_with_score(
+                            vector, k=k, filter=search_filter
+                        )
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        top_ids.append([doc.page_content for doc, _ in hits])
+
+                if reference is None:
+                    reference = top_ids
+                agreement = statistics.mean(
+                    sum((Counter(a) & Counter(b)).values()) / max(len(a), 1)
+                    for a, b in zip(reference, top_ids)
+                )
+                reports.append({
+                    "backend": backend,
+                    "rows": len(corpus),
+                    "build_seconds": round(build_seconds, 3),
+                    "search_p50_ms": round(statistics.median(latencies), 3),
+                    "search_p95_ms": round(statistics.quantiles(latencies, n=20)[-1], 3),
+                    "topk_agreement": round(agreement, 3)
+                })
+            finally:
+                # The pgvector table is the live one; leave it as it was
+                if backend == "pgvector":
+                    store.delete([doc.id for doc in corpus])
+            del store
+            gc.collect()
+    return reports
@@ -0,0 +1,228 @@
+"""Cache of query embeddings shared by workers on a host"""
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from app.config import get_settings
+from app.infra.cache.sqlite_store import SQLiteKV
+from app.infra.rag.model_registry import get_embedding_model, model_id
+from app.infra.rag.embedding_batcher import get_embedding_batcher
+
+settings = get_settings()
+
+
+def normalize_query(text: str) -> str:
+    """Lower-cased text with runs of whitespace collapsed"""
+    return ' '.join(text.lower().split())
+
+
+class EmbeddingDiskStore:
+    """
+    Query vectors in a memory-mapped SQLite file.
+
+    Every worker on the host opens the same file, so a phrasing embedded
+    by one worker is a page-cache read for the others and survives
+    restarts. Rows are grouped by model and trimmed least recently used
+    first.
+    """
+
+    # Recency only needs to be coarse for a cache that lives for days
+    TOUCH_INTERVAL_SECONDS = 3600.0
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.store = SQLiteKV(
+            path,
+            "query_embeddings",
+            max_entries,
+            touch_interval=self.TOUCH_INTERVAL_SECONDS,
+            trim_every=256,
+            mmap_size=256 * 2**20
+        )
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Stored vector, or None"""
+        blob = self.store.get(text, group=model)
+        if blob is None:
+            return None
+        return array('f', blob).tolist()
+
+    def put(self, model: str, text: str, vector: List[float]):
+        """Store a vector"""
+        self.store.put(text, array('f', vector).tobytes(), group=model)
+
+    def trim(self):
+        """Drop the least recently used rows beyond `max_entries`"""
+        self.store.trim()
+
+    def count(self) -> int:
+        """Rows in the file"""
+        return self.store.count()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that caches `embed_query` results.
+
+    Lookups go to an in-process LRU first, then to the shared disk
+    store. Keys are the normalised text and the model id, and the
+    normalised text is what gets embedded, so a cached vector is exactly
+    what a miss would have produced. Document embedding is passed
+    through untouched.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_id: str,
+        max_entries: int,
+        disk_store: Optional[EmbeddingDiskStore] = None
+    ):
+        self.embeddings = embeddings
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.disk_store = disk_store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        self.hit_seconds = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        vector = self._cached(key)
+        if vector is not None:
+            return vector
+
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(key)
+        self._store_misses([key], [vector], time.perf_counter() - start)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Cached vectors for many queries, embedding the misses in one call"""
+        keys = [normalize_query(text) for text in texts]
+        vectors = [self._cached(key) for key in keys]
+        missing = list(dict.fromkeys(key for key, v in zip(keys, vectors) if v is None))
+        if missing:
+            start = time.perf_counter()
+            embedded = self.embeddings.embed_documents(missing)
+            self._store_misses(missing, embedded, time.perf_counter() - start)
+            lookup = dict(zip(missing, embedded))
+            vectors = [lookup[key] if v is None else v for key, v in zip(keys, vectors)]
+        return vectors
+
+    def _cached(self, key: str) -> Optional[List[float]]:
+        """Vector from memory or disk, counting the hit"""
+        start = time.perf_counter()
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                self.hit_seconds += time.perf_counter() - start
+                return list(vector)
+
+        if self.disk_store is not None:
+            vector = self.disk_store.get(self.model_id, key)
+            if vector is not None:
+                self._remember(key, vector)
+                with self._lock:
+                    self.disk_hits += 1
+                    self.hit_seconds += time.perf_counter() - start
+                return vector
+        return None
+
+    def _store_misses(self, keys: List[str], vectors: List[List[float]], elapsed: float):
+        for key, vector in zip(keys, vectors):
+            if self.disk_store is not None:
+                self.disk_store.put(self.model_id, key, vector)
+            self._remember(key, vector)
+        with self._lock:
+            self.misses += len(keys)
+            self.miss_seconds += elapsed
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = tuple(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit rate and estimated embedding time saved in this process"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            mean_miss = self.miss_seconds / self.misses if self.misses else 0.0
+            return {
+                "model": self.model_id,
+                "memory_entries": len(self._entries),
+                "disk_entries": self.disk_store.count() if self.disk_store else None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "mean_miss_ms": round(mean_miss * 1000, 2),
+                # What the hits would have cost as misses, less what they did cost
+                "seconds_saved": round(max(hits * mean_miss - self.hit_seconds, 0.0), 3)
+            }
+
+
+_cached: Dict[str, CachedEmbeddings] = {}
+_cached_lock = threading.Lock()
+
+
+def _query_model(name: str) -> Embeddings:
+    if settings.EMBEDDING_BATCH_ENABLED:
+        return get_embedding_batcher(name)
+    return get_embedding_model(name)
+
+
+def get_query_embeddings(model_name: Optional[str] = None) -> Embeddings:
+    """
+    Shared model for query embedding.
+
+    Wrapped in the query cache when enabled; misses go through the
+    batcher when that is enabled too.
+    """
+    name = model_name or settings.EMBEDDING_MODEL
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return _query_model(name)
+
+    if name not in _cached:
+        with _cached_lock:
+            if name not in _cached:
+                disk_store = None
+                if settings.EMBEDDING_CACHE_PATH:
+                    disk_store = EmbeddingDiskStore(
+                        settings.EMBEDDING_CACHE_PATH,
+                        settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES
+                    )
+                _cached[name] = CachedEmbeddings(
+                    _query_model(name),
+                    model_id(name),
+                    settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                    disk_store
+                )
+    return _cached[name]
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """Query vectors from one model call, through the cache when it is on"""
+    if isinstance(embeddings, CachedEmbeddings):
+        return embeddings.embed_queries(texts)
+    return embeddings.embed_documents(texts) if texts else []
+
+
+def embedding_cache_report() -> List[dict]:
+    """Stats of every query cache in this process"""
+    return [cache.stats() for cache in list(_cached.values())]
@@ -1,18 +1,11 @@
 """Create embeddings"""
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from app.config import get_settings
-
-settings = get_settings()
+from app.infra.rag.embedding_cache import get_query_embeddings
 
 class EmbeddingService:
     """Langchain-based embedding service"""
 
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.EMBEDDING_MODEL,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings or get_query_embeddings()
 
     def embed(self, text: str) -> list:
         """Generate embedding for single text"""
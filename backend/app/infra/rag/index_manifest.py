@@ -0,0 +1,100 @@
+"""Manifest of indexed provider documents"""
+import json
+import os
+from hashlib import sha256
+from typing import Dict, Optional
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from app.infra.database.models import ProviderDocManifestDB
+
+
+def content_hash(content: str) -> str:
+    """Hash of a document's text"""
+    return sha256(content.encode('utf-8')).hexdigest()
+
+
+class IndexManifest:
+    """
+    Map of source file name to content hash and stored document ids.
+
+    Kept next to the vector index so restarts only embed files whose
+    content changed since the last run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self.exists = False
+        self.reload()
+
+    def reload(self):
+        """Read the manifest again; another worker may have reindexed"""
+        self.exists = os.path.exists(self.path)
+        self.entries = {}
+        if self.exists:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        """Write the manifest atomically"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+    def stamp(self) -> Optional[str]:
+        """Cheap marker that changes whenever the stored manifest is saved"""
+        try:
+            return str(os.stat(self.path).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    @property
+    def version(self) -> str:
+        """Hash over every indexed file, changes whenever the index does"""
+        digest = sha256()
+        for source in sorted(self.entries):
+            entry = self.entries[source]
+            digest.update(f"{source}:{entry['hash']}:{entry.get('chunking', '')}\n".encode('utf-8'))
+        return digest.hexdigest()[:12]
+
+
+class DatabaseIndexManifest(IndexManifest):
+    """The same manifest in Postgres, shared by every replica"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        super().__init__(path="provider_doc_manifest")
+
+    def reload(self):
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(ProviderDocManifestDB.__table__)).all()
+        self.entries = {
+            row.source: {
+                "hash": row.hash,
+                "ids": row.ids,
+                "chunking": row.chunking,
+                "model": row.model
+            }
+            for row in rows
+        }
+        self.exists = bool(rows)
+
+    def save(self):
+        table = ProviderDocManifestDB.__table__
+        with self.engine.begin() as conn:
+            conn.execute(delete(table))
+            if self.entries:
+                conn.execute(insert(table), [
+                    {"source": source, **entry} for source, entry in self.entries.items()
+                ])
+        self.exists = True
+
+    def stamp(self) -> Optional[str]:
+        table = ProviderDocManifestDB
+        row = func.concat_ws(':', table.source, table.hash, table.chunking, table.model)
+        with self.engine.connect() as conn:
+            return conn.execute(
+                select(func.md5(func.string_agg(row, aggregate_order_by(literal(','), table.source))))
+            ).scalar()
@@ -0,0 +1,96 @@
+"""BM25 inverted index over provider document chunks"""
+import math
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from langchain_core.documents import Document
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word and number tokens"""
+    return TOKEN.findall(text.lower())
+
+
+class LexicalHit(NamedTuple):
+    """A chunk, its BM25 score and how much of the query it covers"""
+    doc: Document
+    score: float
+    coverage: float
+
+
+class _Postings:
+    """Everything a search reads, swapped in as one object on rebuild"""
+
+    def __init__(self, documents: List[Document]):
+        self.documents = documents
+        self.lengths = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        for row, doc in enumerate(documents):
+            counts = Counter(tokenize(doc.page_content))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((row, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        # Unseen terms get the highest idf, so they count against coverage
+        df = len(self.postings.get(term, ()))
+        n = len(self.documents)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the same chunks the vector store embeds.
+
+    Besides the BM25 score, each hit reports its coverage: the
+    idf-weighted share of query terms found in the chunk. A chunk with
+    every rare term of "ena 16460" has coverage near 1, while one that
+    only shares common words has a low one, which makes coverage a
+    usable confidence for skipping the embedding.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._index = _Postings([])
+
+    def rebuild(self, documents: List[Document]):
+        """Replace the indexed chunks"""
+        self._index = _Postings(documents)
+
+    def __len__(self) -> int:
+        return len(self._index.documents)
+
+    def search(
+        self,
+        query: str,
+        provider_name: Optional[str] = None,
+        k: int = 3
+    ) -> List[LexicalHit]:
+        """Top-k chunks by BM25, optionally for one provider"""
+        index = self._index
+        terms = set(tokenize(query))
+        if not terms or not index.documents:
+            return []
+
+        weights = {term: index.idf(term) for term in terms}
+        total_weight = sum(weights.values())
+        scores: Dict[int, float] = {}
+        matched: Dict[int, float] = {}
+        for term in terms:
+            for row, tf in index.postings.get(term, ()):
+                doc = index.documents[row]
+                if provider_name and doc.metadata.get('provider') != provider_name:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * index.lengths[row] / index.avg_length)
+                scores[row] = scores.get(row, 0.0) + weights[term] * tf * (self.k1 + 1) / (tf + norm)
+                matched[row] = matched.get(row, 0.0) + weights[term]
+
+        top = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [
+            LexicalHit(index.documents[row], scores[row], matched[row] / total_weight)
+            for row in top
+        ]
@@ -0,0 +1,130 @@
+"""Process-wide registry of embedding models"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from langchain_huggingface import HuggingFaceEmbeddings
+from app.config import get_settings
+
+settings = get_settings()
+
+_models: Dict[str, HuggingFaceEmbeddings] = {}
+_load_seconds: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class EmbeddingBackendUnavailable(Exception):
+    """Raised when a backend is unknown or its packages are missing"""
+
+
+def model_id(model_name: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """Name and backend; vectors from different backends are not interchangeable"""
+    return f"{model_name or settings.EMBEDDING_MODEL}@{backend or settings.EMBEDDING_BACKEND}"
+
+
+def onnx_file_name(quantization: Optional[str] = None) -> str:
+    """File sentence-transformers writes a dynamically quantised export to"""
+    return f"onnx/model_qint8_{quantization or settings.EMBEDDING_ONNX_QUANTIZATION}.onnx"
+
+
+def _model_kwargs(model_name: str, backend: str) -> Tuple[str, dict]:
+    """Model path and SentenceTransformer kwargs for a backend"""
+    if backend == "torch":
+        return model_name, {'device': 'cpu'}
+    if backend not in EMBEDDING_BACKENDS:
+        raise EmbeddingBackendUnavailable(f"Unknown embedding backend: {backend}")
+
+    try:
+        import onnxruntime  # noqa: F401 pylint: disable=unused-import,import-outside-toplevel
+        import optimum.onnxruntime  # noqa: F401 pylint: disable=unused-import,import-outside-toplevel
+    except ImportError as e:
+        raise EmbeddingBackendUnavailable(
+            "ONNX embeddings require the sentence-transformers[onnx] extra"
+        ) from e
+
+    # A local export (see `python -m app.cli export-onnx`) wins over the hub
+    path = model_name
+    if model_name == settings.EMBEDDING_MODEL and os.path.isdir(settings.EMBEDDING_ONNX_PATH):
+        path = settings.EMBEDDING_ONNX_PATH
+    # An export holds both files, so name the one wanted either way
+    file_name = onnx_file_name() if backend == "onnx-int8" else "onnx/model.onnx"
+    return path, {'device': 'cpu', 'backend': 'onnx', 'model_kwargs': {'file_name': file_name}}
+
+
+def load_embedding_model(
+    model_name: Optional[str] = None,
+    backend: Optional[str] = None
+) -> HuggingFaceEmbeddings:
+    """Load a fresh, unshared model; benchmarks use this to compare backends"""
+    name = model_name or settings.EMBEDDING_MODEL
+    path, kwargs = _model_kwargs(name, backend or settings.EMBEDDING_BACKEND)
+    return HuggingFaceEmbeddings(
+        model_name=path,
+        model_kwargs=kwargs,
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+
+def export_onnx_model(output_dir: str, quantization: Optional[str] = None) -> List[str]:
+    """Export EMBEDDING_MODEL to ONNX plus a dynamically quantised int8 copy"""
+    try:
+        # pylint: disable=import-outside-toplevel
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+    except ImportError as e:
+        raise EmbeddingBackendUnavailable(
+            "ONNX export requires the sentence-transformers[onnx] extra"
+        ) from e
+
+    quantization = quantization or settings.EMBEDDING_ONNX_QUANTIZATION
+    model = SentenceTransformer(settings.EMBEDDING_MODEL, backend="onnx", device="cpu")
+    model.save_pretrained(output_dir)
+    export_dynamic_quantized_onnx_model(model, quantization, output_dir)
+    return [
+        os.path.join(output_dir, "onnx/model.onnx"),
+        os.path.join(output_dir, onnx_file_name(quantization))
+    ]
+
+
+def get_embedding_model(model_name: Optional[str] = None) -> HuggingFaceEmbeddings:
+    """Load a model once per process and return the shared instance"""
+    name = model_name or settings.EMBEDDING_MODEL
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = load_embedding_model(name)
+            _load_seconds[name] = time.perf_counter() - start
+            print(
+                f"Loaded embedding model {name} ({settings.EMBEDDING_BACKEND}) "
+                f"in {_load_seconds[name]:.1f}s"
+            )
+    return _models[name]
+
+
+def _tensor_bytes(module) -> int:
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def model_memory_report() -> List[dict]:
+    """Loaded models with their weight memory"""
+    report = []
+    for name, model in list(_models.items()):
+        # langchain_huggingface keeps the SentenceTransformer on `_client`
+        client = getattr(model, '_client', None) or getattr(model, 'client', None)
+        weight_bytes = _tensor_bytes(client) if hasattr(client, 'parameters') else None
+        report.append({
+            "model": name,
+            "backend": settings.EMBEDDING_BACKEND,
+            "weight_bytes": weight_bytes,
+            "weight_mb": round(weight_bytes / 2**20, 1) if weight_bytes else None,
+            "load_seconds": round(_load_seconds.get(name, 0.0), 2)
+        })
+    return report
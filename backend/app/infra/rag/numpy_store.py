@@ -0,0 +1,253 @@
+"""Exact vector search over a memory-mapped NumPy matrix"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+class _Snapshot:
+    """Matrix, records and provider masks that are swapped in together"""
+
+    def __init__(self, matrix: np.ndarray, records: List[dict], mtime: int = 0):
+        self.matrix = matrix
+        self.mtime = mtime
+        self.records = records
+        self.row_of = {record['id']: row for row, record in enumerate(records)}
+        rows: Dict[str, List[int]] = {}
+        for row, record in enumerate(records):
+            rows.setdefault(record['metadata'].get('provider'), []).append(row)
+        self.provider_rows = {p: np.array(r, dtype=np.intp) for p, r in rows.items()}
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Normalised embeddings in one matrix, searched with a matmul.
+
+    Vectors live in `vectors.npy` (float32 or float16) and are opened
+    with `mmap_mode='r'`, so workers on a host share the pages. Ids,
+    texts and metadata live in a JSON sidecar. Provider filters are
+    precomputed row indexes, and top-k is an `argpartition` over the
+    scores. Writes rebuild both files and swap them in atomically,
+    which is fine for a corpus of a few thousand chunks.
+    """
+
+    def __init__(self, directory: str, embedding_function: Embeddings, dtype: str = "float32"):
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self.dtype = np.dtype(dtype)
+        self.vectors_path = os.path.join(directory, "vectors.npy")
+        self.metadata_path = os.path.join(directory, "metadata.json")
+        self._write_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._snapshot = self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    def _mtime(self) -> int:
+        try:
+            return os.stat(self.metadata_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> _Snapshot:
+        mtime = self._mtime()
+        if not mtime:
+            return _Snapshot(np.zeros((0, 0), dtype=self.dtype), [])
+        with open(self.metadata_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        matrix = np.load(self.vectors_path, mmap_mode='r') if records \
+            else np.zeros((0, 0), dtype=self.dtype)
+        if len(matrix) != len(records):
+            # Caught another process between its two renames; keep the
+            # old snapshot and retry on the next call
+            return getattr(self, '_snapshot', None) or _Snapshot(matrix[:0], [])
+        return _Snapshot(matrix, records, mtime)
+
+    def _current(self) -> _Snapshot:
+        """Latest snapshot, reloading when another process rewrote the files"""
+        snapshot = self._snapshot
+        if self._mtime() != snapshot.mtime:
+            snapshot = self._snapshot = self._load()
+        return snapshot
+
+    def _save(self, matrix: np.ndarray, records: List[dict]):
+        # Vectors first; the sidecar's mtime is what tells readers to reload
+        tmp_vectors = f"{self.vectors_path}.tmp.npy"
+        np.save(tmp_vectors, matrix.astype(self.dtype, copy=False))
+        os.replace(tmp_vectors, self.vectors_path)
+        tmp_metadata = f"{self.metadata_path}.tmp"
+        with open(tmp_metadata, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(tmp_metadata, self.metadata_path)
+        self._snapshot = self._load()
+
+    def _normalise(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """Embed and upsert texts"""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(i) for i in range(len(texts))]
+        vectors = self._normalise(self.embedding_function.embed_documents(texts))
+
+        with self._write_lock:
+            snapshot = self._current()
+            replaced = set(ids)
+            keep = [row for row, r in enumerate(snapshot.records) if r['id'] not in replaced]
+            records = [snapshot.records[row] for row in keep] + [
+                {'id': i, 'text': t, 'metadata': m} for i, t, m in zip(ids, texts, metadatas)
+            ]
+            parts = [np.asarray(snapshot.matrix[keep], dtype=np.float32)] if keep else []
+            self._save(np.concatenate(parts + [vectors]), records)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Remove rows by id"""
+        if not ids:
+            return False
+        with self._write_lock:
+            snapshot = self._current()
+            doomed = set(ids)
+            keep = [row for row, r in enumerate(snapshot.records) if r['id'] not in doomed]
+            if len(keep) == len(snapshot.records):
+                return False
+            if keep:
+                self._save(np.asarray(snapshot.matrix[keep]), [snapshot.records[r] for r in keep])
+            else:
+                self.reset_collection()
+        return True
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]):
+        """Replace metadata without touching vectors"""
+        with self._write_lock:
+            snapshot = self._current()
+            records = [dict(r) for r in snapshot.records]
+            for doc_id, metadata in zip(ids, metadatas):
+                row = snapshot.row_of.get(doc_id)
+                if row is not None:
+                    records[row]['metadata'] = metadata
+            self._save(np.asarray(snapshot.matrix), records)
+
+    def reset_collection(self):
+        """Drop every row"""
+        for path in (self.metadata_path, self.vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._snapshot = self._load()
+
+    def count(self) -> int:
+        """Rows in the index"""
+        return len(self._current().records)
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Top-k rows by cosine; scores are on Chroma's scale, see below"""
+        return self.similarity_search_by_vectors_with_score([embedding], k, filter)[0]
+
+    def similarity_search_by_vectors_with_score(
+        self,
+        embeddings: List[List[float]],
+        k: int = 4,
+        filter: Optional[dict] = None  # pylint: disable=redefined-builtin
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Top-k rows for several queries with one matmul.
+
+        Scores are squared L2 distances between unit vectors, 2 - 2cos,
+        which is what the default Chroma collection returns. Callers turn
+        distances into similarities and thresholds, so every backend has
+        to report the same scale.
+        """
+        snapshot = self._current()
+        if not snapshot.records or not embeddings:
+            return [[] for _ in embeddings]
+
+        rows = None
+        provider = self._provider_filter(filter)
+        if provider is not None:
+            rows = snapshot.provider_rows.get(provider)
+            if rows is None:
+                return [[] for _ in embeddings]
+
+        queries = self._normalise(embeddings)
+        matrix = snapshot.matrix if rows is None else snapshot.matrix[rows]
+        all_scores = matrix @ queries.T
+        k = min(k, len(all_scores))
+
+        results = []
+        for scores in all_scores.T:
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = []
+            for i in top:
+                record = snapshot.records[rows[i] if rows is not None else i]
+                doc = Document(page_content=record['text'], metadata=record['metadata'], id=record['id'])
+                hits.append((doc, max(2 - 2 * float(scores[i]), 0.0)))
+            results.append(hits)
+        return results
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Embed the query and search"""
+        return self.similarity_search_by_vector_with_score(
+            self.embedding_function.embed_query(query), k, filter
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def _provider_filter(self, filter_dict: Optional[dict]) -> Optional[str]:
+        """Provider from a Chroma-style filter; it is the only field supported"""
+        if not filter_dict:
+            return None
+        value = filter_dict.get('provider')
+        if isinstance(value, dict):
+            value = value.get('$eq')
+        if value is None or len(filter_dict) > 1:
+            raise ValueError(f"Unsupported filter: {filter_dict}")
+        return value
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "NumpyVectorStore":
+        store = cls(kwargs.pop('directory'), embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,201 @@
+"""Provider chunks in Postgres with a pgvector HNSW index"""
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from sqlalchemy import bindparam, delete, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from app.infra.database.models import ProviderChunkDB, ensure_vector_tables
+
+# Arbitrary key for the advisory lock that serialises indexing
+INDEX_LOCK_KEY = 0x70726f76
+
+
+class PgVectorStore(VectorStore):
+    """
+    Vector store shared by every backend replica.
+
+    Chunks and their embeddings live in `provider_chunks` with an HNSW
+    cosine index. Provider filters are a WHERE clause, and `ef_search`
+    is set per query so recall can be traded for latency. Indexing runs
+    under an advisory lock, so the first replica embeds and the others
+    find an up-to-date manifest.
+    """
+
+    def __init__(self, engine, embedding_function: Embeddings, ef_search: int = 40):
+        self.engine = engine
+        self.embedding_function = embedding_function
+        self.ef_search = int(ef_search)
+        ensure_vector_tables(engine)
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding_function
+
+    @contextmanager
+    def index_lock(self):
+        """Hold the cluster-wide indexing lock"""
+        with self.engine.connect() as conn:
+            conn.execute(select(func.pg_advisory_lock(INDEX_LOCK_KEY)))
+            try:
+                yield
+            finally:
+                conn.execute(select(func.pg_advisory_unlock(INDEX_LOCK_KEY)))
+                conn.commit()
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        """Embed and upsert texts"""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(i) for i in range(len(texts))]
+        vectors = self.embedding_function.embed_documents(texts)
+
+        stmt = insert(ProviderChunkDB)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProviderChunkDB.id],
+            set_={
+                "provider": stmt.excluded.provider,
+                "content": stmt.excluded.content,
+                "metadata": stmt.excluded.metadata,
+                "embedding": stmt.excluded.embedding
+            }
+        )
+        with self.engine.begin() as conn:
+            conn.execute(stmt, [
+                {
+                    "id": doc_id,
+                    "provider": metadata.get('provider', ''),
+                    "content": text_,
+                    "metadata": metadata,
+                    "embedding": vector
+                }
+                for doc_id, text_, metadata, vector in zip(ids, texts, metadatas, vectors)
+            ])
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Remove rows by id"""
+        if not ids:
+            return False
+        with self.engine.begin() as conn:
+            conn.execute(delete(ProviderChunkDB).where(ProviderChunkDB.id.in_(ids)))
+        return True
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]):
+        """Replace metadata without re-embedding"""
+        table = ProviderChunkDB.__table__
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.id == bindparam("doc_id"))
+                .values(metadata=bindparam("doc_metadata")),
+                [{"doc_id": i, "doc_metadata": m} for i, m in zip(ids, metadatas)]
+            )
+
+    def reset_collection(self):
+        """Drop every row"""
+        with self.engine.begin() as conn:
+            conn.execute(delete(ProviderChunkDB))
+
+    def count(self) -> int:
+        """Rows in the index"""
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(ProviderChunkDB)).scalar()
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Top-k chunks by cosine, filtered in SQL; scores on Chroma's scale"""
+        return self.similarity_search_by_vectors_with_score([embedding], k, filter)[0]
+
+    def similarity_search_by_vectors_with_score(
+        self,
+        embeddings: List[List[float]],
+        k: int = 4,
+        filter: Optional[dict] = None  # pylint: disable=redefined-builtin
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Top-k chunks for several queries in one transaction.
+
+        The HNSW index orders by cosine distance. Scores are reported as
+        twice that, 2 - 2cos, which is the squared L2 distance between
+        unit vectors that Chroma and the NumPy store return.
+        """
+        provider = self._provider_filter(filter)
+        results = []
+        with self.engine.begin() as conn:
+            # SET takes no bind parameters; ef_search is an int from settings
+            conn.execute(text(f"SET LOCAL hnsw.ef_search = {self.ef_search}"))
+            for embedding in embeddings:
+                distance = ProviderChunkDB.embedding.cosine_distance(embedding).label("distance")
+                query = select(
+                    ProviderChunkDB.id,
+                    ProviderChunkDB.content,
+                    ProviderChunkDB.doc_metadata.label("doc_metadata"),
+                    distance
+                ).order_by(distance).limit(k)
+                if provider is not None:
+                    query = query.where(ProviderChunkDB.provider == provider)
+                results.append([
+                    (Document(page_content=row.content, metadata=row.doc_metadata, id=row.id),
+                     2 * float(row.distance))
+                    for row in conn.execute(query)
+                ])
+        return results
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,  # pylint: disable=redefined-builtin
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        """Embed the query and search"""
+        return self.similarity_search_by_vector_with_score(
+            self.embedding_function.embed_query(query), k, filter
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def _provider_filter(self, filter_dict: Optional[dict]) -> Optional[str]:
+        """Provider from a Chroma-style filter; it is the only field supported"""
+        if not filter_dict:
+            return None
+        value = filter_dict.get('provider')
+        if isinstance(value, dict):
+            value = value.get('$eq')
+        if value is None or len(filter_dict) > 1:
+            raise ValueError(f"Unsupported filter: {filter_dict}")
+        return value
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> "PgVectorStore":
+        store = cls(kwargs.pop('engine'), embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
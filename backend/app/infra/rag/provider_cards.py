@@ -0,0 +1,105 @@
+"""Provider answer cards extracted at index time"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+POLICY_KEYWORDS = ['privacy', 'policy', 'data', 'collect']
+
+
+def provider_name_for(filename: str) -> str:
+    """Provider name derived from a document file name"""
+    return filename.replace('_', ' ').replace('.txt', '').title()
+
+
+def extract_contact_info(content: str, provider: str) -> dict:
+    """Extract structured contact information from document content"""
+    lines = content.split('\n')
+    info = {
+        'provider': provider,
+        'address': '',
+        'phone': '',
+        'email': '',
+        'website': ''
+    }
+
+    for line in lines:
+        line = line.strip()
+        if 'Address:' in line or 'Official Address:' in line:
+            info['address'] = line.split(':', 1)[1].strip()
+        elif 'Contact' in line or 'Phone' in line or 'Tel:' in line:
+            info['phone'] = line.split(':', 1)[1].strip() if ':' in line else line
+        elif 'Email:' in line:
+            info['email'] = line.split(':', 1)[1].strip()
+        elif 'Link:' in line or 'website' in line.lower():
+            info['website'] = line.split(':', 1)[1].strip() if ':' in line else ''
+    return info
+
+
+def extract_policy_lines(content: str) -> List[str]:
+    """Lines of a document that talk about privacy or data handling"""
+    return [
+        line.strip() for line in content.split('\n')
+        if any(word in line.lower() for word in POLICY_KEYWORDS) and line.strip()
+    ]
+
+
+def build_card(filename: str, content: str) -> dict:
+    """Everything a provider question can be answered from without a search"""
+    provider = provider_name_for(filename)
+    return {
+        'provider': provider,
+        'source': filename,
+        'contact': extract_contact_info(content, provider),
+        'policy': extract_policy_lines(content)
+    }
+
+
+class ProviderCardStore:
+    """
+    Provider cards keyed by source file, persisted as JSON.
+
+    Cards are rebuilt only when the vector store reindexes a file, so
+    serving one is a dict lookup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cards: Dict[str, dict] = {}
+        self._by_provider: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.cards = json.load(f)
+            self._reindex()
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self.cards
+
+    def put(self, filename: str, content: str):
+        """Build or replace the card for a file"""
+        with self._lock:
+            self.cards[filename] = build_card(filename, content)
+            self._reindex()
+
+    def remove(self, filename: str):
+        """Drop the card of a deleted file"""
+        with self._lock:
+            self.cards.pop(filename, None)
+            self._reindex()
+
+    def get(self, provider_name: str) -> Optional[dict]:
+        """Card for a provider, matched case-insensitively"""
+        return self._by_provider.get(provider_name.lower())
+
+    def save(self):
+        """Write the cards atomically"""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.cards, f, indent=2, sort_keys=True, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def _reindex(self):
+        # Swapped in one assignment so readers never see a partial map
+        self._by_provider = {card['provider'].lower(): card for card in self.cards.values()}
@@ -0,0 +1,121 @@
+"""Run CPU-bound RAG work off the event loop and request threads"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def _limit_torch_threads(threads: int):
+    """Keep each worker's intra-op pool from oversubscribing the cores"""
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def _init_worker(threads: int, initializer: Optional[Callable]):
+    _limit_torch_threads(threads)
+    if initializer is not None:
+        initializer()
+
+
+class RAGExecutor:
+    """
+    Awaitable runner for RAG queries.
+
+    With `processes` > 0, calls go to a pool of spawned worker processes.
+    Each worker runs `initializer` once, so the embedding model and
+    vector store load once per process, and inference no longer holds
+    the GIL of the process serving bookings and searches. With 0, calls
+    run on the default thread pool as before.
+    """
+
+    def __init__(self, processes: int, initializer: Optional[Callable] = None):
+        self.processes = processes
+        self.initializer = initializer
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        if processes > 0:
+            self._pool = self._start_pool()
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked: forking a process that already runs
+        # torch or uvicorn threads can deadlock in the child
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings.RAG_EXECUTOR_TORCH_THREADS, self.initializer)
+        )
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` in a worker and await its result"""
+        if self._pool is None:
+            return await asyncio.to_thread(fn, *args)
+
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); replace the pool for later calls
+            with self._pool_lock:
+                if self._pool is pool:
+                    print("RAG worker pool broken, restarting")
+                    self._pool = self._start_pool()
+            raise
+
+    def warm_up(self, fn: Callable, *args):
+        """Start every worker and run `fn` once in each"""
+        if self._pool is None:
+            fn(*args)
+            return
+        # Workers spawn on demand; submitting one call per worker at once
+        # starts them all and runs their initializers
+        futures = [self._pool.submit(fn, *args) for _ in range(self.processes)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_in_subprocess(fn: Callable, *args):
+    """
+    Run `fn(*args)` once in a fresh spawned process and return its result.
+
+    For one-off work such as indexing whose model and threads should
+    not stay in the calling process.
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return pool.submit(fn, *args).result()
+
+
+_executor: Optional[RAGExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_rag_executor(initializer: Optional[Callable] = None) -> RAGExecutor:
+    """Process-wide executor; the first caller's initializer is used"""
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = RAGExecutor(settings.RAG_EXECUTOR_PROCESSES, initializer)
+    return _executor
+
+
+def shutdown_rag_executor():
+    """Stop the executor if it was started"""
+    if _executor is not None:
+        _executor.shutdown()
@@ -1,68 +1,343 @@
 """Store vector embeddings"""
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+import fcntl
 import os
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
 #from langchain_community.vectorstores import Chroma
 from langchain_chroma import Chroma
 from langchain_community.docstore.document import Document
-from langchain_huggingface import HuggingFaceEmbeddings
 from app.config import get_settings
+from app.infra.rag.embedding_cache import embed_queries, get_query_embeddings
+from app.infra.rag.model_registry import model_id
+from app.infra.rag.chunking import chunk_document
+from app.infra.rag.index_manifest import DatabaseIndexManifest, IndexManifest, content_hash
+from app.infra.rag.lexical_index import BM25Index
+from app.infra.rag.numpy_store import NumpyVectorStore
+from app.infra.rag.provider_cards import ProviderCardStore, provider_name_for
 
 settings = get_settings()
 
-class VectorStoreService:
-    """Langchain chromaDB vector store for provider documents"""
+def build_provider_documents(filename: str, content: str) -> List[Document]:
+    """Section-aware chunks of one provider file, ready to embed"""
+    provider_name = provider_name_for(filename)
+    chunks = chunk_document(
+        content,
+        chunk_size=settings.PROVIDER_DOCS_CHUNK_SIZE,
+        overlap=settings.PROVIDER_DOCS_CHUNK_OVERLAP
+    )
+    return [
+        Document(
+            # Lead with the provider so chunks without its name still match
+            page_content=f"{provider_name}\n{chunk.text}",
+            metadata={
+                'provider': provider_name,
+                'source': filename,
+                'section': chunk.section,
+                'offset': chunk.offset
+            }
+        )
+        for chunk in chunks
+    ]
+
+
+def lexical_distance(coverage: float) -> float:
+    """
+    Distance for a chunk only the lexical index found.
+
+    Coverage is read as a cosine and put on the vector stores' scale,
+    2 - 2cos, so similarity thresholds mean the same for both kinds of
+    hit: full coverage is distance 0, no coverage distance 2.
+    """
+    return 2 - 2 * coverage
+
+
+class ProviderChroma(Chroma):
+    """Chroma with the few extra operations the indexer needs"""
+
+    def count(self) -> int:
+        """Documents in the collection"""
+        return self._collection.count()
+
+    def update_metadata(self, ids: List[str], metadatas: List[dict]):
+        """Replace metadata without re-embedding"""
+        self._collection.update(ids=ids, metadatas=metadatas)
 
-    def __init__(self):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.EMBEDDING_MODEL,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,  # pylint: disable=redefined-builtin
+        **kwargs
+    ) -> List[tuple]:
+        """Distances for a vector, like `similarity_search_with_score`"""
+        return self.similarity_search_by_vectors_with_score([embedding], k, filter)[0]
+
+    def similarity_search_by_vectors_with_score(
+        self,
+        embeddings: List[List[float]],
+        k: int = 4,
+        filter: Optional[dict] = None  # pylint: disable=redefined-builtin
+    ) -> List[List[tuple]]:
+        """Top-k documents for several vectors in one collection query"""
+        if not embeddings:
+            return []
+        results = self._collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            where=filter,
+            include=["documents", "metadatas", "distances"]
         )
+        return [
+            [
+                (Document(page_content=text, metadata=metadata or {}, id=doc_id), distance)
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                results["ids"], results["documents"], results["metadatas"], results["distances"]
+            )
+        ]
 
-        self.persist_directory = "/app/data/chroma_db"
-        os.makedirs(self.persist_directory, exist_ok=True)
 
-        self.vector_store = Chroma(
-            persist_directory=self.persist_directory,
-            embedding_function=self.embeddings,
+def create_store(backend: str, directory: str, embeddings):
+    """Langchain vector store for a VECTOR_STORE_BACKEND value"""
+    if backend == "chroma":
+        return ProviderChroma(
+            persist_directory=directory,
+            embedding_function=embeddings,
             collection_name="provider_docs"
         )
+    if backend == "numpy":
+        return NumpyVectorStore(directory, embeddings, dtype=settings.VECTOR_STORE_DTYPE)
+    if backend == "pgvector":
+        # Needs the pgvector extension, so only imported when selected
+        from app.infra.database.connection import engine
+        from app.infra.rag.pgvector_store import PgVectorStore
+        return PgVectorStore(engine, embeddings, ef_search=settings.PGVECTOR_EF_SEARCH)
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
+
+class VectorStoreService:
+    """Langchain vector store for provider documents"""
 
-    def index_documents(self, docs_path: str):
-        """Index all provided bus documents"""
-        # pylint: disable=protected-access
-        if self.vector_store._collection.count() > 0:
-            print("Documents already indexed!")
+    def __init__(self, embeddings=None, backend: Optional[str] = None):
+        self.embeddings = embeddings or get_query_embeddings()
+        self.backend = backend or settings.VECTOR_STORE_BACKEND
 
+        # Chroma keeps its historical location; other backends get their
+        # own directory and manifest so switching never reuses a stale one
+        self.persist_directory = settings.CHROMA_PERSIST_DIR
+        if self.backend != "chroma":
+            self.persist_directory = os.path.join(self.persist_directory, self.backend)
+        os.makedirs(self.persist_directory, exist_ok=True)
+        self.vector_store = create_store(self.backend, self.persist_directory, self.embeddings)
+
+        if self.backend == "pgvector":
+            # Replicas share the manifest along with the index, so only
+            # the first one to start embeds anything
+            self.manifest = DatabaseIndexManifest(self.vector_store.engine)
+        else:
+            self.manifest = IndexManifest(
+                os.path.join(self.persist_directory, "provider_docs_manifest.json")
+            )
+        self.cards = ProviderCardStore(
+            os.path.join(self.persist_directory, "provider_cards.json")
+        )
+        self._index_lock = threading.Lock()
+        # Manifest stamp the in-memory state was built from
+        self._loaded_stamp = None
+        self._checked_at = 0.0
+        self.lexical = BM25Index()
+        self._stats_lock = threading.Lock()
+        self.searches = 0
+        self.lexical_shortcircuits = 0
+        # Changing the chunk settings or the embedding model or backend
+        # re-embeds every file on the next run
+        self.chunking = f"{settings.PROVIDER_DOCS_CHUNK_SIZE}/{settings.PROVIDER_DOCS_CHUNK_OVERLAP}"
+        self.model_id = model_id()
+
+    def index_documents(self, docs_path: str) -> dict:
+        """
+        Index new or changed provider documents.
+
+        Files whose content hash matches the manifest are skipped.
+        Provider cards are rebuilt for every changed file.
+        Changed files are re-chunked; chunks whose text is unchanged keep
+        their ids and embeddings, new chunks are embedded, and chunks
+        that disappeared are removed along with deleted files.
+        The BM25 index is rebuilt from every file; it needs no embeddings.
+        """
+        if not os.path.exists(docs_path):
+            print(f"Documents path not found: {docs_path}")
+            return {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "chunks_embedded": 0}
+
+        with self._locked():
+            self.manifest.reload()
+            # Another process may have reindexed and rewritten the cards;
+            # files it updated look unchanged here, so read its cards too
+            self.cards = ProviderCardStore(self.cards.path)
+            if not self.manifest.exists and self.vector_store.count() > 0:
+                # Written before the manifest existed, possibly several times over
+                print("Dropping unmanaged provider documents")
+                self.vector_store.reset_collection()
+
+            summary = {
+                "added": 0, "updated": 0, "removed": 0, "unchanged": 0, "chunks_embedded": 0
+            }
+            seen = set()
+            cards_changed = False
+            lexical_documents = []
+
+            for filename, content, documents, ids in self._read_documents(docs_path):
+                seen.add(filename)
+                digest = content_hash(content)
+                entry = self.manifest.entries.get(filename)
+                if filename not in self.cards or (entry and entry['hash'] != digest):
+                    self.cards.put(filename, content)
+                    cards_changed = True
+                lexical_documents.extend(self._lexical_documents(documents, ids))
+                if entry and entry['hash'] == digest and entry.get('chunking') == self.chunking \
+                        and entry.get('model') == self.model_id:
+                    summary["unchanged"] += 1
+                    continue
+
+                previous_ids = set(entry['ids']) if entry else set()
+                if entry and entry.get('model') != self.model_id:
+                    # Vectors from another model or backend can't be reused
+                    self.vector_store.delete(ids=list(previous_ids))
+                    previous_ids = set()
+                stale_ids = previous_ids - set(ids)
+                if stale_ids:
+                    self.vector_store.delete(ids=list(stale_ids))
+
+                # Chunk ids hash their text, so only edited sections are embedded
+                new = [(i, doc) for i, doc in zip(ids, documents) if i not in previous_ids]
+                if new:
+                    self.vector_store.add_documents(
+                        [doc for _, doc in new],
+                        ids=[i for i, _ in new]
+                    )
+                kept = [(i, doc) for i, doc in zip(ids, documents) if i in previous_ids]
+                if kept:
+                    # Offsets move when an earlier section changes length
+                    self.vector_store.update_metadata(
+                        ids=[i for i, _ in kept],
+                        metadatas=[doc.metadata for _, doc in kept]
+                    )
+                summary["chunks_embedded"] += len(new)
+
+                self.manifest.entries[filename] = {
+                    "hash": digest,
+                    "ids": ids,
+                    "chunking": self.chunking,
+                    "model": self.model_id
+                }
+                summary["updated" if entry else "added"] += 1
+                print(f"Indexed: {filename}")
+
+            for filename in set(self.manifest.entries) - seen:
+                self.vector_store.delete(ids=self.manifest.entries.pop(filename)['ids'])
+                self.cards.remove(filename)
+                cards_changed = True
+                summary["removed"] += 1
+                print(f"Removed: {filename}")
+
+            if summary["added"] or summary["updated"] or summary["removed"] \
+                    or not self.manifest.exists:
+                self.manifest.save()
+            if cards_changed:
+                self.cards.save()
+            self.lexical.rebuild(lexical_documents)
+            self._loaded_stamp = self.manifest.stamp()
+            print(f"Provider documents indexed: {summary}")
+            return summary
+
+    def load_index(self, docs_path: str):
+        """
+        Open an index built by another process, without writing to it.
+
+        Reads the manifest and cards and rebuilds the in-memory BM25
+        index; waits for a reindex in progress to finish first.
+        """
         if not os.path.exists(docs_path):
             print(f"Documents path not found: {docs_path}")
             return
 
-        print("Indexing provider documents with Langchain...")
+        with self._locked():
+            self.manifest.reload()
+            self.cards = ProviderCardStore(self.cards.path)
+            lexical_documents = []
+            for _, _, documents, ids in self._read_documents(docs_path):
+                lexical_documents.extend(self._lexical_documents(documents, ids))
+            self.lexical.rebuild(lexical_documents)
+            self._loaded_stamp = self.manifest.stamp()
+
+    def refresh_index(self, docs_path: str) -> bool:
+        """
+        Load the index again if another process rebuilt it; True if so.
 
-        documents = []
+        Checks the manifest at most every PROVIDER_INDEX_RELOAD_SECONDS,
+        so it is cheap to call before every query.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < settings.PROVIDER_INDEX_RELOAD_SECONDS:
+            return False
+        self._checked_at = now
+        if self.manifest.stamp() == self._loaded_stamp:
+            return False
+        print("Provider index changed, reloading")
+        self.load_index(docs_path)
+        return True
 
-        for filename in os.listdir(docs_path):
-            if filename.endswith('.txt'):
-                provider_name = filename.replace('_', ' ').replace('.txt', '').title()
-                filepath = os.path.join(docs_path, filename)
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Indexing lock across threads, processes on this host and replicas"""
+        # The file lock covers RAG pool workers, pre-forked workers and the
+        # CLI sharing the directory; shared stores also lock across hosts
+        store_lock = getattr(self.vector_store, 'index_lock', nullcontext)
+        lock_path = os.path.join(self.persist_directory, "index.lock")
+        with self._index_lock, open(lock_path, 'a', encoding='utf-8') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with store_lock():
+                    yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
 
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
+    def _read_documents(self, docs_path: str) -> Iterator[Tuple[str, str, List[Document], List[str]]]:
+        """Filename, content, chunks and chunk ids of each provider file"""
+        for filename in sorted(os.listdir(docs_path)):
+            if not filename.endswith('.txt'):
+                continue
+            with open(os.path.join(docs_path, filename), 'r', encoding='utf-8') as f:
+                content = f.read()
+            documents = build_provider_documents(filename, content)
+            yield filename, content, documents, self._document_ids(documents)
 
-                doc = Document(
-                    page_content=content,
-                    metadata={
-                        'provider': provider_name,
-                        'source': filename
-                    }
-                )
-                documents.append(doc)
-                print(f"Loaded: {provider_name}")
+    def _lexical_documents(self, documents: List[Document], ids: List[str]) -> List[Document]:
+        # Same ids as the vector store, so fusion can match the hits
+        return [
+            Document(page_content=doc.page_content, metadata=doc.metadata, id=i)
+            for i, doc in zip(ids, documents)
+        ]
 
-        if documents:
-            self.vector_store.add_documents(documents)
-            print(f"Indexed {len(documents)} documents!")
+    @property
+    def index_version(self) -> str:
+        """Changes whenever indexed content changes"""
+        return self.manifest.version
+
+    def _document_ids(self, documents: List[Document]) -> List[str]:
+        ids = []
+        seen = Counter()
+        for doc in documents:
+            key = f"provider_docs/{doc.metadata['source']}/{content_hash(doc.page_content)}"
+            # Identical chunks in one file still need distinct ids
+            seen[key] += 1
+            ids.append(str(uuid.uuid5(uuid.NAMESPACE_URL, f"{key}/{seen[key]}")))
+        return ids
 
     def similarity_search(
         self,
@@ -83,9 +358,143 @@ class VectorStoreService:
             results = self.vector_store.similarity_search_with_score(query, k=k)
         return results
 
+    def hybrid_search(
+        self,
+        query: str,
+        provider_name: Optional[str] = None,
+        k: int = 3
+    ) -> List[tuple]:
+        """
+        BM25 and vector search fused with reciprocal rank fusion.
+
+        When the best lexical hit covers the query at or above
+        LEXICAL_SHORTCIRCUIT_THRESHOLD, and no other provider's chunk
+        does too, the lexical hits are returned and the query is never
+        embedded. Scores are distances like `similarity_search`: the
+        vector distance where there is one, else `lexical_distance`.
+        """
+        lexical = self.lexical.search(query, provider_name, k)
+        with self._stats_lock:
+            self.searches += 1
+        if self._lexical_is_confident(lexical, provider_name):
+            with self._stats_lock:
+                self.lexical_shortcircuits += 1
+            return self._lexical_results(lexical)
+
+        return self._fuse(self.similarity_search(query, provider_name, k), lexical, k)
+
+    def batch_search(
+        self,
+        queries: List[str],
+        provider_names: List[Optional[str]],
+        k: int = 3,
+        hybrid: bool = True
+    ) -> List[List[tuple]]:
+        """
+        `hybrid_search` (or plain vector search) for many queries at once.
+
+        Queries the lexical index can answer are settled first. The rest
+        are embedded in one model call and searched with one vector store
+        call per provider filter.
+        """
+        results: List[Optional[List[tuple]]] = [None] * len(queries)
+        lexical = [[] for _ in queries]
+        pending = []
+        for i, (query, provider_name) in enumerate(zip(queries, provider_names)):
+            if hybrid:
+                lexical[i] = self.lexical.search(query, provider_name, k)
+                with self._stats_lock:
+                    self.searches += 1
+                if self._lexical_is_confident(lexical[i], provider_name):
+                    with self._stats_lock:
+                        self.lexical_shortcircuits += 1
+                    results[i] = self._lexical_results(lexical[i])
+                    continue
+            pending.append(i)
+
+        vectors = dict(zip(pending, embed_queries(self.embeddings, [queries[i] for i in pending])))
+        by_provider = {}
+        for i in pending:
+            by_provider.setdefault(provider_names[i], []).append(i)
+        for provider_name, indexes in by_provider.items():
+            search_filter = {"provider": {"$eq": provider_name}} if provider_name else None
+            hits = self.vector_store.similarity_search_by_vectors_with_score(
+                [vectors[i] for i in indexes], k, search_filter
+            )
+            for i, vector_hits in zip(indexes, hits):
+                results[i] = self._fuse(vector_hits, lexical[i], k) if hybrid else vector_hits
+        return results
+
+    def _fuse(self, vector: List[tuple], lexical: list, k: int) -> List[tuple]:
+        """Reciprocal rank fusion of vector hits and lexical hits"""
+        fused = {}
+        for ranked in (vector, self._lexical_results(lexical)):
+            for rank, (doc, distance) in enumerate(ranked):
+                key = doc.id or doc.page_content
+                # Vector hits come first, so their distance is the one kept
+                _, kept_distance, rrf = fused.get(key, (doc, distance, 0.0))
+                fused[key] = (doc, kept_distance, rrf + 1 / (settings.HYBRID_RRF_K + rank + 1))
+
+        ranked = sorted(fused.values(), key=lambda item: item[2], reverse=True)
+        return [(doc, distance) for doc, distance, _ in ranked[:k]]
+
+    def _lexical_results(self, lexical: list) -> List[tuple]:
+        return [(hit.doc, lexical_distance(hit.coverage)) for hit in lexical]
+
+    def _lexical_is_confident(self, lexical: list, provider_name: Optional[str]) -> bool:
+        threshold = settings.LEXICAL_SHORTCIRCUIT_THRESHOLD
+        if not lexical or lexical[0].coverage < threshold:
+            return False
+        if provider_name:
+            return True
+        # "email" alone covers every provider's contact chunk equally
+        top_provider = lexical[0].doc.metadata.get('provider')
+        return not any(
+            hit.coverage >= threshold and hit.doc.metadata.get('provider') != top_provider
+            for hit in lexical[1:]
+        )
+
+    def search_stats(self) -> dict:
+        """How often hybrid search answered without embedding the query"""
+        with self._stats_lock:
+            return {
+                "lexical_chunks": len(self.lexical),
+                "threshold": settings.LEXICAL_SHORTCIRCUIT_THRESHOLD,
+                "searches": self.searches,
+                "embedding_skipped": self.lexical_shortcircuits,
+                "skip_rate": self.lexical_shortcircuits / self.searches if self.searches else 0.0
+            }
+
     def get_retriever(self, k: int = 3):
         """Get a langchain retriever"""
         return self.vector_store.as_retriever(
             search_type="similarity",
             search_kwargs={"k": k}
         )
+
+
+_vector_store: Optional[VectorStoreService] = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStoreService:
+    """Process-wide vector store shared by all routes"""
+    global _vector_store
+
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = VectorStoreService()
+    return _vector_store
+
+
+def index_provider_documents() -> dict:
+    """Index provider documents with a vector store of this process's own"""
+    return VectorStoreService().index_documents(settings.PROVIDER_DOCS_PATH)
+
+
+def hybrid_search_report() -> Optional[dict]:
+    """Lexical short-circuit stats, if the vector store has been created"""
+    if _vector_store is None:
+        return None
+    return _vector_store.search_stats()
@@ -1,35 +1,81 @@
 """Booking repository"""
-from typing import List, Optional
-from datetime import date
-from sqlalchemy import and_
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Iterator, List, Optional
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
-from app.domain.entities import Booking
+from app.config import get_settings
+from app.domain.entities import Booking, ManifestEntry
 from app.infra.database.models import BookingDB
+from app.infra.cache.booking_filter import duplicate_key, get_duplicate_filter
+from app.infra.cache.booking_cache import get_booking_cache
+from app.infra.repos.booking_writer import get_booking_writer
+from app.infra.repos.inventory_repo import InventoryRepository
+from app.infra.repos.rollup_repo import RollupDeltas, RollupRepository, deltas_for
+
+settings = get_settings()
 
 class BookingRepository:
     """Repository for booking"""
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, duplicate_filter=None, writer=None, cache=None):
         self.db = db
+        self.duplicate_filter = duplicate_filter or get_duplicate_filter()
+        self.writer = writer or get_booking_writer()
+        self.cache = cache or get_booking_cache()
+        self.rollups = RollupRepository(db)
 
-    def save(self, booking: Booking) -> Booking:
-        """Save booking"""
-        db_booking = BookingDB(
-            name=booking.name,
-            phone=booking.phone,
-            bus_provider=booking.bus_provider,
-            from_district=booking.from_district,
-            to_district=booking.to_district,
-            dropping_point=booking.dropping_point,
-            price=booking.price,
-            travel_date=booking.travel_date,
-            travel_time=booking.travel_time,
-            status=booking.status
-        )
-        self.db.add(db_booking)
-        self.db.commit()
-        self.db.refresh(db_booking)
-        booking.id = db_booking.id
-        booking.booking_date = db_booking.booking_date
+    def save(
+        self,
+        booking: Booking,
+        take_seat: bool = False,
+        hold_id: Optional[str] = None
+    ) -> Booking:
+        """
+        Save booking.
+
+        With `take_seat`, the seat (the hold's, if `hold_id` is given) is
+        claimed in the same transaction as the insert, so a failed insert
+        never loses a seat or a hold.
+        """
+        if self.writer:
+            future = self.writer.submit(booking, take_seat, hold_id)
+            try:
+                booking = future.result(timeout=settings.BOOKING_GROUP_COMMIT_TIMEOUT_SECONDS)
+            except FutureTimeout:
+                # Only succeeds while the booking is still queued, so a
+                # cancelled booking is never written
+                future.cancel()
+                raise
+        else:
+            db_booking = BookingDB(
+                name=booking.name,
+                phone=booking.phone,
+                bus_provider=booking.bus_provider,
+                from_district=booking.from_district,
+                to_district=booking.to_district,
+                dropping_point=booking.dropping_point,
+                price=booking.price,
+                travel_date=booking.travel_date,
+                travel_time=booking.travel_time,
+                status=booking.status
+            )
+            try:
+                if take_seat:
+                    InventoryRepository(self.db).claim(booking.trip, hold_id)
+                self.db.add(db_booking)
+                self.rollups.apply(deltas_for([booking]))
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            self.db.refresh(db_booking)
+            booking.id = db_booking.id
+            booking.booking_date = db_booking.booking_date
+
+        if self.duplicate_filter and booking.status == "confirmed":
+            self.duplicate_filter.add(self._duplicate_key(booking))
+        if self.cache:
+            self.cache.invalidate(booking.phone)
         return booking
 
     def find_by_id(self, booking_id: int) -> Optional[Booking]:
@@ -45,12 +91,121 @@ class BookingRepository:
 
     def find_by_phone(self, phone: str) -> List[Booking]:
         """Find booking by phone number"""
+        token = None
+        if self.cache:
+            cached, token = self.cache.get(phone)
+            if cached is not None:
+                return cached
+
         db_bookings = self.db.query(BookingDB).filter(
             BookingDB.phone == phone,
             BookingDB.status == "confirmed"
         ).all()
 
-        return [self._to_entity(b) for b in db_bookings]
+        bookings = [self._to_entity(b) for b in db_bookings]
+        if self.cache:
+            self.cache.set(phone, bookings, token)
+        return bookings
+
+    def find_manifest(
+        self,
+        bus_provider: str,
+        travel_date: date,
+        travel_time: str,
+        from_district: str,
+        to_district: str
+    ) -> List[ManifestEntry]:
+        """Confirmed passengers for one departure"""
+        rows = self.db.query(
+            BookingDB.name,
+            BookingDB.phone,
+            BookingDB.dropping_point
+        ).filter(
+            *self._manifest_filters(
+                bus_provider, travel_date, travel_time, from_district, to_district
+            )
+        ).order_by(BookingDB.dropping_point, BookingDB.name).all()
+
+        return [
+            ManifestEntry(name=r.name, phone=r.phone, dropping_point=r.dropping_point)
+            for r in rows
+        ]
+
+    def count_manifest(
+        self,
+        bus_provider: str,
+        travel_date: date,
+        travel_time: str,
+        from_district: str,
+        to_district: str
+    ) -> int:
+        """Number of confirmed passengers for one departure"""
+        return self.db.query(func.count()).select_from(BookingDB).filter(
+            *self._manifest_filters(
+                bus_provider, travel_date, travel_time, from_district, to_district
+            )
+        ).scalar()
+
+    def _manifest_filters(
+        self,
+        bus_provider: str,
+        travel_date: date,
+        travel_time: str,
+        from_district: str,
+        to_district: str
+    ) -> list:
+        # Same column order as ix_bookings_manifest
+        return [
+            BookingDB.bus_provider == bus_provider,
+            BookingDB.travel_date == travel_date,
+            BookingDB.travel_time == travel_time,
+            BookingDB.from_district == from_district,
+            BookingDB.to_district == to_district,
+            BookingDB.status == "confirmed"
+        ]
+
+    def iter_bookings(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        date_field: str = "booking_date",
+        bus_provider: Optional[str] = None,
+        status: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Booking]:
+        """
+        Stream bookings matching the filters.
+
+        Plain rows are fetched through a server-side cursor in batches of
+        `batch_size`, so memory stays flat however many rows match.
+        """
+        columns = BookingDB.__table__.columns
+        query = select(*columns).order_by(BookingDB.id)
+
+        if date_field == "travel_date":
+            if date_from:
+                query = query.where(BookingDB.travel_date >= date_from)
+            if date_to:
+                query = query.where(BookingDB.travel_date <= date_to)
+        else:
+            if date_from:
+                query = query.where(
+                    BookingDB.booking_date >= datetime.combine(date_from, time.min)
+                )
+            if date_to:
+                query = query.where(
+                    BookingDB.booking_date < datetime.combine(date_to + timedelta(days=1), time.min)
+                )
+        if bus_provider:
+            query = query.where(BookingDB.bus_provider == bus_provider)
+        if status:
+            query = query.where(BookingDB.status == status)
+
+        result = self.db.execute(
+            query.execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for row in result:
+            yield self._to_entity(row)
 
     def find_by_details(
         self,
@@ -98,6 +253,15 @@ class BookingRepository:
         Check if a booking with same details already exists.
         Prevents duplicate bookings for same user, date, route, and provider.
         """
+        if self.duplicate_filter and not self.duplicate_filter.might_contain(
+            duplicate_key(
+                phone, travel_date, travel_time, bus_provider, from_district,
+                to_district, dropping_point
+            ),
+            travel_date
+        ):
+            return False
+
         booking = self.find_by_details(
             phone, travel_date, travel_time, bus_provider, from_district, to_district,
             dropping_point
@@ -110,10 +274,37 @@ class BookingRepository:
             BookingDB.id == booking.id
         ).first()
 
+        previous_status = db_booking.status
         db_booking.status = booking.status
+
+        deltas = RollupDeltas()
+        if previous_status == "confirmed" and booking.status == "canceled":
+            deltas.canceled(booking)
+        elif previous_status == "canceled" and booking.status == "confirmed":
+            deltas.reconfirmed(booking)
+        self.rollups.apply(deltas)
         self.db.commit()
+
+        if self.duplicate_filter and previous_status != booking.status:
+            if booking.status == "canceled":
+                self.duplicate_filter.remove(self._duplicate_key(booking))
+            elif booking.status == "confirmed":
+                self.duplicate_filter.add(self._duplicate_key(booking))
+        if self.cache:
+            self.cache.invalidate(booking.phone, db_booking.phone)
         return booking
 
+    def _duplicate_key(self, booking: Booking) -> str:
+        return duplicate_key(
+            booking.phone,
+            booking.travel_date,
+            booking.travel_time,
+            booking.bus_provider,
+            booking.from_district,
+            booking.to_district,
+            booking.dropping_point
+        )
+
     def _to_entity(self, db_booking: BookingDB) -> Booking:
         return Booking(
             id=db_booking.id,
@@ -0,0 +1,215 @@
+"""Group-commit writer for booking inserts"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, NamedTuple, Optional
+from sqlalchemy import insert
+from app.config import get_settings
+from app.domain.entities import Booking
+from app.domain.exceptions import DuplicateBooking, SeatHoldNotFound, SeatsSoldOut
+from app.infra.database.connection import SessionLocal
+from app.infra.database.models import BookingDB
+from app.infra.cache.booking_filter import duplicate_key
+from app.infra.repos.inventory_repo import InventoryRepository, trip_order
+from app.infra.repos.rollup_repo import RollupRepository, deltas_for
+
+settings = get_settings()
+
+
+class Submission(NamedTuple):
+    """A queued booking, its caller's future and the seat it needs"""
+    booking: Booking
+    future: Future
+    take_seat: bool = False
+    hold_id: Optional[str] = None
+
+
+class GroupCommitWriter:
+    """
+    Collect concurrent booking inserts and write them in one transaction.
+
+    Callers submit a booking and block on the returned future. A
+    background thread gathers submissions for up to `window_ms` or
+    `max_batch` rows, writes them with a single multi-row
+    INSERT ... RETURNING and commits once, so the batch shares one fsync.
+    Seats are claimed in the same transaction. If the transaction fails,
+    the rows are retried one at a time, so a single bad row only fails
+    its own caller.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        window_ms: Optional[float] = None,
+        max_batch: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.window = (window_ms or settings.BOOKING_GROUP_COMMIT_WINDOW_MS) / 1000
+        self.max_batch = max_batch or settings.BOOKING_GROUP_COMMIT_MAX_BATCH
+        self._queue: "queue.Queue[Submission]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="booking-group-commit", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        booking: Booking,
+        take_seat: bool = False,
+        hold_id: Optional[str] = None
+    ) -> Future:
+        """Queue a booking for the next batch"""
+        future = Future()
+        self._queue.put(Submission(booking, future, take_seat, hold_id))
+        return future
+
+    def is_alive(self) -> bool:
+        """Whether the writer thread is still taking batches"""
+        return self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._flush(batch)
+            except Exception as e:  # pylint: disable=broad-except
+                # Never let one batch end the thread and strand later callers
+                print(f"Group commit failed: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+
+    def _flush(self, batch: List[Submission]):
+        pending = self._dedupe(batch)
+        if not pending:
+            return
+
+        try:
+            self._insert(pending)
+        except Exception as e:  # pylint: disable=broad-except
+            if len(pending) == 1:
+                pending[0].future.set_exception(e)
+                return
+            # One bad row fails the whole INSERT; retry each on its own so
+            # only that row's caller sees the error
+            print(f"Group commit of {len(pending)} bookings failed, retrying row by row: {e}")
+            for item in pending:
+                try:
+                    self._insert([item])
+                except Exception as row_error:  # pylint: disable=broad-except
+                    item.future.set_exception(row_error)
+
+    def _dedupe(self, batch: List[Submission]) -> List[Submission]:
+        pending = []
+        seen = set()
+        for item in batch:
+            booking, future = item.booking, item.future
+            # Callers that timed out and cancelled are not written at all
+            if not future.set_running_or_notify_cancel():
+                continue
+            # The service checked the database, but two identical requests
+            # can still land in the same batch
+            key = duplicate_key(
+                booking.phone,
+                booking.travel_date,
+                booking.travel_time,
+                booking.bus_provider,
+                booking.from_district,
+                booking.to_district,
+                booking.dropping_point
+            )
+            if key in seen:
+                future.set_exception(DuplicateBooking(
+                    booking.phone,
+                    booking.travel_date,
+                    booking.travel_time,
+                    booking.bus_provider
+                ))
+                continue
+            seen.add(key)
+            pending.append(item)
+        return pending
+
+    def _insert(self, pending: List[Submission]):
+        """Claim seats and write bookings in one transaction, then resolve futures"""
+        db = self.session_factory()
+        try:
+            inventory = InventoryRepository(db)
+            refused = {}
+            # Counters are locked in a fixed order so batches can't deadlock
+            for i in sorted(
+                (i for i, item in enumerate(pending) if item.take_seat),
+                key=lambda i: trip_order(pending[i].booking.trip)
+            ):
+                try:
+                    inventory.claim(pending[i].booking.trip, pending[i].hold_id)
+                except (SeatsSoldOut, SeatHoldNotFound) as e:
+                    refused[i] = e
+            accepted = [item for i, item in enumerate(pending) if i not in refused]
+
+            rows = []
+            if accepted:
+                rows = db.execute(
+                    insert(BookingDB).returning(
+                        BookingDB.id,
+                        BookingDB.booking_date,
+                        sort_by_parameter_order=True
+                    ),
+                    [self._to_row(item.booking) for item in accepted]
+                ).all()
+                RollupRepository(db).apply(deltas_for(item.booking for item in accepted))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        # Only answered once committed; a rolled-back batch is retried
+        for i, e in refused.items():
+            pending[i].future.set_exception(e)
+        for item, row in zip(accepted, rows):
+            item.booking.id = row.id
+            item.booking.booking_date = row.booking_date
+            item.future.set_result(item.booking)
+
+    def _to_row(self, booking: Booking) -> dict:
+        return {
+            "name": booking.name,
+            "phone": booking.phone,
+            "bus_provider": booking.bus_provider,
+            "from_district": booking.from_district,
+            "to_district": booking.to_district,
+            "dropping_point": booking.dropping_point,
+            "price": booking.price,
+            "travel_date": booking.travel_date,
+            "travel_time": booking.travel_time,
+            "status": booking.status
+        }
+
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_booking_writer() -> Optional[GroupCommitWriter]:
+    """Process-wide group-commit writer, or None when disabled"""
+    global _writer
+
+    if not settings.BOOKING_GROUP_COMMIT_ENABLED:
+        return None
+    if _writer is None or not _writer.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = GroupCommitWriter()
+    return _writer
@@ -1,16 +1,78 @@
 """Repository for available buses"""
 import json
-from typing import List, Optional
+import os
+from functools import lru_cache
+from hashlib import sha256
+from typing import Dict, List, Optional, Tuple
 from app.domain.entities import BusRoute
 from app.config import get_settings
 
 settings = get_settings()
 
+class Catalogue:
+    """Parsed bus data with lookup indexes built once per file version"""
+
+    def __init__(self, data: dict, version: str):
+        self.data = data
+        self.version = version
+        self.districts_by_name: Dict[str, dict] = {d['name']: d for d in data['districts']}
+        self.fares: Dict[Tuple[str, str, str, str], float] = {}
+
+        for provider in data['bus_providers']:
+            for from_district in provider['coverage_districts']:
+                for to_district in provider['coverage_districts']:
+                    district = self.districts_by_name.get(to_district)
+                    if not district:
+                        continue
+                    for point in district['dropping_points']:
+                        key = (provider['name'], from_district, to_district, point['name'])
+                        self.fares[key] = point['price']
+
+def load_catalogue(path: str) -> Catalogue:
+    """Indexed bus data file, re-read whenever the file changes"""
+    stat = os.stat(path)
+    return _load_catalogue(path, stat.st_mtime_ns, stat.st_size)
+
+# Keyed on the file's mtime and size as well as its path, so an edit
+# produces a new Catalogue (and version) instead of the cached one
+@lru_cache(maxsize=4)
+def _load_catalogue(path: str, _mtime_ns: int, _size: int) -> Catalogue:
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return Catalogue(json.loads(raw), sha256(raw).hexdigest()[:12])
+
 class BusRepository:
     """Repository class for buses"""
     def __init__(self):
-        with open(settings.BUS_DATA_PATH, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
+        self.path = settings.BUS_DATA_PATH
+        load_catalogue(self.path)
+
+    @property
+    def catalogue(self) -> Catalogue:
+        """Current catalogue; a stat call unless the file changed"""
+        return load_catalogue(self.path)
+
+    @property
+    def data(self) -> dict:
+        """Parsed bus data file"""
+        return self.catalogue.data
+
+    @property
+    def version(self) -> str:
+        """Content hash of the bus data file"""
+        return self.catalogue.version
+
+    def get_fare(
+        self,
+        bus_provider: str,
+        from_district: str,
+        to_district: str,
+        dropping_point: str
+    ) -> Optional[float]:
+        """Current fare for a route and dropping point"""
+        return self.catalogue.fares.get(
+            (bus_provider, from_district, to_district, dropping_point)
+        )
 
     def get_districts(self) -> List[str]:
         """Get districts available to bus providers"""
@@ -28,16 +90,14 @@ class BusRepository:
     ) -> List[BusRoute]:
         """Search available routes"""
         routes = []
+        catalogue = self.catalogue
 
-        to_dist = next(
-            (d for d in self.data['districts'] if d['name'] == to_district),
-            None
-        )
+        to_dist = catalogue.districts_by_name.get(to_district)
 
         if not to_dist:
             return routes
 
-        for provider in self.data['bus_providers']:
+        for provider in catalogue.data['bus_providers']:
             if (from_district in provider['coverage_districts'] and
                 to_district in provider['coverage_districts']):
 
@@ -0,0 +1,199 @@
+"""Seat inventory repository"""
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.domain.entities import SeatHold, Trip
+from app.domain.exceptions import SeatHoldNotFound, SeatsSoldOut
+from app.infra.database.models import BookingDB, SeatHoldDB, TripInventoryDB
+
+settings = get_settings()
+
+TRIP_COLUMNS = ["bus_provider", "travel_date", "travel_time", "from_district", "to_district"]
+
+
+def trip_order(trip: Trip) -> tuple:
+    """Sort key for locking several trips' counters in one transaction"""
+    return tuple(getattr(trip, column) for column in TRIP_COLUMNS)
+
+
+class InventoryRepository:
+    """
+    Atomic seat counters per trip, and the holds taken from them.
+
+    A trip's row is created the first time a seat is taken, with
+    DEFAULT_SEAT_CAPACITY less the confirmed bookings already on it.
+    Every change is a single conditional UPDATE, so concurrent requests
+    can never push a counter below zero. A hold takes its seat when it
+    is created and hands it to the booking that uses it; lapsed holds
+    give theirs back the next time seats run short.
+
+    Only `hold` and `release_hold` commit. Everything else runs in the
+    caller's transaction, so a seat is taken together with the booking
+    that needs it.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def reserve(self, trip: Trip) -> Optional[int]:
+        """Take one seat; return seats left, or None when sold out"""
+        self._ensure_row(trip)
+        remaining = self._take(trip)
+        if remaining is None and self.release_expired_holds():
+            remaining = self._take(trip)
+        return remaining
+
+    def release(self, trip: Trip, seats: int = 1):
+        """Give seats back"""
+        self.db.execute(
+            update(TripInventoryDB)
+            .where(self._matches(trip))
+            .values(available=func.least(
+                TripInventoryDB.available + seats, TripInventoryDB.capacity
+            ))
+        )
+
+    def claim(self, trip: Trip, hold_id: Optional[str] = None):
+        """Take the seat for a booking, from its hold when it has one"""
+        if hold_id:
+            if not self._use_hold(hold_id, trip):
+                raise SeatHoldNotFound(hold_id)
+        elif self.reserve(trip) is None:
+            raise SeatsSoldOut(trip.bus_provider, trip.travel_date, trip.travel_time)
+
+    def hold(self, trip: Trip) -> Optional[SeatHold]:
+        """Take a seat for SEAT_HOLD_MINUTES and commit; None when sold out"""
+        if self.reserve(trip) is None:
+            # Keeps any lapsed holds given back while looking for a seat
+            self.db.commit()
+            return None
+
+        expires_at = datetime.utcnow() + timedelta(minutes=settings.SEAT_HOLD_MINUTES)
+        hold_id = uuid.uuid4().hex
+        self.db.execute(
+            insert(SeatHoldDB).values(hold_id=hold_id, expires_at=expires_at, **self._key(trip))
+        )
+        self.db.commit()
+        return SeatHold(hold_id=hold_id, trip=trip, expires_at=expires_at)
+
+    def release_hold(self, hold_id: str) -> bool:
+        """Give up a hold and its seat, and commit"""
+        row = self.db.execute(
+            delete(SeatHoldDB)
+            .where(SeatHoldDB.hold_id == hold_id)
+            .returning(*self._columns(SeatHoldDB))
+        ).first()
+        if row is None:
+            self.db.rollback()
+            return False
+        self.release(self._trip(row))
+        self.db.commit()
+        return True
+
+    def release_expired_holds(self) -> int:
+        """Delete lapsed holds and give their seats back"""
+        rows = self.db.execute(
+            delete(SeatHoldDB)
+            .where(SeatHoldDB.expires_at <= datetime.utcnow())
+            .returning(*self._columns(SeatHoldDB))
+        ).all()
+        # Each row is deleted by exactly one transaction, so a seat is
+        # never given back twice; trips are updated in a fixed order so
+        # concurrent sweeps can't deadlock
+        released = Counter(self._trip(row) for row in rows)
+        for trip in sorted(released, key=trip_order):
+            self.release(trip, released[trip])
+        return len(rows)
+
+    def get_available(self, trips: Iterable[Trip]) -> Dict[Trip, int]:
+        """Seats left per trip, counting lapsed holds as free"""
+        trips = list(set(trips))
+        if not trips:
+            return {}
+
+        available = {}
+        capacity = {}
+        rows = self.db.query(TripInventoryDB).filter(
+            or_(*[self._matches(trip) for trip in trips])
+        ).all()
+        for row in rows:
+            trip = self._trip(row)
+            available[trip] = row.available
+            capacity[trip] = row.capacity
+
+        lapsed = self._count(
+            SeatHoldDB, list(available), SeatHoldDB.expires_at <= datetime.utcnow()
+        )
+        for trip, seats in lapsed.items():
+            available[trip] = min(available[trip] + seats, capacity[trip])
+
+        missing = [trip for trip in trips if trip not in available]
+        booked = self._count(BookingDB, missing, BookingDB.status == "confirmed")
+        for trip in missing:
+            available[trip] = max(settings.DEFAULT_SEAT_CAPACITY - booked.get(trip, 0), 0)
+        return available
+
+    def _ensure_row(self, trip: Trip):
+        """Create the trip's counter, net of bookings made before it existed"""
+        booked = select(func.count()).select_from(BookingDB).where(
+            self._matches(trip, BookingDB),
+            BookingDB.status == "confirmed"
+        ).scalar_subquery()
+        self.db.execute(
+            insert(TripInventoryDB).values(
+                **self._key(trip),
+                capacity=settings.DEFAULT_SEAT_CAPACITY,
+                available=func.greatest(settings.DEFAULT_SEAT_CAPACITY - booked, 0)
+            ).on_conflict_do_nothing()
+        )
+
+    def _take(self, trip: Trip) -> Optional[int]:
+        return self.db.execute(
+            update(TripInventoryDB)
+            .where(self._matches(trip), TripInventoryDB.available > 0)
+            .values(available=TripInventoryDB.available - 1)
+            .returning(TripInventoryDB.available)
+        ).scalar()
+
+    def _use_hold(self, hold_id: str, trip: Trip) -> bool:
+        """Delete a live hold for `trip`; its seat goes to the booking"""
+        return self.db.execute(
+            delete(SeatHoldDB)
+            .where(
+                SeatHoldDB.hold_id == hold_id,
+                self._matches(trip, SeatHoldDB),
+                SeatHoldDB.expires_at > datetime.utcnow()
+            )
+            .returning(SeatHoldDB.hold_id)
+        ).scalar() is not None
+
+    def _count(self, model, trips: List[Trip], *conditions) -> Dict[Trip, int]:
+        """Rows of `model` per trip"""
+        if not trips:
+            return {}
+        columns = self._columns(model)
+        rows = self.db.execute(
+            select(*columns, func.count())
+            .where(or_(*[self._matches(trip, model) for trip in trips]), *conditions)
+            .group_by(*columns)
+        ).all()
+        return {self._trip(row): row[-1] for row in rows}
+
+    def _key(self, trip: Trip) -> dict:
+        return {column: getattr(trip, column) for column in TRIP_COLUMNS}
+
+    def _trip(self, row) -> Trip:
+        return Trip(**{column: getattr(row, column) for column in TRIP_COLUMNS})
+
+    def _columns(self, model) -> list:
+        return [getattr(model, column) for column in TRIP_COLUMNS]
+
+    def _matches(self, trip: Trip, model=TripInventoryDB):
+        return and_(*[
+            getattr(model, column) == getattr(trip, column) for column in TRIP_COLUMNS
+        ])
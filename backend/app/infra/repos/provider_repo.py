@@ -1,4 +1,5 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from app.infra.rag.provider_cards import extract_contact_info, extract_policy_lines
 from app.infra.rag.vector_store import VectorStoreService
 from app.config import get_settings
 
@@ -7,9 +8,17 @@ settings = get_settings()
 class ProviderRepository:
     """Repository for provider information using Langchain"""
 
-    def __init__(self, vector_store: VectorStoreService):
+    def __init__(self, vector_store: VectorStoreService, index: bool = True):
         self.vector_store = vector_store
-        self.vector_store.index_documents(settings.PROVIDER_DOCS_PATH)
+        if index:
+            self.vector_store.index_documents(settings.PROVIDER_DOCS_PATH)
+        else:
+            # Indexed by another process; only read what it wrote
+            self.vector_store.load_index(settings.PROVIDER_DOCS_PATH)
+
+    def refresh(self) -> bool:
+        """Pick up an index rebuilt by another process; True if it changed"""
+        return self.vector_store.refresh_index(settings.PROVIDER_DOCS_PATH)
 
     def semantic_search(
         self,
@@ -17,48 +26,88 @@ class ProviderRepository:
         provider_name: Optional[str] = None,
         k: int = 3
     ) -> List[dict]:
-        """RAG-based semantic search using langchain"""
+        """
+        RAG-based semantic search using langchain, fused with BM25 when
+        hybrid search is enabled.
 
-        results = self.vector_store.similarity_search(query, provider_name, k)
+        Searches chunks, then merges hits per provider so each result is
+        one provider with its best score and matching sections in
+        document order. Contact details come from the provider's card,
+        so they are complete even when the contact chunk was not a hit.
+        """
+        search = self.vector_store.hybrid_search if settings.HYBRID_SEARCH_ENABLED \
+            else self.vector_store.similarity_search
+        results = search(query, provider_name, k * settings.PROVIDER_SEARCH_OVERSAMPLE)
+        return self._merge_hits(results, k)
 
-        formatted_results = []
-        for doc, score in results:
-            contact_info = self._extract_contact_info(
-                doc.page_content,
-                doc.metadata['provider']
+    def batch_semantic_search(
+        self,
+        searches: List[Tuple[str, Optional[str], int]]
+    ) -> List[List[dict]]:
+        """
+        `semantic_search` for many (query, provider, k) at once.
+
+        Searches are grouped by k, and each group is embedded in one
+        model call and searched in bulk with its own oversampled depth,
+        so a single large k doesn't deepen every other search.
+        """
+        by_k = {}
+        for i, (_, _, k) in enumerate(searches):
+            by_k.setdefault(k, []).append(i)
+
+        results: List[List[dict]] = [[] for _ in searches]
+        for k, indexes in by_k.items():
+            hits = self.vector_store.batch_search(
+                [searches[i][0] for i in indexes],
+                [searches[i][1] for i in indexes],
+                k * settings.PROVIDER_SEARCH_OVERSAMPLE,
+                hybrid=settings.HYBRID_SEARCH_ENABLED
             )
+            for i, search_hits in zip(indexes, hits):
+                results[i] = self._merge_hits(search_hits, k)
+        return results
 
-            formatted_results.append({
-                'provider': doc.metadata['provider'],
-                'content': doc.page_content,
+    def _merge_hits(self, results: List[tuple], k: int) -> List[dict]:
+        """One result per provider, best first, with its card details"""
+        merged = {}
+        for doc, score in results:
+            provider = doc.metadata['provider']
+            hit = merged.setdefault(provider, {
+                'provider': provider,
                 'similarity': float(1 - score),
-                'contact_info': contact_info,
+                'chunks': [],
                 'source': doc.metadata.get('source', '')
             })
+            hit['chunks'].append(doc)
+
+        formatted_results = []
+        # Insertion order follows the best hit of each provider
+        for hit in list(merged.values())[:k]:
+            chunks = sorted(hit.pop('chunks'), key=lambda doc: doc.metadata.get('offset', 0))
+            hit['content'] = '\n\n'.join(self._chunk_text(doc) for doc in chunks)
+            hit['sections'] = [doc.metadata.get('section') for doc in chunks]
+            card = self.get_card(hit['provider'])
+            hit['contact_info'] = dict(card['contact']) if card else \
+                extract_contact_info(hit['content'], hit['provider'])
+            hit['policy'] = card['policy'] if card else extract_policy_lines(hit['content'])
+            formatted_results.append(hit)
         return formatted_results
 
-    def _extract_contact_info(self, content: str, provider: str) -> dict:
-        """Extract structured contact information from document content"""
-        lines = content.split('\n')
-        info = {
-            'provider': provider,
-            'address': '',
-            'phone': '',
-            'email': '',
-            'website': ''
-        }
+    def _chunk_text(self, doc) -> str:
+        """Chunk text without the provider line added for embedding"""
+        prefix = f"{doc.metadata['provider']}\n"
+        if doc.page_content.startswith(prefix):
+            return doc.page_content[len(prefix):]
+        return doc.page_content
+
+    def get_card(self, provider_name: str) -> Optional[dict]:
+        """Contact fields and policy snippets extracted at index time"""
+        return self.vector_store.cards.get(provider_name)
 
-        for line in lines:
-            line = line.strip()
-            if 'Address:' in line or 'Official Address:' in line:
-                info['address'] = line.split(':', 1)[1].strip()
-            elif 'Contact' in line or 'Phone' in line or 'Tel:' in line:
-                info['phone'] = line.split(':', 1)[1].strip() if ':' in line else line
-            elif 'Email:' in line:
-                info['email'] = line.split(':', 1)[1].strip()
-            elif 'Link:' in line or 'website' in line.lower():
-                info['website'] = line.split(':', 1)[1].strip() if ':' in line else ''
-        return info
+    @property
+    def index_version(self) -> str:
+        """Changes whenever indexed provider documents change"""
+        return self.vector_store.index_version
 
     def get_retriever(self, k: int = 3):
         """Get langchain retriever for RAG chains"""
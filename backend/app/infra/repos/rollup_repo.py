@@ -0,0 +1,173 @@
+"""Repository for incrementally maintained booking rollups"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.domain.entities import Booking, BookingRollup
+from app.infra.database.models import BookingDB, BookingRollupDB
+
+
+class RollupDeltas:
+    """Accumulate rollup changes before writing them in one upsert"""
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: [0, 0, Decimal(0)])
+
+    def _row(self, booking: Booking) -> list:
+        return self.rows[(
+            booking.travel_date,
+            booking.bus_provider,
+            booking.from_district,
+            booking.to_district
+        )]
+
+    def booked(self, booking: Booking):
+        """Count a new confirmed booking"""
+        row = self._row(booking)
+        row[0] += 1
+        row[2] += Decimal(str(booking.price))
+
+    def canceled(self, booking: Booking):
+        """Count a cancellation"""
+        row = self._row(booking)
+        row[1] += 1
+        row[2] -= Decimal(str(booking.price))
+
+    def reconfirmed(self, booking: Booking):
+        """Undo a cancellation"""
+        row = self._row(booking)
+        row[1] -= 1
+        row[2] += Decimal(str(booking.price))
+
+
+class RollupRepository:
+    """
+    Booking totals per provider, route and travel date.
+
+    Writers call `apply` inside their own transaction, so rollups commit
+    or roll back together with the bookings they describe. Revenue is the
+    sum of prices of bookings that are still confirmed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, deltas: RollupDeltas):
+        """Upsert deltas without committing"""
+        if not deltas.rows:
+            return
+
+        rows = [
+            {
+                "travel_date": key[0],
+                "bus_provider": key[1],
+                "from_district": key[2],
+                "to_district": key[3],
+                "bookings": values[0],
+                "cancellations": values[1],
+                "revenue": values[2]
+            }
+            # Sorted so concurrent writers lock rows in the same order
+            for key, values in sorted(deltas.rows.items())
+        ]
+        stmt = insert(BookingRollupDB).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                BookingRollupDB.travel_date,
+                BookingRollupDB.bus_provider,
+                BookingRollupDB.from_district,
+                BookingRollupDB.to_district
+            ],
+            set_={
+                "bookings": BookingRollupDB.bookings + stmt.excluded.bookings,
+                "cancellations": BookingRollupDB.cancellations + stmt.excluded.cancellations,
+                "revenue": BookingRollupDB.revenue + stmt.excluded.revenue
+            }
+        )
+        self.db.execute(stmt)
+
+    def find(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        bus_provider: Optional[str] = None,
+        from_district: Optional[str] = None,
+        to_district: Optional[str] = None
+    ) -> List[BookingRollup]:
+        """Read rollups matching the filters"""
+        query = self.db.query(BookingRollupDB)
+        if date_from:
+            query = query.filter(BookingRollupDB.travel_date >= date_from)
+        if date_to:
+            query = query.filter(BookingRollupDB.travel_date <= date_to)
+        if bus_provider:
+            query = query.filter(BookingRollupDB.bus_provider == bus_provider)
+        if from_district:
+            query = query.filter(BookingRollupDB.from_district == from_district)
+        if to_district:
+            query = query.filter(BookingRollupDB.to_district == to_district)
+
+        rows = query.order_by(
+            BookingRollupDB.travel_date,
+            BookingRollupDB.bus_provider,
+            BookingRollupDB.from_district,
+            BookingRollupDB.to_district
+        ).all()
+        return [self._to_entity(r) for r in rows]
+
+    def rebuild(self) -> int:
+        """Recompute every rollup from the bookings table and commit"""
+        is_canceled = BookingDB.status == "canceled"
+        totals = select(
+            BookingDB.travel_date,
+            BookingDB.bus_provider,
+            BookingDB.from_district,
+            BookingDB.to_district,
+            func.count(),
+            func.count(case((is_canceled, 1))),
+            func.coalesce(func.sum(case((is_canceled, 0), else_=BookingDB.price)), 0)
+        ).group_by(
+            BookingDB.travel_date,
+            BookingDB.bus_provider,
+            BookingDB.from_district,
+            BookingDB.to_district
+        )
+
+        # Writers upsert rollups before committing, so this waits for
+        # in-flight writers and holds back new ones until the rebuild commits
+        self.db.execute(text("LOCK TABLE booking_rollups IN EXCLUSIVE MODE"))
+        self.db.execute(delete(BookingRollupDB))
+        result = self.db.execute(
+            insert(BookingRollupDB).from_select(
+                [
+                    "travel_date", "bus_provider", "from_district", "to_district",
+                    "bookings", "cancellations", "revenue"
+                ],
+                totals
+            )
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def _to_entity(self, row: BookingRollupDB) -> BookingRollup:
+        return BookingRollup(
+            travel_date=row.travel_date,
+            bus_provider=row.bus_provider,
+            from_district=row.from_district,
+            to_district=row.to_district,
+            bookings=row.bookings,
+            cancellations=row.cancellations,
+            revenue=float(row.revenue)
+        )
+
+
+def deltas_for(bookings: Iterable[Booking]) -> RollupDeltas:
+    """Deltas for a batch of newly confirmed bookings"""
+    deltas = RollupDeltas()
+    for booking in bookings:
+        if booking.status == "confirmed":
+            deltas.booked(booking)
+    return deltas
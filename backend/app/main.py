@@ -1,15 +1,38 @@
 """Main file"""
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.infra.database.connection import engine
 from app.infra.database import models
-from app.api.routes import bookings, search, rag
+from app.api.routes import bookings, search, rag, metrics, analytics
 from app.middleware.logger import LoggerMiddleware
+from app.infra.rag.rag_executor import shutdown_rag_executor
+from app import preload
+from app.startup import readiness, rebuild_duplicate_filter, stop_docs_watcher, warm_up
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Prepare the database, then warm up RAG without blocking /health"""
+    if not preload.preloaded:
+        # Otherwise the pre-fork master did it once for every worker
+        models.Base.metadata.create_all(engine)
+        models.ensure_indexes(engine)
+    # Before serving, so no booking written meanwhile is lost by the rebuild;
+    # a no-op under gunicorn, which turns the filter off
+    rebuild_duplicate_filter()
 
-models.Base.metadata.create_all(engine)
+    warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    yield
+    if not warm_up_task.done():
+        warm_up_task.cancel()
+    stop_docs_watcher()
+    shutdown_rag_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(LoggerMiddleware)
 
@@ -24,8 +47,16 @@ app.add_middleware(
 app.include_router(bookings.router, prefix="/api")
 app.include_router(search.router, prefix="/api")
 app.include_router(rag.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
 
 @app.get("/health")
 def health():
     """Health check"""
     return {"status": "healthy"}
+
+@app.get("/ready")
+def ready():
+    """Readiness probe, green once the model and RAG service are warmed up"""
+    state = readiness.snapshot()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
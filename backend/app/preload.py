@@ -0,0 +1,104 @@
+"""Shared state loaded once in a pre-fork master, and worker memory"""
+import gc
+import time
+from typing import Dict, List, Union
+from app.config import get_settings
+from app.domain.services.query_matcher import get_query_matcher
+from app.infra.repos.bus_repo import BusRepository
+from app.infra.rag.model_registry import get_embedding_model
+from app.infra.rag.rag_executor import run_in_subprocess
+
+settings = get_settings()
+
+# Set in the master by preload(); forked workers inherit it and skip the
+# schema setup and indexing it already did
+preloaded = False
+
+
+def prepare() -> dict:
+    """Create tables and indexes, then index provider documents"""
+    # Imported here: this runs in a spawned process, not in the master
+    from app.infra.database import models
+    from app.infra.database.connection import engine
+    from app.infra.rag.vector_store import index_provider_documents
+
+    models.Base.metadata.create_all(engine)
+    models.ensure_indexes(engine)
+    return index_provider_documents()
+
+
+def preload():
+    """
+    Prepare the database and index, load the catalogue, its matcher and
+    the embedding model, then freeze gc.
+
+    Runs in the master before it forks, so workers inherit the pages
+    copy-on-write. Only fork-safe state is loaded here: nothing starts a
+    thread or opens a SQLite, Chroma or Postgres connection, and no
+    inference runs, so torch's thread pool is not started either. Schema
+    setup and indexing need all of those, so `prepare` runs them once in
+    a spawned process; workers then only open the index. The NumPy index
+    is shared through its memory map; Chroma holds its index in each
+    process and pgvector keeps it in Postgres.
+
+    `gc.freeze()` moves everything loaded so far out of the collector's
+    generations, so workers' collections don't write to those pages.
+    """
+    global preloaded
+
+    start = time.perf_counter()
+    print(f"Prepared provider index: {run_in_subprocess(prepare)}")
+    bus_repo = BusRepository()
+    get_query_matcher(
+        bus_repo.version,
+        tuple(p['name'] for p in bus_repo.get_providers()),
+        tuple(bus_repo.get_districts())
+    )
+    if settings.RAG_EXECUTOR_PROCESSES == 0:
+        # Otherwise the model lives in the spawned RAG workers instead
+        get_embedding_model()
+
+    preloaded = True
+    gc.collect()
+    gc.freeze()
+    print(
+        f"Preloaded in {time.perf_counter() - start:.1f}s, "
+        f"{gc.get_freeze_count()} objects frozen"
+    )
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, float]:
+    """
+    Resident, proportional and unique memory of a process in MB.
+
+    RSS counts shared pages in full in every worker, so it overstates the
+    total. USS (private pages) is what each extra worker really costs and
+    PSS splits shared pages between the processes that map them.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup", 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get('Rss', 0.0), 1),
+        "pss_mb": round(fields.get('Pss', 0.0), 1),
+        "uss_mb": round(fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0), 1),
+        "shared_mb": round(fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0), 1)
+    }
+
+
+def worker_memory_report(master_pid: int) -> List[dict]:
+    """Memory of a master and each of its workers"""
+    with open(f"/proc/{master_pid}/task/{master_pid}/children", 'r', encoding='utf-8') as f:
+        workers = [int(pid) for pid in f.read().split()]
+
+    report = [{"pid": master_pid, "role": "master", **process_memory(master_pid)}]
+    for pid in workers:
+        try:
+            report.append({"pid": pid, "role": "worker", **process_memory(pid)})
+        except FileNotFoundError:
+            # Exited since the children list was read
+            continue
+    return report
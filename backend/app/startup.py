@@ -0,0 +1,121 @@
+"""Startup warm-up and readiness tracking"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+from app.infra.database.connection import SessionLocal
+from app.infra.cache.booking_filter import get_duplicate_filter
+from app.infra.repos.bus_repo import BusRepository
+from app.config import get_settings
+from app.infra.rag.model_registry import get_embedding_model
+from app.infra.rag.rag_executor import get_rag_executor, run_in_subprocess
+from app.infra.rag.vector_store import get_vector_store, index_provider_documents
+from app.infra.rag.docs_watcher import DocsWatcher
+from app import preload
+
+settings = get_settings()
+
+WARMUP_TEXTS = [
+    "hanif contact number",
+    "green line office address",
+    "buses from dhaka to chattogram under 600 taka",
+]
+
+
+class Readiness:
+    """Which startup steps have finished and how long they took"""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def run(self, name: str, step: Callable):
+        """Run a step and record its duration"""
+        start = time.perf_counter()
+        step()
+        with self._lock:
+            self.steps[name] = round(time.perf_counter() - start, 3)
+
+    def snapshot(self) -> dict:
+        """Readiness state for the /ready probe"""
+        with self._lock:
+            return {
+                "ready": self.ready,
+                "steps": dict(self.steps),
+                "error": self.error
+            }
+
+
+readiness = Readiness()
+docs_watcher: Optional[DocsWatcher] = None
+
+
+def rebuild_duplicate_filter():
+    """Load existing bookings into the duplicate filter"""
+    duplicate_filter = get_duplicate_filter()
+    if duplicate_filter is None:
+        return
+    db = SessionLocal()
+    try:
+        duplicate_filter.rebuild(db)
+    finally:
+        db.close()
+
+
+def warm_up():
+    """Build the catalogue, model, vector store and RAG service, then exercise them"""
+    # Imported here so the route module's singletons are the ones warmed up
+    from app.api.routes.rag import get_rag_service, init_query_worker, run_query
+
+    try:
+        readiness.run("catalogue", BusRepository)
+        if settings.RAG_EXECUTOR_PROCESSES > 0:
+            # The model and index live in the workers; this process
+            # never loads them. The index is built first, in a process of its own (or by the
+            # pre-fork master), so the workers only open it
+            if not preload.preloaded:
+                readiness.run(
+                    "provider_index", lambda: run_in_subprocess(index_provider_documents)
+                )
+            readiness.run(
+                "rag_workers",
+                lambda: get_rag_executor(init_query_worker).warm_up(run_query, WARMUP_TEXTS[0])
+            )
+            if settings.PROVIDER_DOCS_WATCH:
+                # Workers notice the new manifest and reload it themselves
+                start_docs_watcher(lambda: run_in_subprocess(index_provider_documents))
+        else:
+            readiness.run("embedding_model", get_embedding_model)
+            readiness.run("rag_service", lambda: get_rag_service(index=not preload.preloaded))
+            readiness.run(
+                "model_inference",
+                lambda: get_embedding_model().embed_documents(WARMUP_TEXTS)
+            )
+            readiness.run(
+                "rag_queries",
+                lambda: [get_rag_service().query(text) for text in WARMUP_TEXTS]
+            )
+            if settings.PROVIDER_DOCS_WATCH:
+                start_docs_watcher(
+                    lambda: get_vector_store().index_documents(settings.PROVIDER_DOCS_PATH)
+                )
+        readiness.ready = True
+        print(f"Warm-up finished: {readiness.steps}")
+    except Exception as e:
+        readiness.error = f"{type(e).__name__}: {e}"
+        print(f"Warm-up failed: {readiness.error}")
+
+
+def start_docs_watcher(reindex: Callable):
+    """Reindex provider documents whenever they change"""
+    global docs_watcher
+
+    docs_watcher = DocsWatcher(reindex, settings.PROVIDER_DOCS_PATH)
+    docs_watcher.start()
+
+
+def stop_docs_watcher():
+    """Stop the provider documents watcher if it is running"""
+    if docs_watcher is not None:
+        docs_watcher.stop()
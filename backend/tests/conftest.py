@@ -0,0 +1,109 @@
+"""
+Shared fixtures.
+
+Database tests run against the Postgres configured by the DB_* settings
+(.env or the environment) and are skipped when it is not reachable.
+"""
+import os
+import uuid
+from datetime import date
+import pytest
+
+# Process-local caches and filters would hide what the database does
+os.environ.setdefault("BOOKING_CACHE_BACKEND", "none")
+os.environ.setdefault("QUERY_CACHE_BACKEND", "none")
+os.environ.setdefault("DUPLICATE_FILTER_ENABLED", "false")
+os.environ.setdefault("BOOKING_GROUP_COMMIT_ENABLED", "false")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Database with the app's tables"""
+    from sqlalchemy.exc import OperationalError
+    from app.infra.database import models
+    from app.infra.database.connection import engine as db_engine
+
+    try:
+        models.Base.metadata.create_all(db_engine)
+    except OperationalError as e:
+        pytest.skip(f"Postgres is not reachable: {e.orig}")
+    return db_engine
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Opens sessions on the test database"""
+    from app.infra.database.connection import SessionLocal
+    return SessionLocal
+
+
+@pytest.fixture
+def trip(engine):
+    """A departure no other test uses; its rows are deleted afterwards"""
+    from sqlalchemy import delete
+    from app.domain.entities import Trip
+    from app.infra.database.models import (
+        BookingDB, BookingRollupDB, SeatHoldDB, TripInventoryDB
+    )
+
+    provider = f"Test {uuid.uuid4().hex[:8]}"
+    yield Trip(
+        bus_provider=provider,
+        travel_date=date(2099, 1, 1),
+        travel_time="08:00",
+        from_district="Dhaka",
+        to_district="Comilla"
+    )
+    with engine.begin() as conn:
+        for model in (BookingDB, BookingRollupDB, SeatHoldDB, TripInventoryDB):
+            conn.execute(delete(model).where(model.bus_provider == provider))
+
+
+@pytest.fixture
+def capacity(monkeypatch):
+    """Set the seats per trip for newly created counters"""
+    from app.config import get_settings
+
+    def set_capacity(seats: int):
+        monkeypatch.setattr(get_settings(), "DEFAULT_SEAT_CAPACITY", seats)
+    return set_capacity
+
+
+class HashEmbeddings:
+    """Unit bag-of-words vectors; stands in for the embedding model"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        import re
+        import zlib
+        from app.config import get_settings
+
+        # Sized like the model's, so they fit the pgvector column
+        dim = get_settings().EMBEDDING_DIM
+        vector = [0.0] * dim
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % dim] += 1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+
+@pytest.fixture
+def embeddings():
+    """Deterministic embeddings, no model download"""
+    return HashEmbeddings()
+
+
+@pytest.fixture
+def provider_docs(tmp_path, monkeypatch):
+    """A copy of the provider documents, indexed into a scratch directory"""
+    import shutil
+    from app.config import get_settings
+
+    docs = tmp_path / "provider_docs"
+    shutil.copytree(os.path.join(os.path.dirname(__file__), "../../data/provider_docs"), docs)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PROVIDER_DOCS_PATH", str(docs))
+    monkeypatch.setattr(settings, "CHROMA_PERSIST_DIR", str(tmp_path / "index"))
+    return docs
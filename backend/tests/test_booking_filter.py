@@ -0,0 +1,130 @@
+"""Counting Bloom filter behind the duplicate-booking check"""
+from datetime import date, timedelta
+import pytest
+from app.config import get_settings
+from app.infra.cache import booking_filter
+from app.infra.cache.booking_filter import (
+    CountingBloomFilter, DuplicateBookingFilter, duplicate_key, get_duplicate_filter
+)
+
+settings = get_settings()
+
+
+def _key(phone: str = "01711111111", travel_date=date(2099, 1, 1)) -> str:
+    return duplicate_key(phone, travel_date, "08:00", "Hanif", "Dhaka", "Comilla", "Chawk Bazar")
+
+
+def test_add_and_remove_keep_the_count():
+    bloom = CountingBloomFilter(1000, 0.01)
+    bloom.add("a")
+    bloom.add("b")
+    assert "a" in bloom and "b" in bloom
+    assert bloom.count == 2
+
+    bloom.remove("a")
+    assert "a" not in bloom
+    assert "b" in bloom
+    assert bloom.count == 1
+
+
+def test_removing_an_absent_key_changes_nothing():
+    bloom = CountingBloomFilter(1000, 0.01)
+    bloom.add("a")
+    counters = bytes(bloom.counters)
+
+    bloom.remove("never added")
+
+    assert bytes(bloom.counters) == counters
+    assert bloom.count == 1
+
+
+def test_saturated_counters_are_never_decremented():
+    bloom = CountingBloomFilter(1, 0.5)
+    for _ in range(CountingBloomFilter.MAX_COUNT + 10):
+        bloom.add("a")
+    for _ in range(CountingBloomFilter.MAX_COUNT + 10):
+        bloom.remove("a")
+    assert "a" in bloom
+
+
+def test_key_normalises_phone_and_case():
+    assert _key("017-1111 1111") == _key("01711111111")
+    assert duplicate_key("1", "2099-01-01", "08:00 ", " HANIF", "dhaka", "Comilla", "X") \
+        == duplicate_key("1", date(2099, 1, 1), "08:00", "Hanif", "Dhaka", "comilla", "x")
+
+
+def test_might_contain_outside_the_loaded_window():
+    duplicate_filter = DuplicateBookingFilter(capacity=1000, error_rate=0.01)
+    assert duplicate_filter.might_contain(_key())
+
+    duplicate_filter.ready = True
+    duplicate_filter.window_start = date.today()
+    yesterday = date.today() - timedelta(days=1)
+    tomorrow = date.today() + timedelta(days=1)
+
+    assert duplicate_filter.might_contain(_key(travel_date=yesterday), yesterday)
+    assert duplicate_filter.might_contain(_key(travel_date=yesterday), yesterday.isoformat())
+    assert not duplicate_filter.might_contain(_key(travel_date=tomorrow), tomorrow)
+    assert duplicate_filter.stats()["skipped_queries"] == 1
+    assert duplicate_filter.stats()["checks"] == 4
+
+    duplicate_filter.add(_key(travel_date=tomorrow))
+    assert duplicate_filter.might_contain(_key(travel_date=tomorrow), tomorrow)
+    duplicate_filter.remove(_key(travel_date=tomorrow))
+    assert not duplicate_filter.might_contain(_key(travel_date=tomorrow), tomorrow)
+
+
+def test_false_positive_rate_and_memory():
+    bloom = CountingBloomFilter(1000, 0.01)
+    # m = -n ln p / (ln 2)^2 one-byte counters, k = m/n ln 2
+    assert bloom.size == 9586
+    assert bloom.memory_bytes == bloom.size
+    assert bloom.hash_count == 7
+    assert bloom.false_positive_rate == 0.0
+
+    for i in range(1000):
+        bloom.add(f"member {i}")
+    assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.1)
+
+    false_positives = sum(f"outsider {i}" in bloom for i in range(20_000))
+    assert false_positives / 20_000 < 0.02
+
+
+def test_stats_report_the_filter():
+    duplicate_filter = DuplicateBookingFilter(capacity=1000, error_rate=0.01)
+    duplicate_filter.add_many([_key("1"), _key("2")])
+    stats = duplicate_filter.stats()
+    assert stats["keys"] == 2
+    assert stats["slots"] == stats["memory_bytes"] == 9586
+    assert stats["target_false_positive_rate"] == 0.01
+    assert 0 < stats["false_positive_rate"] < 0.01
+
+
+@pytest.fixture
+def enabled_filter(tmp_path, monkeypatch):
+    """Filter enabled, with a lock file no other test shares"""
+    monkeypatch.setattr(settings, "DUPLICATE_FILTER_ENABLED", True)
+    monkeypatch.setattr(settings, "DUPLICATE_FILTER_LOCK_PATH", str(tmp_path / "filter.lock"))
+    monkeypatch.setattr(booking_filter, "_duplicate_filter", None)
+    monkeypatch.setattr(booking_filter, "_single_process_lock", None)
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    yield
+    if booking_filter._single_process_lock is not None:
+        booking_filter._single_process_lock.close()
+
+
+def test_filter_is_shared_within_a_process(enabled_filter):
+    assert get_duplicate_filter() is get_duplicate_filter()
+
+
+def test_filter_refuses_a_second_process_on_the_host(enabled_filter):
+    get_duplicate_filter()
+    # Another open of the lock file stands in for a second worker
+    with pytest.raises(RuntimeError, match="another process"):
+        booking_filter._claim_single_process()
+
+
+def test_filter_refuses_several_workers(enabled_filter, monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError, match="WEB_CONCURRENCY"):
+        get_duplicate_filter()
@@ -0,0 +1,124 @@
+"""Group-commit writer: batching, retries, cancellation and dedupe"""
+import threading
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import DataError
+from app.config import get_settings
+from app.domain.entities import Booking, Trip
+from app.domain.exceptions import DuplicateBooking
+from app.infra.database.models import BookingDB
+from app.infra.repos import booking_writer
+from app.infra.repos.booking_writer import GroupCommitWriter, get_booking_writer
+
+settings = get_settings()
+
+
+def _booking(trip: Trip, phone: str, price: float = 500) -> Booking:
+    return Booking(
+        name="Test Passenger",
+        phone=phone,
+        bus_provider=trip.bus_provider,
+        from_district=trip.from_district,
+        to_district=trip.to_district,
+        dropping_point="Chawk Bazar",
+        price=price,
+        travel_date=trip.travel_date,
+        travel_time=trip.travel_time
+    )
+
+
+def _phones(session_factory, trip: Trip) -> list:
+    db = session_factory()
+    try:
+        return sorted(db.execute(
+            select(BookingDB.phone).where(BookingDB.bus_provider == trip.bus_provider)
+        ).scalars())
+    finally:
+        db.close()
+
+
+def _outcome(future):
+    try:
+        return future.result(timeout=10)
+    except Exception as e:  # pylint: disable=broad-except
+        return e
+
+
+def test_one_bad_row_fails_only_its_own_future(session_factory, trip):
+    writer = GroupCommitWriter(session_factory, window_ms=200, max_batch=20)
+    phones = [f"0171000000{i}" for i in range(4)]
+    futures = [writer.submit(_booking(trip, phone)) for phone in phones[:3]]
+    # Overflows NUMERIC(10, 2), so the batch INSERT fails as a whole
+    futures.append(writer.submit(_booking(trip, phones[3], price=10**12)))
+
+    outcomes = [_outcome(future) for future in futures]
+
+    assert all(isinstance(outcome, Booking) and outcome.id for outcome in outcomes[:3])
+    assert isinstance(outcomes[3], DataError)
+    assert _phones(session_factory, trip) == phones[:3]
+
+
+def test_cancelled_submission_is_never_written(session_factory, trip):
+    writer = GroupCommitWriter(session_factory, window_ms=300, max_batch=20)
+    kept = writer.submit(_booking(trip, "01720000000"))
+    dropped = writer.submit(_booking(trip, "01720000001"))
+    # Still queued: the window is open, so the batch has not been flushed
+    assert dropped.cancel()
+
+    assert isinstance(_outcome(kept), Booking)
+    assert dropped.cancelled()
+    assert _phones(session_factory, trip) == ["01720000000"]
+
+
+def test_identical_submissions_in_one_batch_insert_once(session_factory, trip):
+    writer = GroupCommitWriter(session_factory, window_ms=200, max_batch=20)
+    futures = [writer.submit(_booking(trip, "01730000000")) for _ in range(2)]
+
+    outcomes = [_outcome(future) for future in futures]
+
+    assert sum(isinstance(outcome, Booking) for outcome in outcomes) == 1
+    assert sum(isinstance(outcome, DuplicateBooking) for outcome in outcomes) == 1
+    assert _phones(session_factory, trip) == ["01730000000"]
+
+
+def test_dead_writer_thread_is_replaced(session_factory, trip, monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_GROUP_COMMIT_ENABLED", True)
+    monkeypatch.setattr(booking_writer, "_writer", None)
+
+    writer = get_booking_writer()
+    assert get_booking_writer() is writer
+
+    finished = threading.Thread(target=lambda: None)
+    finished.start()
+    finished.join()
+    # Stands in for a writer thread that died
+    monkeypatch.setattr(writer, "_thread", finished)
+
+    replacement = get_booking_writer()
+    assert replacement is not writer
+    assert replacement.is_alive()
+    assert isinstance(_outcome(replacement.submit(_booking(trip, "01740000000"))), Booking)
+
+
+def test_disabled_writer_is_none(monkeypatch):
+    monkeypatch.setattr(settings, "BOOKING_GROUP_COMMIT_ENABLED", False)
+    assert get_booking_writer() is None
+
+
+@pytest.mark.parametrize("count", [1, 5])
+def test_every_row_of_a_batch_gets_its_id(session_factory, trip, count):
+    writer = GroupCommitWriter(session_factory, window_ms=100, max_batch=20)
+    futures = [writer.submit(_booking(trip, f"0175000000{i}")) for i in range(count)]
+
+    bookings = [future.result(timeout=10) for future in futures]
+
+    assert len({booking.id for booking in bookings}) == count
+    assert [booking.phone for booking in bookings] == [f"0175000000{i}" for i in range(count)]
+    db = session_factory()
+    try:
+        assert db.execute(
+            select(func.count()).select_from(BookingDB)
+            .where(BookingDB.bus_provider == trip.bus_provider)
+        ).scalar() == count
+    finally:
+        db.close()
@@ -0,0 +1,23 @@
+"""Catalogue loading"""
+import json
+import os
+import shutil
+from app.infra.repos.bus_repo import load_catalogue
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'data.json')
+
+
+def test_catalogue_reloads_when_the_file_changes(tmp_path):
+    path = str(tmp_path / "data.json")
+    shutil.copy(DATA_PATH, path)
+    first = load_catalogue(path)
+    assert load_catalogue(path) is first
+
+    data = json.loads(open(path, encoding='utf-8').read())
+    data['bus_providers'][0]['name'] = "Renamed Travels"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    second = load_catalogue(path)
+    assert second.version != first.version
+    assert second.data['bus_providers'][0]['name'] == "Renamed Travels"
@@ -0,0 +1,103 @@
+"""BM25 coverage and how lexical hits are scored next to vector hits"""
+import pytest
+from langchain_core.documents import Document
+from app.config import get_settings
+from app.infra.rag.lexical_index import BM25Index, LexicalHit
+from app.infra.rag.vector_store import VectorStoreService, lexical_distance
+from app.infra.repos.provider_repo import ProviderRepository
+
+settings = get_settings()
+
+CHUNKS = [
+    ("Ena", "ena customer care 16460 dhaka counter"),
+    ("Ena", "ena refund policy for cancelled tickets"),
+    ("Hanif", "hanif customer care 16461 dhaka counter"),
+    ("Hanif", "hanif refund policy for cancelled tickets"),
+]
+
+
+@pytest.fixture
+def index() -> BM25Index:
+    bm25 = BM25Index()
+    bm25.rebuild([
+        Document(page_content=text, metadata={"provider": provider}, id=str(i))
+        for i, (provider, text) in enumerate(CHUNKS)
+    ])
+    return bm25
+
+
+@pytest.fixture
+def service(provider_docs, embeddings) -> VectorStoreService:
+    store = VectorStoreService(embeddings, backend="numpy")
+    store.index_documents(str(provider_docs))
+    return store
+
+
+def _hit(provider: str, coverage: float) -> LexicalHit:
+    return LexicalHit(Document(page_content="", metadata={"provider": provider}), 1.0, coverage)
+
+
+def test_coverage_is_the_idf_weighted_share_of_query_terms(index):
+    full = index.search("ena 16460")
+    assert full[0].doc.id == "0"
+    assert full[0].coverage == pytest.approx(1.0)
+
+    # "16460" is the rarer term, so it carries more of the weight than "ena"
+    partial = {hit.doc.id: hit.coverage for hit in index.search("ena 16461")}
+    assert 0 < partial["1"] < partial["2"] < 1
+
+
+def test_unseen_terms_lower_coverage(index):
+    hits = index.search("ena 16460 wifi")
+    assert 0 < hits[0].coverage < 0.75
+
+
+def test_provider_filter_and_empty_queries(index):
+    hits = index.search("customer care", provider_name="Hanif", k=10)
+    assert {hit.doc.metadata["provider"] for hit in hits} == {"Hanif"}
+    assert index.search("!!!") == []
+    assert BM25Index().search("ena") == []
+
+
+def test_confident_needs_the_threshold(service, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_SHORTCIRCUIT_THRESHOLD", 0.9)
+    assert service._lexical_is_confident([_hit("Ena", 0.95)], None)
+    assert not service._lexical_is_confident([_hit("Ena", 0.85)], None)
+    assert not service._lexical_is_confident([], None)
+
+
+def test_confident_needs_one_provider(service, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_SHORTCIRCUIT_THRESHOLD", 0.9)
+    tied = [_hit("Ena", 1.0), _hit("Hanif", 1.0)]
+    assert not service._lexical_is_confident(tied, None)
+    assert service._lexical_is_confident(tied, "Ena")
+    assert service._lexical_is_confident([_hit("Ena", 1.0), _hit("Hanif", 0.5)], None)
+
+
+def test_lexical_distance_is_on_the_vector_scale():
+    assert lexical_distance(1.0) == 0.0
+    assert lexical_distance(0.0) == 2.0
+    # A chunk covering 60% of the query is as far as a vector hit at cos 0.6
+    assert 1 - lexical_distance(0.6) == pytest.approx(2 * 0.6 - 1)
+
+
+def test_weak_lexical_hits_stay_below_the_similarity_gate(service):
+    repo = ProviderRepository(service, index=False)
+    vector = [(Document(page_content="Ena\nx", metadata={"provider": "Ena"}, id="v"), 1.2)]
+    weak = [LexicalHit(
+        Document(page_content="Hanif\ny", metadata={"provider": "Hanif"}, id="l"), 9.0, 0.6
+    )]
+
+    merged = repo._merge_hits(service._fuse(vector, weak, 2), 2)
+
+    # A 60% lexical match used to come out at similarity 0.6, above the 0.5 gate
+    assert all(hit["similarity"] < 0.5 for hit in merged)
+
+
+def test_short_circuited_hits_pass_the_similarity_gate(service, monkeypatch):
+    monkeypatch.setattr(settings, "LEXICAL_SHORTCIRCUIT_THRESHOLD", 0.9)
+    hits = service.hybrid_search("hanif 16460", k=3)
+
+    assert service.search_stats()["embedding_skipped"] == 1
+    assert hits[0][0].metadata["provider"] == "Hanif"
+    assert 1 - hits[0][1] > 0.5
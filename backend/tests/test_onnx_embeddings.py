@@ -0,0 +1,75 @@
+"""ONNX embedding backends reproduce the torch model"""
+import os
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("optimum.onnxruntime")
+pytest.importorskip("sentence_transformers")
+
+from app.config import get_settings  # noqa: E402
+from app.infra.rag.embedding_benchmark import parity_check, provider_doc_texts  # noqa: E402
+from app.infra.rag.model_registry import export_onnx_model, load_embedding_model  # noqa: E402
+
+settings = get_settings()
+
+DOCS_PATH = os.path.join(os.path.dirname(__file__), "../../data/provider_docs")
+
+
+def _tiny_model(directory: str) -> str:
+    """
+    Small randomly initialised BERT sentence model, built offline.
+
+    Its vectors mean nothing, but torch, ONNX and int8 ONNX must still
+    agree on them, which is what the backends have to get right.
+    """
+    # pylint: disable=import-outside-toplevel
+    import glob
+    import torch
+    from tokenizers import BertWordPieceTokenizer
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+    from sentence_transformers import SentenceTransformer, models
+
+    bert = os.path.join(directory, "bert")
+    os.makedirs(bert)
+    tokenizer = BertWordPieceTokenizer(lowercase=True)
+    tokenizer.train(glob.glob(os.path.join(DOCS_PATH, "*.txt")), vocab_size=2000)
+    tokenizer.save_model(bert)
+    BertTokenizerFast(vocab_file=os.path.join(bert, "vocab.txt")).save_pretrained(bert)
+    torch.manual_seed(0)
+    BertModel(BertConfig(
+        vocab_size=tokenizer.get_vocab_size(), hidden_size=128, num_hidden_layers=2,
+        num_attention_heads=4, intermediate_size=512
+    )).save_pretrained(bert)
+
+    path = os.path.join(directory, "model")
+    SentenceTransformer(
+        modules=[models.Transformer(bert, max_seq_length=256), models.Pooling(128)],
+        device="cpu"
+    ).save(path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    """Tiny model and its ONNX export, configured as EMBEDDING_MODEL"""
+    directory = str(tmp_path_factory.mktemp("embedding_model"))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "EMBEDDING_MODEL", _tiny_model(directory))
+        patch.setattr(settings, "EMBEDDING_ONNX_PATH", os.path.join(directory, "onnx_model"))
+        files = export_onnx_model(settings.EMBEDDING_ONNX_PATH)
+        yield files
+
+
+def test_export_writes_both_models(exported):
+    assert all(os.path.isfile(path) for path in exported)
+
+
+@pytest.mark.parametrize("backend, min_cosine", [("onnx", 0.9999), ("onnx-int8", 0.99)])
+def test_backend_matches_torch(exported, backend, min_cosine):
+    reference = load_embedding_model(backend="torch")
+    candidate = load_embedding_model(backend=backend)
+
+    parity = parity_check(reference, candidate, provider_doc_texts(DOCS_PATH))
+
+    assert parity["min_cosine"] >= min_cosine
+    assert parity["top1_agreement"] == 1.0
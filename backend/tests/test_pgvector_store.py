@@ -0,0 +1,138 @@
+"""pgvector store against the test database"""
+import threading
+import uuid
+import pytest
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import DBAPIError
+
+pytest.importorskip("pgvector")
+
+from app.infra.database.models import ProviderChunkDB  # noqa: E402
+from app.infra.rag.numpy_store import NumpyVectorStore  # noqa: E402
+from app.infra.rag.pgvector_store import INDEX_LOCK_KEY, PgVectorStore  # noqa: E402
+
+TEXTS = [
+    "hanif counter phone number dhaka",
+    "hanif cancellation policy refund",
+    "green line office address chattogram",
+    "green line luggage policy",
+]
+
+
+@pytest.fixture
+def providers(engine):
+    """Two providers no other test uses; their chunks are deleted afterwards"""
+    suffix = uuid.uuid4().hex[:8]
+    names = (f"Hanif {suffix}", f"Green Line {suffix}")
+    yield names
+    with engine.begin() as conn:
+        conn.execute(delete(ProviderChunkDB).where(ProviderChunkDB.provider.in_(names)))
+
+
+@pytest.fixture
+def store(engine, embeddings):
+    try:
+        return PgVectorStore(engine, embeddings)
+    except DBAPIError as e:
+        pytest.skip(f"pgvector is not available: {e.orig}")
+
+
+def _add(store, providers) -> list:
+    metadatas = [{"provider": providers[i // 2], "offset": i} for i in range(len(TEXTS))]
+    ids = [f"{providers[i // 2]}/{i}" for i in range(len(TEXTS))]
+    store.add_texts(TEXTS, metadatas, ids=ids)
+    return ids
+
+
+def _rows(engine, ids) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(
+            select(ProviderChunkDB.id, ProviderChunkDB.content).where(ProviderChunkDB.id.in_(ids))
+        ).all())
+
+
+def test_add_texts_upserts_by_id(engine, store, providers):
+    ids = _add(store, providers)
+    store.add_texts(["hanif counter moved to gabtoli"], [{"provider": providers[0]}], ids=ids[:1])
+
+    rows = _rows(engine, ids)
+    assert len(rows) == 4
+    assert rows[ids[0]] == "hanif counter moved to gabtoli"
+    hits = store.similarity_search_with_score(
+        "counter moved gabtoli", k=1, filter={"provider": providers[0]}
+    )
+    assert hits[0][0].id == ids[0]
+
+
+def test_provider_filter(store, providers):
+    _add(store, providers)
+
+    for provider in providers:
+        hits = store.similarity_search_with_score(
+            "policy", k=10, filter={"provider": {"$eq": provider}}
+        )
+        assert len(hits) == 2
+        assert {doc.metadata["provider"] for doc, _ in hits} == {provider}
+
+    with pytest.raises(ValueError):
+        store.similarity_search_with_score("policy", filter={"source": "hanif.txt"})
+
+
+def test_update_metadata_keeps_the_embedding(store, providers):
+    ids = _add(store, providers)
+    store.update_metadata(ids[:2], [
+        {"provider": providers[0], "offset": 10, "section": "Contact"},
+        {"provider": providers[0], "offset": 20, "section": "Policy"},
+    ])
+
+    hits = store.similarity_search_with_score(
+        TEXTS[0], k=2, filter={"provider": providers[0]}
+    )
+    assert hits[0][0].id == ids[0]
+    assert hits[0][1] == pytest.approx(0.0, abs=1e-5)
+    assert {doc.metadata["section"] for doc, _ in hits} == {"Contact", "Policy"}
+
+
+def test_delete(engine, store, providers):
+    ids = _add(store, providers)
+    assert store.delete(ids[:3])
+    assert not store.delete([])
+    assert list(_rows(engine, ids)) == ids[3:]
+
+
+def test_index_lock_excludes_other_connections(engine, store):
+    def try_lock() -> bool:
+        with engine.connect() as conn:
+            taken = conn.execute(select(func.pg_try_advisory_lock(INDEX_LOCK_KEY))).scalar()
+            if taken:
+                conn.execute(select(func.pg_advisory_unlock(INDEX_LOCK_KEY)))
+            return taken
+
+    with store.index_lock():
+        # Advisory locks are reentrant per session, so ask from another thread
+        result = []
+        thread = threading.Thread(target=lambda: result.append(try_lock()))
+        thread.start()
+        thread.join()
+        assert result == [False]
+    assert try_lock()
+
+
+def test_scores_match_the_numpy_store(tmp_path, embeddings, store, providers):
+    ids = _add(store, providers)
+    numpy_store = NumpyVectorStore(str(tmp_path), embeddings)
+    numpy_store.add_texts(
+        TEXTS, [{"provider": providers[i // 2]} for i in range(len(TEXTS))], ids=ids
+    )
+
+    for query in ["hanif phone", "green line policy"]:
+        for provider in providers:
+            search_filter = {"provider": provider}
+            expected = numpy_store.similarity_search_with_score(query, k=2, filter=search_filter)
+            actual = store.similarity_search_with_score(query, k=2, filter=search_filter)
+            assert [doc.id for doc, _ in actual] == [doc.id for doc, _ in expected]
+            assert [score for _, score in actual] == pytest.approx(
+                [score for _, score in expected], abs=1e-5
+            )
+            # Squared L2 between unit vectors, 2 - 2cos
+            assert all(0.0 <= score <= 4.0 for _, score in actual)
@@ -0,0 +1,50 @@
+"""Provider index shared between processes"""
+from app.config import get_settings
+from app.infra.rag.vector_store import VectorStoreService
+
+settings = get_settings()
+
+
+def test_reader_reloads_after_another_process_reindexes(provider_docs, embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_INDEX_RELOAD_SECONDS", 0)
+    writer = VectorStoreService(embeddings, backend="numpy")
+    writer.index_documents(str(provider_docs))
+    reader = VectorStoreService(embeddings, backend="numpy")
+    reader.load_index(str(provider_docs))
+    assert not reader.refresh_index(str(provider_docs))
+
+    hanif = provider_docs / "hanif.txt"
+    hanif.write_text(hanif.read_text().replace("16460", "16999"))
+    writer.index_documents(str(provider_docs))
+
+    assert reader.refresh_index(str(provider_docs))
+    assert reader.index_version == writer.index_version
+    assert "16999" in reader.cards.get("Hanif")["contact"]["phone"]
+    assert any("16999" in hit.doc.page_content for hit in reader.lexical.search("16999"))
+
+
+def test_refresh_is_throttled(provider_docs, embeddings, monkeypatch):
+    monkeypatch.setattr(settings, "PROVIDER_INDEX_RELOAD_SECONDS", 3600)
+    store = VectorStoreService(embeddings, backend="numpy")
+    store.index_documents(str(provider_docs))
+    store.refresh_index(str(provider_docs))
+
+    (provider_docs / "hanif.txt").write_text("Hanif\nPhone: 1\n")
+    VectorStoreService(embeddings, backend="numpy").index_documents(str(provider_docs))
+    assert not store.refresh_index(str(provider_docs))
+
+
+def test_indexing_after_another_process_picks_up_its_cards(provider_docs, embeddings):
+    first = VectorStoreService(embeddings, backend="numpy")
+    first.index_documents(str(provider_docs))
+    second = VectorStoreService(embeddings, backend="numpy")
+    second.index_documents(str(provider_docs))
+
+    hanif = provider_docs / "hanif.txt"
+    hanif.write_text(hanif.read_text().replace("16460", "16999"))
+    first.index_documents(str(provider_docs))
+    # Like a second worker's watcher: every file already matches the manifest
+    summary = second.index_documents(str(provider_docs))
+
+    assert summary["updated"] == 0
+    assert "16999" in second.cards.get("Hanif")["contact"]["phone"]
@@ -0,0 +1,40 @@
+"""Batched provider searches"""
+from langchain_core.documents import Document
+from app.config import get_settings
+from app.infra.repos.provider_repo import ProviderRepository
+
+settings = get_settings()
+
+
+class _VectorStore:
+    """Returns one hit per provider and records each batch's depth"""
+
+    cards = {}
+
+    def __init__(self):
+        self.calls = []
+
+    def load_index(self, _docs_path):
+        pass
+
+    def batch_search(self, queries, provider_names, k, hybrid=True):
+        self.calls.append((list(queries), k))
+        return [
+            [
+                (Document(page_content=f"{query} {i}", metadata={"provider": f"P{i}"}), 0.1 * i)
+                for i in range(k)
+            ]
+            for query in queries
+        ]
+
+
+def test_each_search_uses_its_own_depth():
+    store = _VectorStore()
+    repo = ProviderRepository(store, index=False)
+
+    results = repo.batch_semantic_search([("a", None, 1), ("b", "P0", 5), ("c", None, 1)])
+
+    oversample = settings.PROVIDER_SEARCH_OVERSAMPLE
+    assert sorted(store.calls) == [(["a", "c"], oversample), (["b"], 5 * oversample)]
+    assert [len(hits) for hits in results] == [1, 5, 1]
+    assert results[2][0]["content"] == "c 0"
@@ -0,0 +1,29 @@
+"""Cache keys for RAG answers"""
+from app.domain.services.rag_service import RAGService
+
+
+class _BusRepo:
+    version = "v1"
+
+    def get_providers(self):
+        return [{"name": "Hanif"}, {"name": "Green Line"}]
+
+    def get_districts(self):
+        return ["Dhaka", "Comilla", "Cox's Bazar"]
+
+
+class _ProviderRepo:
+    index_version = "i1"
+
+
+def _key(query: str) -> str:
+    return RAGService(_ProviderRepo(), _BusRepo())._cache_key(query)
+
+
+def test_word_order_is_ignored_without_a_route():
+    assert _key("green line contact number") == _key("contact number green line")
+
+
+def test_district_order_is_kept():
+    assert _key("comilla dhaka bus") != _key("dhaka comilla bus")
+    assert _key("dhaka cox's bazar bus") != _key("cox's bazar dhaka bus")
@@ -0,0 +1,225 @@
+"""Seat counters and holds under concurrent bookings"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import DataError
+from app.domain.entities import Booking, Trip
+from app.domain.exceptions import SeatHoldNotFound, SeatsSoldOut
+from app.infra.database.models import BookingDB, SeatHoldDB
+from app.infra.repos.booking_repo import BookingRepository
+from app.infra.repos.booking_writer import GroupCommitWriter
+from app.infra.repos.inventory_repo import InventoryRepository
+
+
+def _booking(trip: Trip, phone: str, price: float = 500) -> Booking:
+    return Booking(
+        name="Test Passenger",
+        phone=phone,
+        bus_provider=trip.bus_provider,
+        from_district=trip.from_district,
+        to_district=trip.to_district,
+        dropping_point="Chawk Bazar",
+        price=price,
+        travel_date=trip.travel_date,
+        travel_time=trip.travel_time
+    )
+
+
+def _book(session_factory, trip: Trip, phone: str, hold_id=None, price: float = 500):
+    db = session_factory()
+    try:
+        return BookingRepository(db).save(
+            _booking(trip, phone, price), take_seat=True, hold_id=hold_id
+        )
+    finally:
+        db.close()
+
+
+def _hold(session_factory, trip: Trip):
+    db = session_factory()
+    try:
+        return InventoryRepository(db).hold(trip)
+    finally:
+        db.close()
+
+
+def _available(session_factory, trip: Trip) -> int:
+    db = session_factory()
+    try:
+        return InventoryRepository(db).get_available([trip])[trip]
+    finally:
+        db.close()
+
+
+def _confirmed(session_factory, trip: Trip) -> int:
+    db = session_factory()
+    try:
+        return db.execute(
+            select(func.count()).select_from(BookingDB).where(
+                BookingDB.bus_provider == trip.bus_provider,
+                BookingDB.status == "confirmed"
+            )
+        ).scalar()
+    finally:
+        db.close()
+
+
+def _run_together(calls):
+    """Start every call at the same moment; return results or exceptions"""
+    barrier = threading.Barrier(len(calls))
+
+    def run(call):
+        barrier.wait()
+        try:
+            return call()
+        except Exception as e:  # pylint: disable=broad-except
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        return list(pool.map(run, calls))
+
+
+def test_hold_takes_a_seat_until_released(session_factory, trip, capacity):
+    capacity(2)
+    seat_hold = _hold(session_factory, trip)
+    assert _available(session_factory, trip) == 1
+
+    db = session_factory()
+    try:
+        assert InventoryRepository(db).release_hold(seat_hold.hold_id)
+        assert not InventoryRepository(db).release_hold(seat_hold.hold_id)
+    finally:
+        db.close()
+    assert _available(session_factory, trip) == 2
+
+
+def test_concurrent_bookings_never_oversell(session_factory, trip, capacity):
+    capacity(5)
+    results = _run_together([
+        lambda i=i: _book(session_factory, trip, f"017000000{i:02d}") for i in range(20)
+    ])
+
+    assert sum(isinstance(r, Booking) for r in results) == 5
+    assert all(isinstance(r, (Booking, SeatsSoldOut)) for r in results)
+    assert _available(session_factory, trip) == 0
+    assert _confirmed(session_factory, trip) == 5
+
+
+def test_concurrent_holds_and_bookings_share_the_seats(session_factory, trip, capacity):
+    capacity(6)
+    results = _run_together(
+        [lambda: _hold(session_factory, trip) for _ in range(10)]
+        + [lambda i=i: _book(session_factory, trip, f"018000000{i:02d}") for i in range(10)]
+    )
+
+    holds = [r for r in results[:10] if r is not None]
+    bookings = [r for r in results[10:] if isinstance(r, Booking)]
+    assert len(holds) + len(bookings) == 6
+    assert _available(session_factory, trip) == 0
+
+
+def test_checkout_uses_the_held_seat_on_a_sold_out_trip(session_factory, trip, capacity):
+    capacity(1)
+    seat_hold = _hold(session_factory, trip)
+
+    with pytest.raises(SeatsSoldOut):
+        _book(session_factory, trip, "01711111111")
+    booking = _book(session_factory, trip, "01722222222", hold_id=seat_hold.hold_id)
+
+    assert booking.id is not None
+    assert _available(session_factory, trip) == 0
+    with pytest.raises(SeatHoldNotFound):
+        _book(session_factory, trip, "01733333333", hold_id=seat_hold.hold_id)
+
+
+def test_concurrent_checkouts_with_one_hold_book_once(session_factory, trip, capacity):
+    capacity(3)
+    seat_hold = _hold(session_factory, trip)
+    results = _run_together([
+        lambda i=i: _book(session_factory, trip, f"019000000{i:02d}", hold_id=seat_hold.hold_id)
+        for i in range(8)
+    ])
+
+    assert sum(isinstance(r, Booking) for r in results) == 1
+    assert sum(isinstance(r, SeatHoldNotFound) for r in results) == 7
+    assert _available(session_factory, trip) == 2
+
+
+def test_failed_insert_keeps_the_hold(session_factory, trip, capacity):
+    capacity(1)
+    seat_hold = _hold(session_factory, trip)
+
+    # Overflows NUMERIC(10, 2), so the insert fails after the hold is used
+    with pytest.raises(DataError):
+        _book(session_factory, trip, "01711111111", hold_id=seat_hold.hold_id, price=10**12)
+
+    assert _available(session_factory, trip) == 0
+    assert _book(session_factory, trip, "01711111111", hold_id=seat_hold.hold_id).id is not None
+
+
+def test_lapsed_hold_gives_its_seat_back(session_factory, trip, capacity):
+    capacity(1)
+    seat_hold = _hold(session_factory, trip)
+    db = session_factory()
+    try:
+        db.execute(
+            update(SeatHoldDB)
+            .where(SeatHoldDB.hold_id == seat_hold.hold_id)
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    assert _available(session_factory, trip) == 1
+    assert _book(session_factory, trip, "01711111111").id is not None
+    with pytest.raises(SeatHoldNotFound):
+        _book(session_factory, trip, "01722222222", hold_id=seat_hold.hold_id)
+    assert _available(session_factory, trip) == 0
+
+
+def test_counter_starts_from_existing_bookings(session_factory, trip, capacity):
+    capacity(5)
+    db = session_factory()
+    try:
+        for i, status in enumerate(["confirmed", "confirmed", "confirmed", "canceled"]):
+            db.add(BookingDB(**{**vars(_booking(trip, f"0171000000{i}")), "status": status}))
+        db.commit()
+    finally:
+        db.close()
+
+    assert _available(session_factory, trip) == 2
+    _book(session_factory, trip, "01720000000")
+    _book(session_factory, trip, "01720000001")
+    with pytest.raises(SeatsSoldOut):
+        _book(session_factory, trip, "01720000002")
+
+
+def test_group_commit_claims_seats_in_the_batch(session_factory, trip, capacity):
+    capacity(3)
+    seat_hold = _hold(session_factory, trip)
+    writer = GroupCommitWriter(session_factory, window_ms=200, max_batch=20)
+
+    futures = [
+        writer.submit(_booking(trip, f"016000000{i:02d}"), take_seat=True) for i in range(5)
+    ]
+    futures.append(writer.submit(
+        _booking(trip, "01699999999"), take_seat=True, hold_id=seat_hold.hold_id
+    ))
+    # The bad row makes the batch retry row by row; seats must still add up
+    futures.append(writer.submit(_booking(trip, "01698888888", price=10**12), take_seat=True))
+
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append(future.result(timeout=10))
+        except Exception as e:  # pylint: disable=broad-except
+            outcomes.append(e)
+
+    assert isinstance(outcomes[5], Booking)
+    assert isinstance(outcomes[6], (DataError, SeatsSoldOut))
+    assert sum(isinstance(r, Booking) for r in outcomes[:5]) == 2
+    assert _confirmed(session_factory, trip) == 3
+    assert _available(session_factory, trip) == 0